@@ -0,0 +1,157 @@
+"""Build the class20 boundary index and benchmark coordinate lookups.
+
+Build the data file the integration uses to pick the area from Home
+Assistant's location. Any polygon GeoJSON works; with the 国土数値情報
+administrative boundaries (N03), whose N03_007 property is the 5-digit
+municipality code, "00" is appended to form the class20 code. Simplify the
+source first (e.g. mapshaper -simplify 10% keep-shapes) to keep the file
+small:
+
+    python benchmarks/boundaries.py build N03.geojson --area-json area.json
+
+With --area-json, codes are checked against the class20s of area.json and
+the wards of designated cities are merged into their city (e.g. 1410100 into
+横浜市 1410000). JMA's own GIS data for warning areas carries class20 codes
+directly; use --code-property regioncode --suffix "" for it.
+
+Time single lookups, batch lookups and loading, on the installed data file
+or, without one, on a synthetic tessellation with one polygon per class20:
+
+    python benchmarks/boundaries.py bench --points 100000
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import SEED, build_boundaries, load_fixtures, load_package_module  # noqa: E402
+
+
+def match_class20s(areas: Dict[str, List[Any]], class20_codes: List[str]) -> Dict[str, List[Any]]:
+    """Map area codes onto known class20 codes, merging designated city wards."""
+    known = sorted(class20_codes)
+    matched: Dict[str, List[Any]] = {}
+    for code, rings in areas.items():
+        target = code
+        if code not in class20_codes:
+            # Wards follow their city's code within the prefecture (1410100 -> 1410000)
+            position = bisect.bisect_right(known, code) - 1
+            candidate = known[position] if position >= 0 else ""
+            if candidate[:2] == code[:2] and candidate.endswith("000"):
+                target = candidate
+            else:
+                print(f"{code}: no class20 area, skipped", file=sys.stderr)
+                continue
+        matched.setdefault(target, []).extend(rings)
+    return matched
+
+
+def build(args: argparse.Namespace) -> int:
+    """Convert GeoJSON boundaries into the index data file."""
+    geo = load_package_module("geo")
+    areas: Dict[str, List[Any]] = {}
+    for path in args.geojson:
+        document = json.loads(path.read_bytes())
+        for code, rings in geo.areas_from_geojson(document, args.code_property, args.suffix).items():
+            areas.setdefault(code, []).extend(rings)
+    if args.area_json:
+        class20s = json.loads(args.area_json.read_bytes())["class20s"]
+        areas = match_class20s(areas, list(class20s))
+
+    started = time.perf_counter()
+    index = geo.BoundaryIndex.build(areas, args.cell_size)
+    elapsed = time.perf_counter() - started
+    index.save(args.output)
+    print(
+        f"Indexed {len(index)} areas ({len(index.edge_areas)} cell edges) in {elapsed:.1f}s,"
+        f" {args.output.stat().st_size / 2**20:.1f} MiB written to {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def bench(args: argparse.Namespace) -> int:
+    """Time lookups on the data file or a synthetic index."""
+    geo = load_package_module("geo")
+    report: Dict[str, Any] = {}
+    path = args.data or Path(geo.BOUNDARY_DATA_FILE)
+    if path.is_file():
+        started = time.perf_counter()
+        index = geo.BoundaryIndex.load(path)
+        report["load_seconds"] = time.perf_counter() - started
+        report["file_bytes"] = path.stat().st_size
+    else:
+        print(f"No data file at {path}, using a synthetic tessellation", file=sys.stderr)
+        areas = geo.areas_from_geojson(build_boundaries(load_fixtures()["area.json"], random.Random(SEED)), "code")
+        started = time.perf_counter()
+        index = geo.BoundaryIndex.build(areas)
+        report["build_seconds"] = time.perf_counter() - started
+
+    rng = random.Random(SEED)
+    west, south = index.origin[0] / geo.SCALE, index.origin[1] / geo.SCALE
+    east = west + index.cols * index.cell / geo.SCALE
+    north = south + index.rows * index.cell / geo.SCALE
+    latitudes = [rng.uniform(south, north) for _ in range(args.points)]
+    longitudes = [rng.uniform(west, east) for _ in range(args.points)]
+
+    samples = []
+    for latitude, longitude in zip(latitudes, longitudes):
+        started = time.perf_counter()
+        index.lookup(latitude, longitude)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    started = time.perf_counter()
+    codes = index.lookup_many(latitudes, longitudes)
+    batch = time.perf_counter() - started
+
+    report.update({
+        "areas": len(index),
+        "cell_edges": len(index.edge_areas),
+        "points": args.points,
+        "resolved": sum(code is not None for code in codes),
+        "lookup_us": {
+            "p50": statistics.median(samples) * 1e6,
+            "p95": samples[int(0.95 * (len(samples) - 1))] * 1e6,
+            "max": samples[-1] * 1e6,
+        },
+        "lookup_many_us_per_point": batch / args.points * 1e6,
+    })
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Build the boundary index or benchmark it."""
+    geo = load_package_module("geo")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="convert GeoJSON boundaries into the data file")
+    build_parser.add_argument("geojson", type=Path, nargs="+")
+    build_parser.add_argument("--code-property", default="N03_007", help="feature property holding the area code")
+    build_parser.add_argument("--suffix", default="00", help="appended to the code to form the class20 code")
+    build_parser.add_argument("--area-json", type=Path, help="area.json to match class20 codes against")
+    build_parser.add_argument("--cell-size", type=float, default=geo.BOUNDARY_CELL_SIZE, help="grid cell size in degrees")
+    build_parser.add_argument("--output", type=Path, default=Path(geo.BOUNDARY_DATA_FILE), help="copy it to the Home Assistant config directory")
+
+    bench_parser = commands.add_parser("bench", help="time lookups")
+    bench_parser.add_argument("--data", type=Path, help="data file, defaults to the one build writes")
+    bench_parser.add_argument("--points", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        return build(args)
+    return bench(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""Local stand-in for the JMA BOSAI server with latency and fault injection.
+
+Serves the documents the integration uses from the benchmark fixtures:
+
+    /bosai/common/const/area.json
+    /bosai/warning/data/warning/{office}.json
+    /bosai/quake/data/list.json
+    /bosai/information/data/information.json
+
+Point the integration at it by exporting the base URL before starting
+Home Assistant (or a benchmark):
+
+    python benchmarks/fake_jma.py --port 8765 --latency 80 --jitter 40 --error-rate 0.05
+    JMA_BOSAI_BASE_URL=http://127.0.0.1:8765/bosai hass -c config
+
+Every response carries ETag and Last-Modified headers and conditional
+requests are answered with 304. With --change-interval the quake list gains
+a new event and office warnings rotate between quiet and typhoon states on
+every tick, so caching and change detection can be exercised. Request and
+byte counters are available at /_stats.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import (  # noqa: E402
+    JST,
+    SEED,
+    build_earthquake_list,
+    build_warning_json,
+    load_fixtures,
+)
+
+
+@dataclass
+class FaultConfig:
+    """Latency and fault injection settings."""
+
+    latency: float = 0.0  # seconds
+    jitter: float = 0.0  # seconds
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_delay: float = 60.0  # seconds
+    change_interval: float = 0.0  # seconds, 0 keeps payloads static
+
+
+class FakeJMAServer:
+    """aiohttp application serving fixture-backed BOSAI documents."""
+
+    def __init__(self, fixtures: Dict[str, Any], faults: FaultConfig, seed: int = SEED) -> None:
+        """Initialize the server state."""
+        self._fixtures = fixtures
+        self._faults = faults
+        self._rng = random.Random(seed)
+        self._started = time.monotonic()
+        self._cache: Dict[Tuple[str, int], Tuple[bytes, str, str]] = {}
+        self._lists: list = []
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+    def tick(self) -> int:
+        """Return the current payload generation."""
+        if self._faults.change_interval <= 0:
+            return 0
+        return int((time.monotonic() - self._started) / self._faults.change_interval)
+
+    def _document(self, key: str, tick: int) -> Optional[Any]:
+        """Build the document for a path key at a payload generation."""
+        area_json = self._fixtures["area.json"]
+        rng = random.Random(f"{key}:{tick}")
+        if key == "area":
+            return area_json
+        if key == "list":
+            return self._quake_list(tick)
+        if key == "information":
+            return []
+        if key.startswith("warning:"):
+            office_code = key.split(":", 1)[1]
+            if office_code not in area_json["offices"]:
+                return None
+            typhoon = (tick + int(office_code[:2])) % 3 == 0 if tick else False
+            document = build_warning_json(area_json, office_code, typhoon, rng)
+            document["reportDatetime"] = (datetime.now(JST).replace(microsecond=0)).isoformat()
+            return document
+        return None
+
+    def _quake_list(self, tick: int) -> list:
+        """Return the quake list with one new event per generation, newest first."""
+        base = self._fixtures["list_50.json"]
+        while len(self._lists) <= tick:
+            generation = len(self._lists)
+            previous = self._lists[-1] if self._lists else base
+            if generation == 0:
+                self._lists.append(base)
+                continue
+            rng = random.Random(f"list:{generation}")
+            now = datetime.fromisoformat(base[0]["at"]) + timedelta(minutes=generation + 1)
+            fresh = build_earthquake_list(self._fixtures["area.json"], 1, rng, now=now)
+            self._lists.append((fresh + previous)[: len(base)])
+        return self._lists[tick]
+
+    def _encoded(self, key: str) -> Optional[Tuple[bytes, str, str]]:
+        """Return body, ETag and Last-Modified for a key, cached per generation."""
+        tick = self.tick()
+        cached = self._cache.get((key, tick))
+        if cached is None:
+            document = self._document(key, tick)
+            if document is None:
+                return None
+            body = json.dumps(document, ensure_ascii=False).encode()
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            cached = (body, etag, formatdate(usegmt=True))
+            self._cache[(key, tick)] = cached
+        return cached
+
+    async def _respond(self, request: web.Request, key: str) -> web.StreamResponse:
+        """Apply latency and faults, then serve a document."""
+        self.requests += 1
+        faults = self._faults
+        delay = faults.latency + self._rng.uniform(-faults.jitter, faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._rng.random()
+        if roll < faults.timeout_rate:
+            await asyncio.sleep(faults.timeout_delay)
+        elif roll < faults.timeout_rate + faults.error_rate:
+            return web.Response(status=self._rng.choice([500, 502, 503, 504]))
+
+        encoded = self._encoded(key)
+        if encoded is None:
+            raise web.HTTPNotFound()
+        body, etag, last_modified = encoded
+
+        headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": "max-age=0"}
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers=headers)
+
+        self.bytes_sent += len(body)
+        if request.method == "HEAD":
+            return web.Response(headers={**headers, "Content-Length": str(len(body))})
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    async def _handle_area(self, request: web.Request) -> web.StreamResponse:
+        return await self._respond(request, "area")
+
+    async def _handle_warning(self, request: web.Request) -> web.StreamResponse:
+        return await self._respond(request, f"warning:{request.match_info['code']}")
+
+    async def _handle_quake_list(self, request: web.Request) -> web.StreamResponse:
+        return await self._respond(request, "list")
+
+    async def _handle_information(self, request: web.Request) -> web.StreamResponse:
+        return await self._respond(request, "information")
+
+    async def _handle_stats(self, request: web.Request) -> web.StreamResponse:
+        return web.json_response({
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "bytes_sent": self.bytes_sent,
+            "tick": self.tick(),
+        })
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.router.add_get("/bosai/common/const/area.json", self._handle_area)
+        app.router.add_get("/bosai/warning/data/warning/{code}.json", self._handle_warning)
+        app.router.add_get("/bosai/quake/data/list.json", self._handle_quake_list)
+        app.router.add_get("/bosai/information/data/information.json", self._handle_information)
+        app.router.add_get("/_stats", self._handle_stats)
+        return app
+
+
+async def start_server(
+    faults: Optional[FaultConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    fixtures_dir: Optional[Path] = None,
+) -> Tuple[web.AppRunner, FakeJMAServer, str]:
+    """Start the fake server and return its runner, state and base URL."""
+    server = FakeJMAServer(load_fixtures(fixtures_dir), faults or FaultConfig())
+    runner = web.AppRunner(server.application())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, server, f"http://{host}:{bound_port}/bosai"
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Run the fake server until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, help="directory with recorded JMA payloads")
+    parser.add_argument("--latency", type=float, default=0.0, help="base latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency jitter in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of hanging responses")
+    parser.add_argument("--timeout-delay", type=float, default=60.0, help="seconds a hanging response waits")
+    parser.add_argument("--change-interval", type=float, default=0.0, help="seconds between payload changes")
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_delay=args.timeout_delay,
+        change_interval=args.change_interval,
+    )
+
+    async def _serve() -> None:
+        runner, _, base_url = await start_server(faults, args.host, args.port, args.fixtures)
+        print(f"Serving fake JMA BOSAI API at {base_url}", file=sys.stderr)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
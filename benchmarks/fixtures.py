@@ -0,0 +1,283 @@
+"""JMA BOSAI payload fixtures for the benchmarks.
+
+Payloads are built deterministically in the shape of the real documents
+(area.json, warning/{office}.json and quake/data/list.json). Recorded
+payloads can be used instead by placing them in a directory and passing it
+to load_fixtures(); files that are missing there fall back to the generated
+ones:
+
+    area.json
+    warning_quiet.json
+    warning_typhoon.json
+    list_50.json
+    list_1000.json
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.machinery
+import importlib.util
+import json
+import math
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_DIR = ROOT / "custom_components" / "disasterinformation"
+PACKAGE_NAME = "disasterinformation"
+
+JST = timezone(timedelta(hours=9))
+SEED = 20240101
+
+# Office used for the warning fixtures (東京都)
+BENCH_OFFICE = "130000"
+
+QUIET_STATUS = "発表警報・注意報はなし"
+TYPHOON_CODES = ["03", "04", "05", "07", "08", "14", "15", "18", "10"]
+INTENSITIES = ["1", "2", "3", "4", "5-", "5+", "6-", "6+", "7"]
+HYPOCENTERS = [
+    "石川県能登地方", "千葉県北西部", "茨城県南部", "福島県沖", "宮城県沖",
+    "岩手県沖", "熊本県熊本地方", "トカラ列島近海", "日向灘", "十勝地方南部",
+    "紀伊水道", "長野県中部", "奄美大島近海", "与那国島近海", "千葉県東方沖",
+]
+
+
+def load_package_module(name: str):
+    """Import an integration submodule without executing the package __init__.
+
+    The package __init__ pulls in Home Assistant, while the processing code
+    under benchmark only needs the submodule and its relative imports.
+    """
+    if PACKAGE_NAME not in sys.modules:
+        spec = importlib.machinery.ModuleSpec(PACKAGE_NAME, None, is_package=True)
+        package = importlib.util.module_from_spec(spec)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+
+def build_area_json(rng: random.Random) -> Dict[str, Any]:
+    """Build an area.json with the national hierarchy sizes."""
+    const = load_package_module("const")
+    area_mapping = load_package_module("area_mapping")
+    city_names = list(area_mapping.CITY_MAP)
+
+    centers: Dict[str, Any] = {}
+    offices: Dict[str, Any] = {}
+    class10s: Dict[str, Any] = {}
+    class15s: Dict[str, Any] = {}
+    class20s: Dict[str, Any] = {}
+
+    center_codes = list(const.REGION_CODES.values())
+    for name, code in const.REGION_CODES.items():
+        centers[code] = {"name": name, "enName": "", "officeName": "", "children": []}
+
+    city_index = 0
+    for office_index, (office_name, office_code) in enumerate(const.PREFECTURE_CODES.items()):
+        center_code = center_codes[min(office_index * len(center_codes) // len(const.PREFECTURE_CODES), len(center_codes) - 1)]
+        centers[center_code]["children"].append(office_code)
+        office = {"name": office_name, "enName": "", "officeName": "気象台", "parent": center_code, "children": []}
+        offices[office_code] = office
+
+        for class10_index in range(rng.randint(2, 4)):
+            class10_code = f"{office_code[:4]}{class10_index + 1}0"
+            office["children"].append(class10_code)
+            class10 = {"name": f"{office_name}{class10_index + 1}地方", "enName": "", "parent": office_code, "children": []}
+            class10s[class10_code] = class10
+
+            for class15_index in range(rng.randint(2, 3)):
+                class15_code = f"{class10_code[:5]}{class15_index + 1}"
+                class10["children"].append(class15_code)
+                class15 = {"name": f"{class10['name']}{class15_index + 1}", "enName": "", "parent": class10_code, "children": []}
+                class15s[class15_code] = class15
+
+                for _ in range(rng.randint(3, 7)):
+                    city_index += 1
+                    class20_code = f"{office_code[:2]}{city_index:05d}"
+                    if city_index - 1 < len(city_names):
+                        city_name = city_names[city_index - 1]
+                    else:
+                        city_name = f"第{city_index}町"
+                    class15["children"].append(class20_code)
+                    class20s[class20_code] = {"name": city_name, "enName": "", "kana": "", "parent": class15_code}
+
+    return {
+        "centers": centers,
+        "offices": offices,
+        "class10s": class10s,
+        "class15s": class15s,
+        "class20s": class20s,
+    }
+
+
+def _office_areas(area_json: Dict[str, Any], office_code: str) -> tuple[List[str], List[str]]:
+    """Return the class10 and class20 codes below an office."""
+    class10_codes = list(area_json["offices"][office_code]["children"])
+    class20_codes = []
+    for class10_code in class10_codes:
+        for class15_code in area_json["class10s"][class10_code]["children"]:
+            class20_codes.extend(area_json["class15s"][class15_code]["children"])
+    return class10_codes, class20_codes
+
+
+def build_warning_json(
+    area_json: Dict[str, Any], office_code: str, typhoon: bool, rng: random.Random
+) -> Dict[str, Any]:
+    """Build an office warning document, quiet or with every area under warning."""
+    class10_codes, class20_codes = _office_areas(area_json, office_code)
+    report_time = datetime(2024, 8, 30, 11, 0, tzinfo=JST)
+    time_defines = [(report_time + timedelta(hours=3 * slot)).isoformat() for slot in range(8)]
+
+    def _warnings() -> List[Dict[str, Any]]:
+        if not typhoon:
+            return [{"status": QUIET_STATUS}]
+        codes = TYPHOON_CODES[: rng.randint(5, len(TYPHOON_CODES))]
+        return [{"code": code, "status": rng.choice(["発表", "継続"])} for code in codes]
+
+    def _levels(warnings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        series = []
+        for warning in warnings:
+            if "code" not in warning:
+                continue
+            values = [rng.choice(["00", "10", "20", "30", "40"]) for _ in time_defines]
+            series.append({
+                "code": warning["code"],
+                "levels": [{"type": "危険度", "localAreas": [{"values": values}]}],
+            })
+        return series
+
+    class10_areas = [{"code": code, "warnings": _warnings()} for code in class10_codes]
+    class20_areas = [{"code": code, "warnings": _warnings()} for code in class20_codes]
+
+    return {
+        "reportDatetime": report_time.isoformat(),
+        "publishingOffice": "気象庁",
+        "headlineText": "台風第１０号の接近に伴い、暴風や高潮に厳重に警戒してください。" if typhoon else "",
+        "notice": "",
+        "areaTypes": [{"areas": class10_areas}, {"areas": class20_areas}],
+        "timeSeries": [{
+            "timeDefines": time_defines,
+            "areaTypes": [
+                {"areas": [{"code": area["code"], "warnings": _levels(area["warnings"])} for area in class20_areas]},
+            ],
+        }],
+    }
+
+
+def build_earthquake_list(
+    area_json: Dict[str, Any], count: int, rng: random.Random, now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """Build a list.json with count entries, newest first."""
+    now = now or datetime.now(JST).replace(microsecond=0)
+    class20_codes = list(area_json["class20s"])
+    entries = []
+    origin = now
+    for index in range(count):
+        origin -= timedelta(minutes=rng.randint(1, 20))
+        report = origin + timedelta(minutes=2)
+        eid = origin.strftime("%Y%m%d%H%M%S")
+        preliminary = rng.random() < 0.1
+        maxi = rng.choice(INTENSITIES[:5])
+        cities = rng.sample(class20_codes, rng.randint(1, 12))
+        prefectures: Dict[str, List[Dict[str, str]]] = {}
+        for city_code in cities:
+            prefectures.setdefault(city_code[:2], []).append(
+                {"code": city_code, "maxi": rng.choice(INTENSITIES[: INTENSITIES.index(maxi) + 1])}
+            )
+        entries.append({
+            "ctt": report.strftime("%Y%m%d%H%M%S"),
+            "eid": eid,
+            "rdt": report.isoformat(),
+            "ttl": "震度速報" if preliminary else "震源・震度情報",
+            "ift": "発表",
+            "ser": "1",
+            "at": origin.isoformat(),
+            "anm": "" if preliminary else rng.choice(HYPOCENTERS),
+            "acd": "" if preliminary else str(rng.randint(100, 999)),
+            "cod": "" if preliminary else f"+{rng.uniform(24, 45):.1f}+{rng.uniform(123, 146):.1f}-{rng.randint(1, 60) * 10000}/",
+            "mag": "--" if preliminary else f"{rng.uniform(1.0, 6.5):.1f}",
+            "maxi": maxi,
+            "int": [
+                {"code": pref_code, "maxi": max((c["maxi"] for c in pref_cities), key=INTENSITIES.index), "city": pref_cities}
+                for pref_code, pref_cities in prefectures.items()
+            ],
+            "json": f"{report.strftime('%Y%m%d%H%M%S')}_{eid}_VXSE5k_1.json",
+            "en_ttl": "Earthquake and Seismic Intensity Information",
+            "en_anm": "",
+        })
+    return entries
+
+
+def build_boundaries(area_json: Dict[str, Any], rng: random.Random, steps: int = 8) -> Dict[str, Any]:
+    """Build a GeoJSON tessellation of Japan's extent with one polygon per class20.
+
+    Neighbouring polygons share their jittered boundary vertices exactly, with
+    steps vertices per side, so the areas cover the extent without gaps or
+    overlaps like real municipality boundaries do.
+    """
+    codes = sorted(area_json["class20s"])
+    columns = math.ceil(math.sqrt(len(codes) * 1.2))
+    rows = math.ceil(len(codes) / columns)
+    west, south, east, north = 129.0, 30.0, 146.0, 45.5
+    width = (east - west) / (columns * steps)
+    height = (north - south) / (rows * steps)
+
+    lattice = [[(0.0, 0.0)] * (columns * steps + 1) for _ in range(rows * steps + 1)]
+    for i in range(rows * steps + 1):
+        for j in range(columns * steps + 1):
+            jitter_x = rng.uniform(-0.35, 0.35) * width if 0 < j < columns * steps else 0.0
+            jitter_y = rng.uniform(-0.35, 0.35) * height if 0 < i < rows * steps else 0.0
+            lattice[i][j] = (round(west + j * width + jitter_x, 6), round(south + i * height + jitter_y, 6))
+
+    features = []
+    for index, code in enumerate(codes):
+        top, left = divmod(index, columns)
+        i0, j0 = top * steps, left * steps
+        ring = (
+            [lattice[i0][j0 + step] for step in range(steps)]
+            + [lattice[i0 + step][j0 + steps] for step in range(steps)]
+            + [lattice[i0 + steps][j0 + steps - step] for step in range(steps)]
+            + [lattice[i0 + steps - step][j0] for step in range(steps)]
+        )
+        ring.append(ring[0])
+        features.append({
+            "type": "Feature",
+            "properties": {"code": code},
+            "geometry": {"type": "Polygon", "coordinates": [[list(point) for point in ring]]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def load_fixtures(directory: Optional[Path] = None) -> Dict[str, Any]:
+    """Return all benchmark fixtures, preferring recorded files from directory."""
+    rng = random.Random(SEED)
+
+    def _recorded(name: str) -> Optional[Any]:
+        if directory is None:
+            return None
+        path = Path(directory) / name
+        if not path.exists():
+            return None
+        return json.loads(path.read_bytes())
+
+    area_json = _recorded("area.json") or build_area_json(rng)
+    office_code = BENCH_OFFICE if BENCH_OFFICE in area_json["offices"] else next(iter(area_json["offices"]))
+    return {
+        "office_code": office_code,
+        "area.json": area_json,
+        "warning_quiet.json": _recorded("warning_quiet.json") or build_warning_json(area_json, office_code, False, rng),
+        "warning_typhoon.json": _recorded("warning_typhoon.json") or build_warning_json(area_json, office_code, True, rng),
+        "list_50.json": _recorded("list_50.json") or build_earthquake_list(area_json, 50, rng),
+        "list_1000.json": _recorded("list_1000.json") or build_earthquake_list(area_json, 1000, rng),
+    }
+
+
+def write_fixtures(directory: Path) -> None:
+    """Write the generated fixtures to directory as JSON files."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, payload in load_fixtures().items():
+        if name.endswith(".json"):
+            (directory / name).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,225 @@
+"""Record BOSAI documents into a replay archive and replay it through the pipeline.
+
+Record a typhoon day or quake swarm from the live API (or the fake server),
+keeping only documents that changed since the previous capture:
+
+    python benchmarks/replay.py record archive/ --offices 460000,470000 --interval 60 --duration 86400
+
+Replay the archive offline through the processing pipeline (decode, warning
+processing and transitions, forecast peaks, the quake columns and the
+intensity index) and report throughput and per-stage timings. --speed paces
+the frames by their capture times, so bursts arrive as they did; 0 replays
+as fast as possible:
+
+    python benchmarks/replay.py run archive/ --speed 600 --output replay.json
+
+To replay the same archive through Home Assistant itself, including
+automations, start it with:
+
+    JMA_BOSAI_REPLAY_ARCHIVE=archive/ JMA_BOSAI_REPLAY_SPEED=60 hass -c config
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import heapq
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import load_package_module  # noqa: E402
+
+WARNING_PREFIX = "warning/data/warning/"
+QUAKE_LIST_PATH = "quake/data/list.json"
+
+
+async def record(
+    output: Path, base_url: str, offices: List[str], interval: float, duration: float
+) -> int:
+    """Poll the documents and write a capture whenever any of them changed."""
+    replay = load_package_module("replay")
+    paths = [QUAKE_LIST_PATH] + [f"{WARNING_PREFIX}{office}.json" for office in offices]
+    digests: Dict[str, bytes] = {}
+    captures = 0
+    deadline = time.monotonic() + duration
+
+    async with aiohttp.ClientSession() as session:
+        while True:
+            started = time.monotonic()
+            captured_at = time.time()
+            changed: Dict[str, bytes] = {}
+            for path in paths:
+                try:
+                    async with session.get(f"{base_url.rstrip('/')}/{path}") as response:
+                        if response.status != 200:
+                            print(f"{path}: HTTP {response.status}", file=sys.stderr)
+                            continue
+                        body = await response.read()
+                except aiohttp.ClientError as e:
+                    print(f"{path}: {e}", file=sys.stderr)
+                    continue
+                digest = hashlib.blake2b(body, digest_size=16).digest()
+                if digests.get(path) != digest:
+                    digests[path] = digest
+                    changed[path] = body
+
+            if changed:
+                capture = output / replay.capture_name(captured_at)
+                for path, body in changed.items():
+                    file = capture / path
+                    file.parent.mkdir(parents=True, exist_ok=True)
+                    file.write_bytes(body)
+                captures += 1
+                print(f"{capture.name}: {len(changed)} changed", file=sys.stderr)
+
+            if time.monotonic() + interval > deadline:
+                return captures
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+class Pipeline:
+    """The integration's processing steps for one replayed document at a time."""
+
+    def __init__(self) -> None:
+        """Initialize the pipeline state."""
+        api = load_package_module("api")
+        decoder = load_package_module("decoder")
+        self.forecast = load_package_module("forecast")
+        self.intensity = load_package_module("intensity")
+        self.quake_columns = load_package_module("quake_columns")
+        self.transitions = load_package_module("transitions")
+        self.metrics = load_package_module("metrics").RefreshMetrics(window=100_000)
+        self.client = api.JMABosaiApiClient(None, self.metrics)
+        self.loads = decoder.json_loads
+        self.index = self.intensity.IntensityIndex()
+        self.active: Dict[str, Dict[Any, Any]] = {}
+        self.transition_counts = {"issued": 0, "upgraded": 0, "lifted": 0}
+
+    def process(self, path: str, body: bytes, captured_ts: int) -> None:
+        """Decode and process one document as the coordinator would."""
+        metrics = self.metrics
+        metrics.add_bytes(len(body))
+        with metrics.time("decode"):
+            document = self.loads(body)
+
+        if path == QUAKE_LIST_PATH:
+            with metrics.time("quake_columns"):
+                columns = self.quake_columns.QuakeColumns.from_list(document)
+                columns.view(captured_ts, 24, 0.0)
+            with metrics.time("intensity"):
+                self.index.update(document, captured_ts)
+            return
+
+        if not path.startswith(WARNING_PREFIX):
+            return
+        office_code = path[len(WARNING_PREFIX):].removesuffix(".json")
+        with metrics.time("process"):
+            data = self.client.process_warning_data(document, office_code)
+        with metrics.time("forecast"):
+            grid = self.forecast.parse_level_grid(document)
+            if grid is not None:
+                self.forecast.compute_peaks(grid, captured_ts, 24)
+        with metrics.time("transitions"):
+            active = self.transitions.index_warnings(
+                data["emergency_warnings"] + data["warnings"] + data["advisories"]
+            )
+            previous = self.active.get(office_code)
+            self.active[office_code] = active
+            if previous is not None:
+                delta = self.transitions.diff_warnings(previous, active)
+                self.transition_counts["issued"] += len(delta.issued)
+                self.transition_counts["upgraded"] += len(delta.upgraded)
+                self.transition_counts["lifted"] += len(delta.lifted)
+
+
+def frames(archive) -> List[Tuple[int, str, Path]]:
+    """Return every frame of an archive in capture order."""
+    return list(heapq.merge(*(
+        [(ts, path, file) for ts, file in zip(archive.times[path], archive.files[path])]
+        for path in archive.times
+    )))
+
+
+def run(directory: Path, speed: float) -> Dict[str, Any]:
+    """Replay an archive through the pipeline and return the report."""
+    replay = load_package_module("replay")
+    archive = replay.ReplayArchive.load(directory)
+    pipeline = Pipeline()
+    lag = load_package_module("metrics").RollingStats(window=100_000)
+
+    started = time.perf_counter()
+    count = 0
+    for captured_ts, path, file in frames(archive):
+        body = file.read_bytes()
+        if speed > 0:
+            due = started + (captured_ts - archive.start_ts) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            processing_started = time.perf_counter()
+            pipeline.process(path, body, captured_ts)
+            # How far behind the paced schedule each frame finished
+            lag.add(time.perf_counter() - min(due, processing_started))
+        else:
+            pipeline.process(path, body, captured_ts)
+        count += 1
+    elapsed = time.perf_counter() - started
+
+    total_bytes = pipeline.metrics.counters.get("bytes_total", 0)
+    return {
+        "archive": str(directory),
+        "speed": speed,
+        "archive_seconds": archive.end_ts - archive.start_ts,
+        "frames": count,
+        "bytes": total_bytes,
+        "elapsed": elapsed,
+        "frames_per_second": count / elapsed if elapsed else None,
+        "megabytes_per_second": total_bytes / elapsed / 1e6 if elapsed else None,
+        "transitions": pipeline.transition_counts,
+        "completion_lag": lag.summary() if speed > 0 else None,
+        "stages": pipeline.metrics.as_dict()["stages"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Record or replay an archive."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record documents into an archive")
+    record_parser.add_argument("archive", type=Path)
+    record_parser.add_argument("--base-url", default=load_package_module("const").JMA_BOSAI_BASE_URL)
+    record_parser.add_argument("--offices", default="", help="comma-separated office codes")
+    record_parser.add_argument("--interval", type=float, default=60.0, help="seconds between polls")
+    record_parser.add_argument("--duration", type=float, default=3600.0, help="seconds to record")
+
+    run_parser = commands.add_parser("run", help="replay an archive through the pipeline")
+    run_parser.add_argument("archive", type=Path)
+    run_parser.add_argument("--speed", type=float, default=0.0, help="archive seconds per wall second, 0 for unpaced")
+    run_parser.add_argument("--output", type=Path, help="write the report here")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        offices = [office for office in args.offices.split(",") if office]
+        captures = asyncio.run(record(args.archive, args.base_url, offices, args.interval, args.duration))
+        print(f"Recorded {captures} captures into {args.archive}", file=sys.stderr)
+        return 0
+
+    report = run(args.archive, args.speed)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""Micro-benchmarks for the disasterinformation processing hot paths.
+
+Runs offline against the fixtures from fixtures.py and needs only the
+integration's own requirements (aiohttp, async_timeout, numpy), not Home Assistant.
+
+    python benchmarks/run.py --output bench.json
+    python benchmarks/run.py --compare bench.json
+    python benchmarks/run.py --fixtures path/to/recorded --filter warning
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import JST, SEED, build_boundaries, load_fixtures, load_package_module  # noqa: E402
+
+
+def run_coroutine(coro) -> Any:
+    """Drive a coroutine that never suspends without an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("Benchmarked coroutine suspended")
+
+
+class Case:
+    """A named benchmark with an optional per-call setup."""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], setup: Callable[[], Any] = lambda: None, calls: int = 1) -> None:
+        """Initialize the case; calls is the number of logical operations per invocation."""
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.calls = calls
+
+
+def build_cases(fixtures: Dict[str, Any]) -> List[Case]:
+    """Build the benchmark cases over the fixtures."""
+    api = load_package_module("api")
+    decoder = load_package_module("decoder")
+    area_manager_module = load_package_module("area_manager")
+    area_mapping = load_package_module("area_mapping")
+    rollup = load_package_module("rollup")
+    forecast = load_package_module("forecast")
+    intensity = load_package_module("intensity")
+    quake_columns = load_package_module("quake_columns")
+    geo = load_package_module("geo")
+    activity = load_package_module("activity")
+    swarm = load_package_module("swarm")
+
+    client = api.JMABosaiApiClient(None)
+    area_json = fixtures["area.json"]
+    office_code = fixtures["office_code"]
+
+    manager = area_manager_module.AreaManager()
+    manager._area_data = area_json
+    manager._process_area_data()
+    manager._loaded = True
+
+    office_cities = manager.get_class20s_for_office(office_code)
+    city_codes = list(office_cities.values())
+    city_code = city_codes[0]
+    prefecture_name = area_json["offices"][office_code]["name"]
+    name_pairs = [(prefecture_name, name) for name in office_cities]
+
+    cases = [
+        Case(
+            f"process_warning_data[{variant}{suffix}]",
+            lambda _, doc=fixtures[f"warning_{variant}.json"], city=city: client._process_warning_data(doc, office_code, city),
+        )
+        for variant in ("quiet", "typhoon")
+        for suffix, city in (("", None), (",city", city_code))
+    ]
+
+    for size in (50, 1000):
+        earthquake_list = fixtures[f"list_{size}.json"]
+        oldest = min(datetime.fromisoformat(eq["at"]) for eq in earthquake_list)
+        hours = int((datetime.now(JST) - oldest).total_seconds() // 3600) + 2
+        for min_magnitude in (0.0, 4.0):
+            cases.append(Case(
+                f"get_filtered_earthquakes[{size},M{min_magnitude}]",
+                lambda _, eqs=earthquake_list, h=hours, m=min_magnitude: run_coroutine(
+                    client._get_filtered_earthquakes(eqs, h, m)
+                ),
+            ))
+
+    # One decode per list.json, then a view per earthquake entry
+    columns = quake_columns.QuakeColumns.from_list(fixtures["list_1000.json"])
+    columns_now = int(columns.origins[-1]) + 3600 if len(columns.origins) else 0
+    cases.append(Case("QuakeColumns.from_list[1000]", lambda _: quake_columns.QuakeColumns.from_list(fixtures["list_1000.json"])))
+    for hours, min_magnitude in ((24, 0.0), (24 * 30, 4.0)):
+        cases.append(Case(
+            f"QuakeColumns.view[1000,{hours}h,M{min_magnitude}]",
+            lambda _, h=hours, m=min_magnitude: columns.view(columns_now, h, m),
+        ))
+
+    # A whole refresh of a large office: decode the body, then process every area
+    typhoon_body = json.dumps(fixtures["warning_typhoon.json"], ensure_ascii=False).encode()
+    cases.append(Case(
+        "refresh[typhoon,office]",
+        lambda _: client._process_warning_data(decoder.json_loads(typhoon_body), office_code),
+    ))
+
+    decoders = {"json": decoder.stdlib_loads}
+    if decoder.orjson is not None:
+        decoders["orjson"] = decoder.orjson.loads
+    for name in ("area.json", "warning_typhoon.json", "list_1000.json"):
+        body = json.dumps(fixtures[name], ensure_ascii=False).encode()
+        for decoder_name, loads in decoders.items():
+            cases.append(Case(f"decode[{name},{decoder_name}]", lambda _, b=body, f=loads: f(b)))
+
+    def _fresh_manager():
+        fresh = area_manager_module.AreaManager()
+        fresh._area_data = area_json
+        return fresh
+
+    layout = rollup.OfficeLayout.from_hierarchy(office_code, manager.get_office_hierarchy(office_code))
+    cases.append(Case(
+        "compute_rollup[typhoon]",
+        lambda _: rollup.compute_rollup(layout, fixtures["warning_typhoon.json"]),
+    ))
+
+    # Steady state: a fresh list.json object whose events are already indexed
+    quake_list = fixtures["list_1000.json"]
+    quake_now = max(int(datetime.fromisoformat(eq["at"]).timestamp()) for eq in quake_list)
+    index = intensity.IntensityIndex()
+    index.update(quake_list, quake_now)
+    cases.extend([
+        Case("IntensityIndex.update[1000,cold]", lambda fresh: fresh.update(quake_list, quake_now), setup=intensity.IntensityIndex),
+        Case("IntensityIndex.update[1000,steady]", lambda copy: index.update(copy, quake_now), setup=lambda: list(quake_list)),
+        Case(
+            "IntensityIndex.lookup",
+            lambda _: [index.lookup(code) for code in city_codes],
+            calls=len(city_codes),
+        ),
+    ])
+
+    rates = activity.ActivityRates(0.0, (1, 6, 24, 168))
+    rates.update(quake_list, quake_now)
+    cases.extend([
+        Case(
+            "ActivityRates.update[1000,cold]",
+            lambda fresh: fresh.update(quake_list, quake_now),
+            setup=lambda: activity.ActivityRates(0.0, (1, 6, 24, 168)),
+        ),
+        Case("ActivityRates.update[1000,steady]", lambda copy: rates.update(copy, quake_now), setup=lambda: list(quake_list)),
+        Case("ActivityRates.summary", lambda _: rates.summary(24)),
+    ])
+
+    hypocenters = swarm.HypocenterIndex(0.0, 168)
+    hypocenters.update(quake_list, quake_now)
+    cases.extend([
+        Case(
+            "HypocenterIndex.update[1000,cold]",
+            lambda fresh: fresh.update(quake_list, quake_now),
+            setup=lambda: swarm.HypocenterIndex(0.0, 168),
+        ),
+        Case("HypocenterIndex.update[1000,steady]", lambda copy: hypocenters.update(copy, quake_now), setup=lambda: list(quake_list)),
+        Case("HypocenterIndex.swarms", lambda _: hypocenters.swarms(5)),
+    ])
+
+    grid = forecast.parse_level_grid(fixtures["warning_typhoon.json"])
+    grid_now = int(grid.starts[0])
+    cases.extend([
+        Case("parse_level_grid[typhoon]", lambda _: forecast.parse_level_grid(fixtures["warning_typhoon.json"])),
+        Case("compute_peaks[typhoon]", lambda _: forecast.compute_peaks(grid, grid_now, 24)),
+    ])
+
+    cases.extend([
+        Case("AreaManager._process_area_data", lambda fresh: fresh._process_area_data(), setup=_fresh_manager),
+        Case("get_class20s_for_office", lambda _: manager.get_class20s_for_office(office_code)),
+        Case(
+            "get_warning_area_code",
+            lambda _: [manager.get_warning_area_code(code) for code in city_codes],
+            calls=len(city_codes),
+        ),
+        Case(
+            "get_english_name",
+            lambda _: [area_mapping.get_english_name(pref, city) for pref, city in name_pairs],
+            calls=len(name_pairs),
+        ),
+    ])
+
+    # One synthetic polygon per class20, looked up at random points of the extent
+    boundaries = geo.areas_from_geojson(build_boundaries(area_json, random.Random(SEED)), "code")
+    boundary_index = geo.BoundaryIndex.build(boundaries)
+    point_rng = random.Random(SEED)
+    latitudes = [point_rng.uniform(30.0, 45.5) for _ in range(1000)]
+    longitudes = [point_rng.uniform(129.0, 146.0) for _ in range(1000)]
+    points = list(zip(latitudes, longitudes))
+    cases.extend([
+        Case("BoundaryIndex.build", lambda _: geo.BoundaryIndex.build(boundaries)),
+        Case(
+            "BoundaryIndex.lookup",
+            lambda _: [boundary_index.lookup(lat, lon) for lat, lon in points],
+            calls=len(points),
+        ),
+        Case(
+            "BoundaryIndex.lookup_many",
+            lambda _: boundary_index.lookup_many(latitudes, longitudes),
+            calls=len(points),
+        ),
+    ])
+    return cases
+
+
+def time_case(case: Case, repeat: int, min_time: float) -> Dict[str, Any]:
+    """Time a case, auto-scaling the loop count like timeit."""
+    number = 1
+    while True:
+        args = [case.setup() for _ in range(number)]
+        start = time.perf_counter_ns()
+        for arg in args:
+            case.func(arg)
+        elapsed = time.perf_counter_ns() - start
+        if elapsed / 1e9 >= min_time / 10 or number >= 1_000_000:
+            break
+        number *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            args = [case.setup() for _ in range(number)]
+            start = time.perf_counter_ns()
+            for arg in args:
+                case.func(arg)
+            samples.append((time.perf_counter_ns() - start) / (number * case.calls))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "loops": number,
+        "repeat": repeat,
+        "ns_per_call": {
+            "min": min(samples),
+            "median": statistics.median(samples),
+            "mean": statistics.fmean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        },
+    }
+
+
+def measure_memory(case: Case) -> Dict[str, Any]:
+    """Measure peak traced memory and retained bytes for one invocation."""
+    arg = case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = case.func(arg)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": peak - before, "retained_bytes": after - before}
+
+
+def fixture_sizes(fixtures: Dict[str, Any]) -> Dict[str, int]:
+    """Return the encoded size of each fixture in bytes."""
+    return {
+        name: len(json.dumps(payload, ensure_ascii=False).encode())
+        for name, payload in fixtures.items()
+        if name.endswith(".json")
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: Path) -> None:
+    """Print the median ratio of each case against a previous run."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {result["name"]: result for result in baseline["results"]}
+    print(f"{'case':50} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for result in current["results"]:
+        old = previous.get(result["name"])
+        new_ns = result["ns_per_call"]["median"]
+        if old is None:
+            print(f"{result['name']:50} {'-':>12} {new_ns:>12.0f} {'new':>7}")
+            continue
+        old_ns = old["ns_per_call"]["median"]
+        print(f"{result['name']:50} {old_ns:>12.0f} {new_ns:>12.0f} {new_ns / old_ns:>7.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, help="directory with recorded JMA payloads")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="target seconds per sample")
+    parser.add_argument("--output", type=Path, help="write machine-readable results here")
+    parser.add_argument("--compare", type=Path, help="previous results to compare against")
+    args = parser.parse_args(argv)
+
+    fixtures = load_fixtures(args.fixtures)
+    results = []
+    for case in build_cases(fixtures):
+        if args.filter not in case.name:
+            continue
+        result = {"name": case.name, **time_case(case, args.repeat, args.min_time), **measure_memory(case)}
+        results.append(result)
+        print(
+            f"{case.name:50} {result['ns_per_call']['median'] / 1000:10.1f} us"
+            f" {result['peak_bytes'] / 1024:10.1f} KiB peak",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "fixtures": str(args.fixtures) if args.fixtures else "generated",
+            "fixture_bytes": fixture_sizes(fixtures),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.compare:
+        compare(report, args.compare)
+    if not args.output and not args.compare:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""Scale benchmark: hundreds of config entries in one Home Assistant instance.
+
+Starts Home Assistant's test core with N weather and earthquake entries
+against the local fake JMA server and measures, for each N:
+
+- setup: wall time to set up the integration and every entry
+- cycle: wall time of a refresh of every coordinator, fetching fresh feeds
+- loop_lag: how late a 10 ms probe timer fires while the cycles run
+- memory: peak traced allocation and the process's max RSS
+- recorder_writes: state changes and integration events per cycle, the rows
+  the recorder would write (the recorder itself is not started)
+
+Needs Home Assistant's test helpers in addition to the integration's
+requirements:
+
+    pip install pytest-homeassistant-custom-component
+    python benchmarks/scale.py --entries 50,200,500 --cycles 5 --output scale.json
+    python benchmarks/scale.py --entries 200 --compare scale.json
+
+Judge every scaling change to DisasterInformationCoordinator against this.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_jma import FaultConfig, start_server  # noqa: E402
+from fixtures import ROOT, load_fixtures, load_package_module  # noqa: E402
+
+PROBE_INTERVAL = 0.01  # seconds
+
+
+class LoopLagProbe:
+    """Measure how late a short repeating sleep wakes up on the event loop."""
+
+    def __init__(self, interval: float = PROBE_INTERVAL) -> None:
+        """Initialize the probe."""
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(loop.time() - started - self.interval)
+
+    def start(self) -> None:
+        """Start probing."""
+        self.samples.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> Dict[str, Any]:
+        """Stop probing and summarize the lag in seconds."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return summarize(self.samples)
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Return count, p50, p95 and max of samples."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "max": ordered[-1],
+    }
+
+
+def entry_data(area_json: Dict[str, Any], count: int, earthquake_ratio: float) -> List[Dict[str, Any]]:
+    """Return config entry data for count entries spread over every office."""
+    const = load_package_module("const")
+    manager = load_package_module("area_manager").AreaManager()
+    manager._area_data = area_json
+    manager._process_area_data()
+    manager._loaded = True
+
+    earthquake_entries = round(count * earthquake_ratio)
+    # Cycle through the values the options form offers
+    time_ranges = list(const.EARTHQUAKE_TIME_RANGES)
+    magnitudes = list(const.EARTHQUAKE_MIN_MAGNITUDES)
+    entries: List[Dict[str, Any]] = [
+        {
+            const.CONF_INFORMATION_TYPE: const.INFO_TYPE_EARTHQUAKE,
+            const.CONF_UPDATE_INTERVAL: const.DEFAULT_UPDATE_INTERVAL,
+            const.CONF_EARTHQUAKE_TIME_RANGE: time_ranges[index % len(time_ranges)],
+            const.CONF_EARTHQUAKE_MIN_MAGNITUDE: magnitudes[index % len(magnitudes)],
+        }
+        for index in range(earthquake_entries)
+    ]
+
+    # Round-robin over offices so the cycle fetches as many documents as a real install would
+    cities = [
+        (office_code, office["name"], list(manager.get_class20s_for_office(office_code).items()))
+        for office_code, office in area_json["offices"].items()
+    ]
+    index = 0
+    while len(entries) < count:
+        office_code, prefecture, office_cities = cities[index % len(cities)]
+        if office_cities:
+            city, area_code = office_cities[(index // len(cities)) % len(office_cities)]
+            entries.append({
+                const.CONF_INFORMATION_TYPE: const.INFO_TYPE_WEATHER_WARNING,
+                const.CONF_PREFECTURE: prefecture,
+                const.CONF_CITY: city,
+                const.CONF_AREA_CODE: area_code,
+                const.CONF_UPDATE_INTERVAL: const.DEFAULT_UPDATE_INTERVAL,
+                "warning_area_code": manager.get_warning_area_code(area_code) or office_code,
+                "prefecture_code": office_code,
+            })
+        index += 1
+    return entries
+
+
+async def run_scale(count: int, cycles: int, earthquake_ratio: float, faults: FaultConfig) -> Dict[str, Any]:
+    """Set up count entries against a fresh fake server and measure the cycles."""
+    from homeassistant import loader
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+    const = load_package_module("const")
+    area_json = load_fixtures()["area.json"]
+    datas = entry_data(area_json, count, earthquake_ratio)
+
+    runner, server, base_url = await start_server(faults)
+    # The integration reads the base URL when its constants are imported
+    os.environ["JMA_BOSAI_BASE_URL"] = base_url
+    for module in [name for name in sys.modules if name.startswith("custom_components")]:
+        del sys.modules[module]
+
+    # A throwaway config directory keeps .storage and the history database out of the repo
+    config_dir = tempfile.TemporaryDirectory(prefix="disasterinformation-scale-")
+    (Path(config_dir.name) / "custom_components").symlink_to(ROOT / "custom_components")
+    sys.path.insert(0, config_dir.name)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        async with async_test_home_assistant(config_dir=config_dir.name) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            integration_events = 0
+            state_changes = 0
+
+            def _count_event(event) -> None:
+                nonlocal integration_events, state_changes
+                if event.event_type == EVENT_STATE_CHANGED:
+                    state_changes += 1
+                elif event.event_type.startswith(const.DOMAIN):
+                    integration_events += 1
+
+            hass.bus.async_listen("*", _count_event)
+
+            entries = []
+            for index, data in enumerate(datas):
+                entry = MockConfigEntry(domain=const.DOMAIN, data=data, title=f"scale {index}")
+                entry.add_to_hass(hass)
+                entries.append(entry)
+
+            probe = LoopLagProbe()
+            probe.start()
+            started = time.perf_counter()
+            assert await async_setup_component(hass, const.DOMAIN, {})
+            await hass.async_block_till_done()
+            setup_seconds = time.perf_counter() - started
+            setup_lag = await probe.stop()
+            loaded = sum(entry.entry_id in hass.data.get(const.DOMAIN, {}) for entry in entries)
+            setup_writes = state_changes
+
+            coordinators = list(hass.data[const.DOMAIN].values())
+            feeds = coordinators[0].feeds if coordinators else None
+            cycle_seconds: List[float] = []
+            cycle_writes: List[int] = []
+            requests_before = server.requests
+            probe.start()
+            for _ in range(cycles):
+                # Expire every feed so each cycle fetches like a new polling interval
+                if feeds is not None:
+                    feeds._fetched.clear()
+                state_changes = 0
+                integration_events = 0
+                started = time.perf_counter()
+                await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+                await hass.async_block_till_done()
+                cycle_seconds.append(time.perf_counter() - started)
+                cycle_writes.append(state_changes + integration_events)
+            cycle_lag = await probe.stop()
+
+            for entry in entries:
+                await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+            await hass.async_stop(force=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await runner.cleanup()
+        sys.path.remove(config_dir.name)
+        config_dir.cleanup()
+
+    return {
+        "entries": count,
+        "loaded": loaded,
+        "earthquake_entries": round(count * earthquake_ratio),
+        "setup_seconds": setup_seconds,
+        "setup_loop_lag": setup_lag,
+        "setup_recorder_writes": setup_writes,
+        "cycle_seconds": summarize(cycle_seconds),
+        "cycle_loop_lag": cycle_lag,
+        "recorder_writes_per_cycle": summarize(cycle_writes),
+        "requests_per_cycle": (server.requests - requests_before) / cycles if cycles else 0,
+        "peak_traced_bytes": peak,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: Path) -> None:
+    """Print cycle and setup time ratios against a previous run."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {result["entries"]: result for result in baseline["results"]}
+    print(f"{'entries':>8} {'metric':24} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for result in current["results"]:
+        old = previous.get(result["entries"])
+        if old is None:
+            continue
+        for metric, old_value, new_value in (
+            ("setup_seconds", old["setup_seconds"], result["setup_seconds"]),
+            ("cycle_seconds.p50", old["cycle_seconds"].get("p50"), result["cycle_seconds"].get("p50")),
+            ("cycle_loop_lag.max", old["cycle_loop_lag"].get("max"), result["cycle_loop_lag"].get("max")),
+            ("peak_traced_bytes", old["peak_traced_bytes"], result["peak_traced_bytes"]),
+        ):
+            if not old_value or new_value is None:
+                continue
+            print(f"{result['entries']:>8} {metric:24} {old_value:>10.3f} {new_value:>10.3f} {new_value / old_value:>7.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the scale benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", default="50,200,500", help="comma-separated entry counts")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--earthquake-ratio", type=float, default=0.2, help="fraction of earthquake entries")
+    parser.add_argument("--latency", type=float, default=50.0, help="fake server latency in ms")
+    parser.add_argument("--jitter", type=float, default=20.0, help="fake server jitter in ms")
+    parser.add_argument("--change-interval", type=float, default=1.0, help="seconds between payload changes")
+    parser.add_argument("--output", type=Path, help="write machine-readable results here")
+    parser.add_argument("--compare", type=Path, help="previous results to compare against")
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        change_interval=args.change_interval,
+    )
+    results = []
+    for count in (int(value) for value in args.entries.split(",") if value):
+        result = asyncio.run(run_scale(count, args.cycles, args.earthquake_ratio, faults))
+        results.append(result)
+        print(
+            f"{count:5} entries: setup {result['setup_seconds']:.2f}s,"
+            f" cycle p50 {result['cycle_seconds'].get('p50', 0):.3f}s,"
+            f" loop lag max {result['cycle_loop_lag'].get('max', 0) * 1000:.1f}ms,"
+            f" peak {result['peak_traced_bytes'] / 2**20:.1f} MiB",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "cycles": args.cycles,
+            "earthquake_ratio": args.earthquake_ratio,
+            "latency_ms": args.latency,
+            "jitter_ms": args.jitter,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.compare:
+        compare(report, args.compare)
+    if not args.output and not args.compare:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,69 @@
 """気象庁防災情報 integration for Home Assistant."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import timedelta
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, DEFAULT_UPDATE_INTERVAL
+from .activity import async_get_activity_rates
+from .api import JMABosaiApiClient, earthquake_result
+from .area_manager import AreaManager, async_get_area_manager
+from .const import (
+    DOMAIN,
+    DATA_LEVEL_GRIDS,
+    DATA_OFFICE_ROLLUPS,
+    DATA_REPLAY_SOURCE,
+    DEFAULT_SWARM_THRESHOLD,
+    DEFAULT_UPDATE_INTERVAL,
+    EVENT_SWARM_DETECTED,
+    EVENT_WARNING_ISSUED,
+    EVENT_WARNING_LIFTED,
+    EVENT_WARNING_UPGRADED,
+    FORECAST_HORIZON,
+    INFO_TYPE_EARTHQUAKE,
+    INFO_TYPE_WEATHER_WARNING,
+    SIGNAL_EARTHQUAKE_LIST_UPDATED,
+    SIGNAL_OFFICE_ROLLUP_OWNER,
+)
+from .feeds import async_get_feed_manager
+from .forecast import LevelGrid, forecast_peak, parse_level_grid
+from .history import HistoryStore, async_close_history_store, async_get_history_store
+from .intensity import async_get_intensity_index
+from .metrics import RefreshMetrics
+from .profiler import async_get_profiler
+from .quake_watcher import async_acquire_quake_watcher
+from .records import WarningRecord
+from .replay import async_setup_replay_source
+from .scheduler import async_get_scheduler
+from .services import async_setup_services
+from .swarm import Swarm, async_get_hypocenter_index
+from .transitions import WarningDelta, WarningKey, diff_warnings, index_warnings
+from .websocket_api import async_close_subscriptions, async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the 気象庁防災情報 services and websocket commands."""
+    await async_setup_replay_source(hass)
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up 気象庁防災情報 from a config entry."""
@@ -22,103 +71,431 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Create data update coordinator
     coordinator = DisasterInformationCoordinator(hass, entry)
     
-    # Fetch initial data
+    # Record history, join the shared fetch cycle and fetch initial data
+    coordinator.history = await async_get_history_store(hass)
+    entry.async_on_unload(coordinator.async_register_feeds())
     await coordinator.async_config_entry_first_refresh()
     
+    # Later refreshes run on a phase staggered against the other entries
+    entry.async_on_unload(coordinator.async_schedule_refreshes())
+    
     # Store coordinator in hass data
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
+    # Earthquakes get a fast lane independent of the polling interval
+    if entry.data.get("information_type") == INFO_TYPE_EARTHQUAKE:
+        entry.async_on_unload(coordinator.async_start_earthquake_watcher())
+    
+    # Apply option changes to the running coordinator instead of reloading
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options in place."""
+    coordinator: DisasterInformationCoordinator = hass.data[DOMAIN][entry.entry_id]
+    await coordinator.async_apply_options()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_close_subscriptions(hass, entry.entry_id)
+        async_get_profiler(hass).async_disarm(entry.entry_id)
+        _async_hand_over_office_rollup(hass, entry)
+        # The history store is shared; close it with the last entry
+        if not hass.data[DOMAIN]:
+            await async_close_history_store(hass)
     
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Close the warning periods a removed entry was recording."""
+    office_code = entry.data.get("warning_area_code")
+    city_area_code = entry.data.get("area_code")
+    if not office_code or not city_area_code:
+        return
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        if (
+            coordinator.entry.data.get("warning_area_code") == office_code
+            and coordinator.entry.data.get("area_code") == city_area_code
+        ):
+            # Another entry still records this city
+            return
+    store = await async_get_history_store(hass)
+    store.async_end_periods(office_code, city_area_code)
+    if hass.data.get(DOMAIN):
+        await store.async_flush()
+    else:
+        await async_close_history_store(hass)
+
+
+@callback
+def _async_hand_over_office_rollup(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Let another loaded entry of the same office own the overview sensor."""
+    office_code = entry.data.get("warning_area_code")
+    owners = hass.data.get(DATA_OFFICE_ROLLUPS, {})
+    if not office_code:
+        return
+    if owners.get(office_code) == entry.entry_id:
+        owners.pop(office_code)
+    if office_code in owners:
+        return
+    for entry_id, coordinator in hass.data[DOMAIN].items():
+        if coordinator.entry.data.get("warning_area_code") == office_code:
+            owners[office_code] = entry_id
+            async_dispatcher_send(hass, SIGNAL_OFFICE_ROLLUP_OWNER.format(entry_id))
+            return
+
+
 class DisasterInformationCoordinator(DataUpdateCoordinator):
     """Data coordinator for disaster information."""
     
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Initialize the coordinator."""
         self.entry = entry
-        update_interval = timedelta(
-            minutes=entry.data.get("update_interval", DEFAULT_UPDATE_INTERVAL)
-        )
         
+        # The shared scheduler polls instead of the coordinator's own timer
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=update_interval,
+            update_interval=None,
+        )
+        self.refresh_interval = timedelta(
+            minutes=self._setting("update_interval", DEFAULT_UPDATE_INTERVAL)
+        )
+        self.scheduler = async_get_scheduler(hass)
+        self.feeds = async_get_feed_manager(hass)
+        self.api_client = JMABosaiApiClient(
+            async_get_clientsession(hass), source=hass.data.get(DATA_REPLAY_SOURCE)
         )
+        self.metrics = RefreshMetrics()
+        self.profiler = async_get_profiler(hass)
+        self.history: HistoryStore | None = None
+        self.intensity = async_get_intensity_index(hass)
+        self.area_manager: AreaManager | None = None
+        self._area_task: asyncio.Task | None = None
+        self._active_warnings: dict[WarningKey, WarningRecord] | None = None
+        self._swarm_regions: set[str] | None = None
     
+    def _setting(self, key: str, default: Any) -> Any:
+        """Return a setting, preferring options over the original entry data."""
+        return self.entry.options.get(key, self.entry.data.get(key, default))
+
+    def _earthquake_filters(self) -> tuple[int, float]:
+        """Return the configured earthquake time range and minimum magnitude."""
+        time_range = int(self._setting("earthquake_time_range", "24"))
+        min_magnitude = float(self._setting("earthquake_min_magnitude", "0"))
+        return time_range, min_magnitude
+
+    async def async_apply_options(self) -> None:
+        """Apply a new interval and filters without fetching.
+
+        Earthquake filters are re-applied to the cached list.json, and the
+        next refresh is rescheduled with the new interval.
+        """
+        self.refresh_interval = timedelta(
+            minutes=self._setting("update_interval", DEFAULT_UPDATE_INTERVAL)
+        )
+        self.scheduler.async_set_interval(self.entry.entry_id, self.refresh_interval)
+        data = self.data
+        snapshot = self.feeds.snapshot
+        if (
+            self.entry.data.get("information_type") == INFO_TYPE_EARTHQUAKE
+            and snapshot is not None
+            and snapshot.earthquake_list is not None
+        ):
+            data = await self._async_process_earthquake_list(snapshot.earthquake_list)
+        self.async_set_updated_data(data)
+
+    async def _async_process_earthquake_list(self, earthquake_list: list) -> dict:
+        """Filter an earthquake list with this entry's settings.
+
+        The list is decoded into sorted columns once per snapshot and shared
+        by every earthquake entry; each entry only slices its own view. The
+        activity rates and the hypocenter index are shared by entries with the
+        same filters and only fold in events that are new or revised.
+        """
+        time_range, min_magnitude = self._earthquake_filters()
+        columns = await self.feeds.async_earthquake_columns(earthquake_list)
+        now = int(self.api_client.now())
+        with self.metrics.blocking("process"):
+            data = earthquake_result(
+                columns.view(now, time_range, min_magnitude),
+                time_range,
+                min_magnitude,
+            )
+        activity = async_get_activity_rates(self.hass, min_magnitude)
+        hypocenters = async_get_hypocenter_index(self.hass, min_magnitude, time_range)
+        with self.metrics.blocking("activity"):
+            activity.update(earthquake_list, now)
+            data["activity"] = activity.summary(time_range)
+            hypocenters.update(earthquake_list, now)
+            data["swarms"] = hypocenters.swarms(self._swarm_threshold())
+        data["swarm_threshold"] = self._swarm_threshold()
+        data["information_type"] = INFO_TYPE_EARTHQUAKE
+        self._async_track_swarms(data["swarms"], time_range, min_magnitude)
+        return data
+
+    def _swarm_threshold(self) -> int:
+        """Return the number of events in one region that makes a swarm when exceeded."""
+        return int(self._setting("swarm_threshold", DEFAULT_SWARM_THRESHOLD))
+
+    @callback
+    def _async_track_swarms(self, swarms: list[Swarm], time_range: int, min_magnitude: float) -> None:
+        """Fire an event for each region that started a swarm since the last update.
+
+        Like warnings, swarms already under way at startup only set the baseline.
+        """
+        regions = {swarm.hypocenter for swarm in swarms}
+        previous, self._swarm_regions = self._swarm_regions, regions
+        if previous is None:
+            return
+        for swarm in swarms:
+            if swarm.hypocenter not in previous:
+                self.hass.bus.async_fire(EVENT_SWARM_DETECTED, {
+                    "entry_id": self.entry.entry_id,
+                    **swarm.as_dict(),
+                    "threshold": self._swarm_threshold(),
+                    "time_range_hours": time_range,
+                    "min_magnitude": min_magnitude,
+                })
+
+    @callback
+    def _async_ensure_area_data(self) -> None:
+        """Load area.json in the background for the office overview.
+
+        A failed load is retried on the next refresh instead of holding up
+        this one or the platform setup.
+        """
+        if self.area_manager is not None or self._area_task is not None:
+            return
+        self._area_task = self.entry.async_create_background_task(
+            self.hass, self._async_load_area_data(), f"{DOMAIN} area data {self.entry.entry_id}"
+        )
+
+    async def _async_load_area_data(self) -> None:
+        """Share the loaded area data with the entities."""
+        try:
+            manager = await async_get_area_manager(self.hass)
+        finally:
+            self._area_task = None
+        if manager.is_loaded:
+            self.area_manager = manager
+            self.async_update_listeners()
+
+    @callback
+    def async_start_earthquake_watcher(self) -> CALLBACK_TYPE:
+        """Subscribe to the shared earthquake list watcher."""
+        unsub_dispatcher = async_dispatcher_connect(
+            self.hass, SIGNAL_EARTHQUAKE_LIST_UPDATED, self._async_handle_earthquake_list
+        )
+        release_watcher = async_acquire_quake_watcher(self.hass)
+
+        @callback
+        def _stop() -> None:
+            unsub_dispatcher()
+            release_watcher()
+
+        return _stop
+
+    async def _async_handle_earthquake_list(self, earthquake_list: list) -> None:
+        """Process a changed earthquake list immediately."""
+        if self.history is not None:
+            self.history.async_record_earthquakes(earthquake_list)
+        self.async_set_updated_data(await self._async_process_earthquake_list(earthquake_list))
+
+    @callback
+    def _async_track_warnings(self, warnings: list[WarningRecord]) -> None:
+        """Diff against the previous refresh and fire events for the delta.
+
+        The first successful refresh only sets the baseline, so warnings that
+        were already active at startup do not fire as newly issued.
+        """
+        active = index_warnings(warnings)
+        previous, self._active_warnings = self._active_warnings, active
+        if previous is None:
+            return
+        delta = diff_warnings(previous, active)
+        if delta:
+            self._async_fire_warning_events(delta)
+
+    @callback
+    def _async_fire_warning_events(self, delta: WarningDelta) -> None:
+        """Fire one event per issued, upgraded and lifted warning."""
+        context = {
+            "entry_id": self.entry.entry_id,
+            "office_code": self.entry.data.get("warning_area_code"),
+            "prefecture": self.entry.data.get("prefecture"),
+            "city": self.entry.data.get("city"),
+        }
+        for warning in delta.issued:
+            self.hass.bus.async_fire(EVENT_WARNING_ISSUED, {**context, **warning.as_dict()})
+        for old, new in delta.upgraded:
+            self.hass.bus.async_fire(EVENT_WARNING_UPGRADED, {
+                **context,
+                **new.as_dict(),
+                "previous_code": old.code,
+                "previous_name": old.name,
+                "previous_severity": old.severity,
+            })
+        for warning in delta.lifted:
+            self.hass.bus.async_fire(EVENT_WARNING_LIFTED, {**context, **warning.as_dict()})
+
+    async def _async_level_grid(self, office_code: str, document: dict[str, Any], size: int) -> LevelGrid | None:
+        """Return the forecast level grid of an office document, shared across entries."""
+        grids = self.hass.data.setdefault(DATA_LEVEL_GRIDS, {})
+        cached = grids.get(office_code)
+        if cached is not None and cached[0] is document:
+            return cached[1]
+        grid = await self.metrics.async_run("forecast_grid", size, parse_level_grid, document)
+        grids[office_code] = (document, grid)
+        return grid
+
+    @property
+    def refresh_group(self) -> str:
+        """Return the document this entry polls; entries sharing it refresh together."""
+        if self.entry.data.get("information_type", INFO_TYPE_WEATHER_WARNING) == INFO_TYPE_EARTHQUAKE:
+            return "earthquake"
+        return f"warning:{self.entry.data.get('warning_area_code')}"
+
+    @callback
+    def async_schedule_refreshes(self) -> CALLBACK_TYPE:
+        """Refresh on this entry's staggered phase of the interval."""
+        if self.entry.pref_disable_polling:
+            return lambda: None
+        return self.scheduler.async_add(
+            self.entry, self.refresh_group, self.refresh_interval, self.async_refresh
+        )
+
+    @callback
+    def async_register_feeds(self) -> CALLBACK_TYPE:
+        """Register the feeds this entry needs with the shared fetch cycle."""
+        if self.entry.data.get("information_type", INFO_TYPE_WEATHER_WARNING) == INFO_TYPE_EARTHQUAKE:
+            return self.feeds.async_register(self.entry.entry_id, earthquakes=True)
+        # Weather entries read the intensity felt at the site from the list.json
+        # that earthquake entries keep in the shared snapshot, if there are any
+        return self.feeds.async_register(
+            self.entry.entry_id,
+            warning_office=self.entry.data.get("warning_area_code"),
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing the entity state writes."""
+        with self.metrics.time("entity_write"):
+            super().async_update_listeners()
+
     async def _async_update_data(self) -> dict:
         """Fetch data from JMA API."""
-        from .api import JMABosaiApiClient
-        from .const import INFO_TYPE_EARTHQUAKE, INFO_TYPE_WEATHER_WARNING
-        import aiohttp
-        
+        if self.profiler.armed and self.profiler.wants(self.entry.entry_id):
+            return await self.profiler.async_profile(self._async_timed_update())
+        return await self._async_timed_update()
+
+    async def _async_timed_update(self) -> dict:
+        """Run one refresh under the refresh timer."""
         try:
-            async with aiohttp.ClientSession() as session:
-                api_client = JMABosaiApiClient(session)
-                
-                information_type = self.entry.data.get("information_type", INFO_TYPE_WEATHER_WARNING)
+            with self.metrics.time("refresh"):
+                return await self._async_fetch_and_process()
+        finally:
+            self.metrics.record_blocking()
+
+    async def _async_fetch_and_process(self) -> dict:
+        """Fetch the shared snapshot and process this entry's part of it."""
+        try:
+            with self.metrics.time("fetch"):
+                snapshot = await self.feeds.async_get_snapshot(self.entry.entry_id)
+            
+            information_type = self.entry.data.get("information_type", INFO_TYPE_WEATHER_WARNING)
+            
+            if information_type == INFO_TYPE_EARTHQUAKE:
+                # Get earthquake data with filters
+                earthquake_list = snapshot.earthquake_list
                 
-                if information_type == INFO_TYPE_EARTHQUAKE:
-                    # Get earthquake data with filters
-                    time_range = int(self.entry.data.get("earthquake_time_range", "24"))
-                    min_magnitude = float(self.entry.data.get("earthquake_min_magnitude", "0"))
+                if earthquake_list is not None:
+                    if self.history is not None:
+                        self.history.async_record_earthquakes(earthquake_list)
+                    return await self._async_process_earthquake_list(earthquake_list)
+                else:
+                    return {
+                        "information_type": INFO_TYPE_EARTHQUAKE,
+                        "earthquakes": [],
+                        "count": 0,
+                        "status": "error"
+                    }
                     
-                    data = await api_client.get_earthquake_data(
-                        time_range_hours=time_range,
-                        min_magnitude=min_magnitude
+            else:
+                # Get weather warning data
+                warning_area_code = self.entry.data.get("warning_area_code")
+                if not warning_area_code:
+                    return {
+                        "information_type": INFO_TYPE_WEATHER_WARNING,
+                        "status": "error",
+                        "warnings": []
+                    }
+                
+                self._async_ensure_area_data()
+                city_area_code = self.entry.data.get("area_code")
+                warning_document = snapshot.warning(warning_area_code)
+                now = int(self.api_client.now())
+                
+                if snapshot.earthquake_list is not None:
+                    with self.metrics.blocking("intensity"):
+                        self.intensity.update(snapshot.earthquake_list, now)
+                
+                if warning_document is not None:
+                    # Large offices are processed off the event loop
+                    size = snapshot.warning_size(warning_area_code)
+                    data = await self.metrics.async_run(
+                        "process",
+                        size,
+                        self.api_client.process_warning_data,
+                        warning_document,
+                        warning_area_code,
+                        city_area_code,
                     )
-                    
-                    if data:
-                        data["information_type"] = INFO_TYPE_EARTHQUAKE
-                        return data
-                    else:
-                        return {
-                            "information_type": INFO_TYPE_EARTHQUAKE,
-                            "earthquakes": [],
-                            "count": 0,
-                            "status": "error"
-                        }
-                        
+                    grid = await self._async_level_grid(warning_area_code, warning_document, size)
+                    with self.metrics.blocking("forecast"):
+                        data["forecast"] = forecast_peak(
+                            grid,
+                            city_area_code,
+                            now,
+                            FORECAST_HORIZON,
+                        )
+                    # Without an earthquake entry nobody fetches list.json
+                    data["felt_available"] = snapshot.earthquake_list is not None
+                    data["felt_intensity"] = self.intensity.lookup(city_area_code)
+                    data["felt_count"] = self.intensity.count(city_area_code)
+                    data["information_type"] = INFO_TYPE_WEATHER_WARNING
+                    data["prefecture"] = self.entry.data.get("prefecture")
+                    data["city"] = self.entry.data.get("city")
+                    data["last_update"] = snapshot.fetched_at.isoformat()
+                    active = data["emergency_warnings"] + data["warnings"] + data["advisories"]
+                    self.feeds.async_set_urgent(
+                        self.entry.entry_id, bool(data["emergency_warnings"] or data["warnings"])
+                    )
+                    self._async_track_warnings(active)
+                    if self.history is not None:
+                        self.history.async_record_warnings(
+                            warning_area_code, active, city_area_code, snapshot.fetched_at
+                        )
+                    return data
                 else:
-                    # Get weather warning data
-                    warning_area_code = self.entry.data.get("warning_area_code")
-                    if not warning_area_code:
-                        return {
-                            "information_type": INFO_TYPE_WEATHER_WARNING,
-                            "status": "error",
-                            "warnings": []
-                        }
-                    
-                    city_area_code = self.entry.data.get("area_code")
-                    data = await api_client.get_warning_data(warning_area_code, city_area_code)
-                    
-                    if data:
-                        data["information_type"] = INFO_TYPE_WEATHER_WARNING
-                        data["prefecture"] = self.entry.data.get("prefecture")
-                        data["city"] = self.entry.data.get("city")
-                        return data
-                    else:
-                        return {
-                            "information_type": INFO_TYPE_WEATHER_WARNING,
-                            "prefecture": self.entry.data.get("prefecture"),
-                            "city": self.entry.data.get("city"),
-                            "warnings": [],
-                            "status": "error"
-                        }
+                    return {
+                        "information_type": INFO_TYPE_WEATHER_WARNING,
+                        "prefecture": self.entry.data.get("prefecture"),
+                        "city": self.entry.data.get("city"),
+                        "warnings": [],
+                        "status": "error"
+                    }
             
         except Exception as e:
             _LOGGER.error(f"Error updating disaster information: {e}")
@@ -0,0 +1,259 @@
+"""Rolling seismic activity rates from list.json.
+
+Events are folded into a ring of ACTIVITY_BUCKET-second buckets covering
+the baseline period. Counts and radiated energy are kept as running totals
+per window, so ingesting an event and advancing the clock by a bucket are
+O(1) per window. The maximum magnitude of a window is cached and only
+rescanned from the bucket maxima when the bucket holding it expires or its
+event is revised downwards.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .const import ACTIVITY_BASELINE_HOURS, ACTIVITY_BUCKET, DATA_ACTIVITY, EARTHQUAKE_TIME_RANGES
+from .records import parse_magnitude, parse_timestamp
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+def radiated_energy(magnitude: float) -> float:
+    """Return the radiated energy of an event in joules (log10 E = 1.5M + 4.8)."""
+    return 10 ** (1.5 * magnitude + 4.8)
+
+
+def energy_magnitude(energy: float) -> Optional[float]:
+    """Return the magnitude of a single event releasing the given energy."""
+    if energy <= 0:
+        return None
+    return (math.log10(energy) - 4.8) / 1.5
+
+
+@dataclass(frozen=True, slots=True)
+class ActivitySummary:
+    """Activity over a window compared with the baseline period."""
+
+    window_hours: int
+    count: int
+    max_magnitude: Optional[float]
+    energy: float  # joules
+    baseline_hours: int
+    baseline_count: int
+
+    @property
+    def rate(self) -> float:
+        """Return events per hour in the window."""
+        return self.count / self.window_hours
+
+    @property
+    def baseline_rate(self) -> float:
+        """Return events per hour over the baseline period."""
+        return self.baseline_count / self.baseline_hours
+
+    @property
+    def rate_ratio(self) -> Optional[float]:
+        """Return the window rate relative to the baseline rate."""
+        return self.rate / self.baseline_rate if self.baseline_count else None
+
+    @property
+    def energy_magnitude(self) -> Optional[float]:
+        """Return the magnitude equivalent of the window's total energy."""
+        return energy_magnitude(self.energy)
+
+
+class _Window:
+    """Running totals over the newest buckets of the ring."""
+
+    __slots__ = ("buckets", "count", "energy", "max_magnitude", "max_dirty")
+
+    def __init__(self, buckets: int) -> None:
+        self.buckets = buckets
+        self.count = 0
+        self.energy = 0.0
+        self.max_magnitude: Optional[float] = None
+        self.max_dirty = False
+
+
+class ActivityRates:
+    """Bucketed ring of event counts, energy and maxima for one magnitude floor."""
+
+    def __init__(
+        self,
+        min_magnitude: float = 0.0,
+        window_hours: Iterable[int] = (),
+        baseline_hours: int = ACTIVITY_BASELINE_HOURS,
+        bucket: int = ACTIVITY_BUCKET,
+    ) -> None:
+        """Initialize an empty ring."""
+        self.min_magnitude = min_magnitude
+        self.bucket = bucket
+        self.baseline_hours = baseline_hours
+        self.size = baseline_hours * 3600 // bucket
+        hours = set(window_hours) | {baseline_hours}
+        self._windows: Dict[int, _Window] = {
+            hour: _Window(min(self.size, max(1, hour * 3600 // bucket))) for hour in sorted(hours)
+        }
+        self._stamps: List[int] = [-1] * self.size
+        self._counts: List[int] = [0] * self.size
+        self._energy: List[float] = [0.0] * self.size
+        self._events: List[Dict[str, float]] = [{} for _ in range(self.size)]
+        self._versions: Dict[str, Tuple[str, int]] = {}
+        self._now: Optional[int] = None
+        self._last_list: Optional[Iterable[Dict[str, Any]]] = None
+
+    def update(self, earthquake_list: Iterable[Dict[str, Any]], now: int) -> None:
+        """Advance the clock and fold new or revised events of a list.json snapshot."""
+        self._advance(now // self.bucket)
+        if earthquake_list is self._last_list:
+            return
+        self._last_list = earthquake_list
+        oldest = self._now - self.size + 1
+        listed = set()
+        for entry in earthquake_list:
+            event_id = entry.get("eid")
+            version = entry.get("ctt") or entry.get("rdt") or ""
+            if not event_id:
+                continue
+            listed.add(event_id)
+            previous = self._versions.get(event_id)
+            if previous is not None and previous[0] == version:
+                continue
+            origin_ts = parse_timestamp(entry.get("at"))
+            magnitude = parse_magnitude(entry.get("mag"))
+            if origin_ts is None or origin_ts // self.bucket < oldest:
+                continue
+            # Origin times ahead of the clock count in the current bucket
+            stamp = min(origin_ts // self.bucket, self._now)
+            if previous is not None:
+                self._remove(event_id, previous[1])
+            self._versions[event_id] = (version, stamp)
+            if magnitude is not None and magnitude >= self.min_magnitude:
+                self._add(event_id, stamp, magnitude)
+
+        # Events that dropped off list.json do not come back
+        if len(self._versions) > len(listed):
+            self._versions = {event_id: self._versions[event_id] for event_id in listed if event_id in self._versions}
+
+    def summary(self, window_hours: int) -> ActivitySummary:
+        """Return the activity over a window and the baseline period."""
+        window = self._windows.get(window_hours) or self._add_window(window_hours)
+        baseline = self._windows[self.baseline_hours]
+        return ActivitySummary(
+            window_hours=window_hours,
+            count=window.count,
+            max_magnitude=self._max_magnitude(window),
+            energy=window.energy,
+            baseline_hours=self.baseline_hours,
+            baseline_count=baseline.count,
+        )
+
+    def _add_window(self, hours: int) -> _Window:
+        """Start tracking a window the ring was not built with, from the buckets it already holds."""
+        window = _Window(min(self.size, max(1, hours * 3600 // self.bucket)))
+        if self._now is not None:
+            for stamp in range(self._now - window.buckets + 1, self._now + 1):
+                slot = stamp % self.size
+                if self._stamps[slot] == stamp and self._counts[slot]:
+                    window.count += self._counts[slot]
+                    window.energy += self._energy[slot]
+            window.max_dirty = bool(window.count)
+        self._windows[hours] = window
+        return window
+
+    def _add(self, event_id: str, stamp: int, magnitude: float) -> None:
+        """Add an event to its bucket and the windows covering it."""
+        slot = stamp % self.size
+        if self._stamps[slot] != stamp:
+            self._clear_slot(slot, stamp)
+        energy = radiated_energy(magnitude)
+        self._events[slot][event_id] = magnitude
+        self._counts[slot] += 1
+        self._energy[slot] += energy
+        for window in self._windows.values():
+            if stamp > self._now - window.buckets:
+                window.count += 1
+                window.energy += energy
+                if not window.max_dirty and (window.max_magnitude is None or magnitude > window.max_magnitude):
+                    window.max_magnitude = magnitude
+
+    def _remove(self, event_id: str, stamp: int) -> None:
+        """Take a revised event out of its bucket and windows."""
+        slot = stamp % self.size
+        if self._stamps[slot] != stamp:
+            return
+        magnitude = self._events[slot].pop(event_id, None)
+        if magnitude is None:
+            return
+        energy = radiated_energy(magnitude)
+        self._counts[slot] -= 1
+        self._energy[slot] = max(0.0, self._energy[slot] - energy) if self._counts[slot] else 0.0
+        for window in self._windows.values():
+            if stamp > self._now - window.buckets:
+                self._subtract(window, 1, energy)
+                if window.max_magnitude is not None and magnitude >= window.max_magnitude:
+                    window.max_dirty = True
+
+    def _advance(self, now: int) -> None:
+        """Move the ring to a new current bucket, expiring what left each window."""
+        if self._now is None:
+            self._now = now
+            return
+        if now <= self._now:
+            return
+        for window in self._windows.values():
+            # Buckets that were in the window and are now behind it
+            last = min(self._now, now - window.buckets)
+            for stamp in range(self._now - window.buckets + 1, last + 1):
+                slot = stamp % self.size
+                if self._stamps[slot] != stamp or not self._counts[slot]:
+                    continue
+                self._subtract(window, self._counts[slot], self._energy[slot])
+                if window.max_magnitude is not None and max(self._events[slot].values()) >= window.max_magnitude:
+                    window.max_dirty = True
+        self._now = now
+
+    @staticmethod
+    def _subtract(window: _Window, count: int, energy: float) -> None:
+        """Take events out of a window's running totals."""
+        window.count -= count
+        if window.count:
+            window.energy = max(0.0, window.energy - energy)
+        else:
+            # Reset instead of accumulating rounding error
+            window.energy = 0.0
+            window.max_magnitude = None
+            window.max_dirty = False
+
+    def _clear_slot(self, slot: int, stamp: int) -> None:
+        """Reuse a slot whose bucket left the ring."""
+        self._stamps[slot] = stamp
+        self._counts[slot] = 0
+        self._energy[slot] = 0.0
+        self._events[slot] = {}
+
+    def _max_magnitude(self, window: _Window) -> Optional[float]:
+        """Return the largest magnitude in a window, rescanning its buckets if needed."""
+        if window.max_dirty:
+            best = None
+            for stamp in range(self._now - window.buckets + 1, self._now + 1):
+                slot = stamp % self.size
+                if self._stamps[slot] == stamp and self._counts[slot]:
+                    bucket_max = max(self._events[slot].values())
+                    if best is None or bucket_max > best:
+                        best = bucket_max
+            window.max_magnitude = best
+            window.max_dirty = False
+        return window.max_magnitude
+
+
+def async_get_activity_rates(hass: HomeAssistant, min_magnitude: float) -> ActivityRates:
+    """Return the shared activity rates for a magnitude floor, creating them on first use."""
+    rates: Dict[float, ActivityRates] = hass.data.setdefault(DATA_ACTIVITY, {})
+    activity = rates.get(min_magnitude)
+    if activity is None:
+        activity = ActivityRates(min_magnitude, (int(hours) for hours in EARTHQUAKE_TIME_RANGES))
+        rates[min_magnitude] = activity
+    return activity
@@ -1,19 +1,29 @@
 """API client for JMA BOSAI API."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+import sys
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import aiohttp
 import async_timeout
 
 from .const import (
+    EXECUTOR_THRESHOLD,
     JMA_BOSAI_WARNING_URL,
-    JMA_BOSAI_EARTHQUAKE_URL,
+    JMA_BOSAI_EARTHQUAKE_LIST_URL,
     WARNING_CODES,
     WARNING_SEVERITY,
 )
+from .decoder import json_loads
+from .metrics import RefreshMetrics
+from .ratelimit import Priority, RequestLimiter
+from .records import EarthquakeRecord, WarningRecord, intern, parse_magnitude, parse_timestamp
+from .replay import ReplaySource
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,25 +31,95 @@ _LOGGER = logging.getLogger(__name__)
 class JMABosaiApiClient:
     """Client for JMA BOSAI API."""
 
-    def __init__(self, session: aiohttp.ClientSession) -> None:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        metrics: Optional[RefreshMetrics] = None,
+        loads: Callable[[bytes], Any] = json_loads,
+        source: Optional[ReplaySource] = None,
+        limiter: Optional[RequestLimiter] = None,
+    ) -> None:
         """Initialize the API client."""
         self._session = session
+        self._metrics = metrics
+        self._loads = loads
+        self._source = source
+        self._limiter = limiter
 
-    async def get_warning_data(self, area_code: str, city_area_code: str = None) -> Optional[Dict[str, Any]]:
-        """Get warning data for a specific area."""
+    def _timed(self, stage: str):
+        """Return a context manager timing a stage when metrics are enabled."""
+        if self._metrics is None:
+            return nullcontext()
+        return self._metrics.time(stage)
+
+    def now(self) -> float:
+        """Return the current time, following the archive clock when replaying."""
+        if self._source is not None:
+            return self._source.now()
+        return time.time()
+
+    @property
+    def speed(self) -> float:
+        """Return how many seconds the clock of now() advances per wall second."""
+        return self._source.speed if self._source is not None else 1.0
+
+    async def fetch_json(self, url: str) -> Optional[Any]:
+        """Fetch and decode a JSON document, returning None on failure."""
+        document, _ = await self.fetch_document(url)
+        return document
+
+    async def fetch_document(
+        self, url: str, priority: Priority = Priority.ROUTINE
+    ) -> Tuple[Optional[Any], int]:
+        """Fetch and decode a JSON document, also returning the body size in bytes."""
+        if self._source is not None:
+            return await self._replay_document(url)
         try:
-            url = f"{JMA_BOSAI_WARNING_URL}/{area_code}.json"
+            if self._limiter is not None:
+                await self._limiter.acquire(priority)
             async with async_timeout.timeout(30):
                 async with self._session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._process_warning_data(data, area_code, city_area_code)
-                    else:
-                        _LOGGER.error(f"Failed to get warning data: {response.status}")
-                        return None
+                    if response.status != 200:
+                        _LOGGER.error(f"Failed to get {url}: {response.status}")
+                        return None, 0
+                    with self._timed("download"):
+                        body = await response.read()
+            if self._metrics is not None:
+                self._metrics.add_bytes(len(body))
+            return await self._decode(body), len(body)
         except Exception as e:
-            _LOGGER.error(f"Error getting warning data: {e}")
+            _LOGGER.error(f"Error getting {url}: {e}")
+            return None, 0
+
+    async def _replay_document(self, url: str) -> Tuple[Optional[Any], int]:
+        """Serve a document from the replay archive through the normal decode."""
+        try:
+            body, lag = await self._source.async_read(url)
+            if body is None:
+                return None, 0
+            if self._metrics is not None:
+                self._metrics.add_bytes(len(body))
+                if lag is not None:
+                    self._metrics.record("replay_lag", lag)
+            return await self._decode(body), len(body)
+        except Exception as e:
+            _LOGGER.error(f"Error replaying {url}: {e}")
+            return None, 0
+
+    async def _decode(self, body: bytes) -> Any:
+        """Decode a body, in an executor when it is large."""
+        if self._metrics is not None:
+            return await self._metrics.async_run("decode", len(body), self._loads, body)
+        if len(body) >= EXECUTOR_THRESHOLD:
+            return await asyncio.get_running_loop().run_in_executor(None, self._loads, body)
+        return self._loads(body)
+
+    async def get_warning_data(self, area_code: str, city_area_code: str = None) -> Optional[Dict[str, Any]]:
+        """Get warning data for a specific area."""
+        data = await self.fetch_json(f"{JMA_BOSAI_WARNING_URL}/{area_code}.json")
+        if data is None:
             return None
+        return self._process_warning_data(data, area_code, city_area_code)
 
     async def get_earthquake_data(
         self, 
@@ -47,24 +127,30 @@ class JMABosaiApiClient:
         min_magnitude: float = 0.0
     ) -> Optional[Dict[str, Any]]:
         """Get filtered earthquake data."""
-        try:
-            # Get earthquake list first
-            list_url = f"{JMA_BOSAI_EARTHQUAKE_URL}/list.json"
-            async with async_timeout.timeout(30):
-                async with self._session.get(list_url) as response:
-                    if response.status == 200:
-                        earthquake_list = await response.json()
-                        if earthquake_list:
-                            # Filter and get multiple earthquake details
-                            return await self._get_filtered_earthquakes(
-                                earthquake_list, time_range_hours, min_magnitude
-                            )
-                    else:
-                        _LOGGER.error(f"Failed to get earthquake list: {response.status}")
-                        return None
-        except Exception as e:
-            _LOGGER.error(f"Error getting earthquake data: {e}")
+        earthquake_list = await self.fetch_json(JMA_BOSAI_EARTHQUAKE_LIST_URL)
+        if not earthquake_list:
             return None
+        # Filter and get multiple earthquake details
+        return await self._get_filtered_earthquakes(
+            earthquake_list, time_range_hours, min_magnitude
+        )
+
+    def process_warning_data(
+        self, data: Optional[Dict[str, Any]], area_code: str, city_area_code: str = None
+    ) -> Dict[str, Any]:
+        """Process an already fetched warning document."""
+        return self._process_warning_data(data, area_code, city_area_code)
+
+    async def process_earthquake_list(
+        self,
+        earthquake_list: List[Dict[str, Any]],
+        time_range_hours: int = 24,
+        min_magnitude: float = 0.0
+    ) -> Dict[str, Any]:
+        """Filter an already fetched earthquake list."""
+        return await self._get_filtered_earthquakes(
+            earthquake_list or [], time_range_hours, min_magnitude
+        )
 
     async def _get_filtered_earthquakes(
         self, 
@@ -73,56 +159,37 @@ class JMABosaiApiClient:
         min_magnitude: float
     ) -> Dict[str, Any]:
         """Get filtered earthquake details using only list.json data."""
-        from datetime import datetime, timedelta
-        
         # Calculate time threshold
-        now = datetime.now()
-        time_threshold = now - timedelta(hours=time_range_hours)
+        time_threshold = int(self.now()) - time_range_hours * 3600
         
         _LOGGER.debug(f"Filtering earthquakes: time_range={time_range_hours}h, min_mag={min_magnitude}")
-        _LOGGER.debug(f"Time threshold: {time_threshold}")
         
-        filtered_earthquakes = []
+        filtered_earthquakes: List[EarthquakeRecord] = []
         
         for earthquake_info in earthquake_list:
             try:
                 # Check time filter using 'at' field (earthquake occurrence time)
-                origin_time_str = earthquake_info.get("at")
-                if origin_time_str:
-                    origin_time = datetime.fromisoformat(origin_time_str.replace('Z', '+00:00'))
-                    if origin_time.replace(tzinfo=None) < time_threshold:
-                        continue
+                origin_ts = parse_timestamp(earthquake_info.get("at"))
+                if origin_ts is not None and origin_ts < time_threshold:
+                    continue
                 
                 # Check if hypocenter (anm) exists and is not empty
                 hypocenter = earthquake_info.get("anm", "")
                 if not hypocenter:
                     continue
                 
-                # Check magnitude filter
-                magnitude_str = earthquake_info.get("mag")
-                if magnitude_str and magnitude_str != "--" and magnitude_str != "M不明":
-                    try:
-                        magnitude = float(magnitude_str)
-                        if magnitude < min_magnitude:
-                            continue
-                    except ValueError:
-                        continue
-                else:
-                    # Skip earthquakes without valid magnitude
+                # Skip earthquakes without valid magnitude
+                magnitude = parse_magnitude(earthquake_info.get("mag"))
+                if magnitude is None or magnitude < min_magnitude:
                     continue
                 
-                _LOGGER.debug(f"Earthquake passed filters: {earthquake_info.get('anm')} M{magnitude_str}")
-                
-                # Create simplified earthquake data from list.json only
-                earthquake_data = {
-                    "event_id": earthquake_info.get("eid", ""),
-                    "report_datetime": earthquake_info.get("rdt", ""),
-                    "origin_time": earthquake_info.get("at", ""),
-                    "hypocenter": earthquake_info.get("anm", ""),
-                    "magnitude": magnitude_str if magnitude_str and magnitude_str != "--" else None,
-                    "status": "地震発生"
-                }
-                filtered_earthquakes.append(earthquake_data)
+                filtered_earthquakes.append(EarthquakeRecord(
+                    event_id=earthquake_info.get("eid", ""),
+                    origin_ts=origin_ts,
+                    report_ts=parse_timestamp(earthquake_info.get("rdt")),
+                    hypocenter=intern(hypocenter),
+                    magnitude=magnitude,
+                ))
                 
                 # Limit to reasonable number
                 if len(filtered_earthquakes) >= 50:
@@ -133,40 +200,11 @@ class JMABosaiApiClient:
                 continue
         
         # Sort by origin time (newest first)
-        filtered_earthquakes.sort(
-            key=lambda x: x.get("list_occurrence_time", x.get("origin_time", "")), reverse=True
-        )
+        filtered_earthquakes.sort(key=lambda eq: eq.origin_ts or 0, reverse=True)
         
         _LOGGER.debug(f"Filtered earthquakes: {len(filtered_earthquakes)} out of {len(earthquake_list)}")
         
-        # Create recent earthquakes list (last 10 with essential info only)
-        recent_earthquakes = []
-        for eq in filtered_earthquakes[:10]:
-            hypocenter = eq.get("hypocenter", "")
-            magnitude = eq.get("magnitude", "")
-            
-            # Skip earthquakes without hypocenter or magnitude
-            if not hypocenter or not magnitude:
-                continue
-            
-            recent_eq = {
-                "report_datetime": eq.get("report_datetime", ""),
-                "hypocenter": hypocenter,
-                "magnitude": magnitude,
-                "origin_time": eq.get("origin_time", ""),
-                "event_id": eq.get("event_id", ""),
-            }
-            recent_earthquakes.append(recent_eq)
-
-        return {
-            "earthquakes": filtered_earthquakes,
-            "count": len(filtered_earthquakes),
-            "latest_earthquake": filtered_earthquakes[0] if filtered_earthquakes else None,
-            "recent_earthquakes": recent_earthquakes,
-            "time_range_hours": time_range_hours,
-            "min_magnitude": min_magnitude,
-            "status": "正常" if filtered_earthquakes else "該当なし"
-        }
+        return earthquake_result(filtered_earthquakes, time_range_hours, min_magnitude)
 
 
     def _process_warning_data(self, data: Dict[str, Any], target_area_code: str, city_area_code: str = None) -> Dict[str, Any]:
@@ -209,8 +247,6 @@ class JMABosaiApiClient:
                 area_name = area.get("name", "")
                 area_code = area.get("code", "")
                 
-                _LOGGER.debug(f"Checking area: {area_name} (code: {area_code})")
-                
                 # Check for warnings and filter by city area code if specified
                 warnings = area.get("warnings", [])
                 for warning in warnings:
@@ -234,24 +270,22 @@ class JMABosaiApiClient:
                         
                         if warning_applies:
                             # Determine warning type and severity
-                            warning_type = self._determine_warning_type(warning_code)
-                            
-                            warning_info = {
-                                "code": warning_code,
-                                "name": warning_type["name"],
-                                "severity": warning_type["severity"],
-                                "area": area_name,
-                                "area_code": area_code,
-                                "status": warning_status,
-                            }
+                            name, severity = warning_type(warning_code)
                             
-                            _LOGGER.debug(f"Found applicable warning: {warning_info}")
+                            warning_info = WarningRecord(
+                                code=intern(warning_code),
+                                name=name,
+                                severity=severity,
+                                area=intern(area_name),
+                                area_code=intern(area_code),
+                                status=intern(warning_status),
+                            )
                             
-                            if warning_type["severity"] == "特別警報":
+                            if severity == "特別警報":
                                 active_emergency_warnings.append(warning_info)
-                            elif warning_type["severity"] == "警報":
+                            elif severity == "警報":
                                 active_warnings.append(warning_info)
-                            elif warning_type["severity"] == "注意報":
+                            elif severity == "注意報":
                                 active_advisories.append(warning_info)
 
         # Update processed data
@@ -271,25 +305,36 @@ class JMABosaiApiClient:
 
         return processed_data
 
-    def _determine_warning_type(self, warning_code: str) -> Dict[str, str]:
-        """Determine warning type and severity from code."""
-        # Default values
-        warning_info = {
-            "name": f"警報コード{warning_code}",
-            "severity": "注意報"
-        }
-        
-        if warning_code in WARNING_CODES:
-            warning_name = WARNING_CODES[warning_code]
-            warning_info["name"] = warning_name
-            
-            # Determine severity based on name
-            if "特別警報" in warning_name:
-                warning_info["severity"] = "特別警報"
-            elif "警報" in warning_name:
-                warning_info["severity"] = "警報"
-            else:
-                warning_info["severity"] = "注意報"
-        
-        return warning_info
 
+@lru_cache(maxsize=None)
+def warning_type(warning_code: str) -> Tuple[str, str]:
+    """Return the interned name and severity for a warning code."""
+    warning_name = WARNING_CODES.get(warning_code)
+    if warning_name is None:
+        return sys.intern(f"警報コード{warning_code}"), "注意報"
+    
+    # Determine severity based on name
+    if "特別警報" in warning_name:
+        severity = "特別警報"
+    elif "警報" in warning_name:
+        severity = "警報"
+    else:
+        severity = "注意報"
+    return sys.intern(warning_name), severity
+
+
+def earthquake_result(
+    filtered_earthquakes: List[EarthquakeRecord], time_range_hours: int, min_magnitude: float
+) -> Dict[str, Any]:
+    """Build the coordinator data for filtered earthquakes, newest first."""
+    return {
+        "earthquakes": filtered_earthquakes,
+        "count": len(filtered_earthquakes),
+        "latest_earthquake": filtered_earthquakes[0] if filtered_earthquakes else None,
+        # Every filtered record has a hypocenter and magnitude, so the
+        # 10 most recent are a plain slice sharing the same records
+        "recent_earthquakes": filtered_earthquakes[:10],
+        "time_range_hours": time_range_hours,
+        "min_magnitude": min_magnitude,
+        "status": "正常" if filtered_earthquakes else "該当なし"
+    }
@@ -1,13 +1,19 @@
 """Area code management for JMA BOSAI API."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import aiohttp
 import async_timeout
 
-from .const import JMA_BOSAI_AREA_URL
+from .const import DATA_AREA_MANAGER, EXECUTOR_THRESHOLD, JMA_BOSAI_AREA_URL
+from .decoder import json_loads
+from .ratelimit import Priority, RequestLimiter, async_get_limiter
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,23 +21,31 @@ _LOGGER = logging.getLogger(__name__)
 class AreaManager:
     """Manages area codes and regional data from JMA BOSAI API."""
 
-    def __init__(self) -> None:
+    def __init__(self, limiter: Optional[RequestLimiter] = None) -> None:
         """Initialize the area manager."""
+        self._limiter = limiter
         self._area_data: Dict[str, Any] = {}
         self._centers: Dict[str, str] = {}
         self._offices: Dict[str, str] = {}
         self._class20s: Dict[str, str] = {}
         self._loaded = False
+        self.load_lock = asyncio.Lock()
 
     async def load_area_data(self) -> bool:
         """Load area data from JMA BOSAI API."""
         try:
+            if self._limiter is not None:
+                await self._limiter.acquire(Priority.METADATA)
             async with aiohttp.ClientSession() as session:
                 async with async_timeout.timeout(30):
                     async with session.get(JMA_BOSAI_AREA_URL) as response:
                         if response.status == 200:
-                            self._area_data = await response.json()
-                            self._process_area_data()
+                            body = await response.read()
+                            # area.json is large enough to stall the event loop
+                            if len(body) >= EXECUTOR_THRESHOLD:
+                                await asyncio.get_running_loop().run_in_executor(None, self._load_body, body)
+                            else:
+                                self._load_body(body)
                             self._loaded = True
                             _LOGGER.info("Area data loaded successfully")
                             _LOGGER.debug(f"Loaded centers: {list(self._area_data.get('centers', {}).keys())}")
@@ -43,6 +57,11 @@ class AreaManager:
             _LOGGER.error(f"Error loading area data: {e}")
             return False
 
+    def _load_body(self, body: bytes) -> None:
+        """Decode and process an area.json body."""
+        self._area_data = json_loads(body)
+        self._process_area_data()
+
     def _process_area_data(self) -> None:
         """Process the raw area data into usable dictionaries."""
         if not self._area_data:
@@ -135,6 +154,30 @@ class AreaManager:
 
         return class20s
 
+    def get_office_hierarchy(self, office_code: str) -> List[Tuple[str, str, List[str]]]:
+        """Get (class10 code, class10 name, class20 codes) for each class10 of an office."""
+        if not self._loaded:
+            return []
+
+        class10s = self._area_data.get("class10s", {})
+        class15s = self._area_data.get("class15s", {})
+        class20s = self._area_data.get("class20s", {})
+        office_info = self._area_data.get("offices", {}).get(office_code, {})
+
+        hierarchy = []
+        for class10_code in office_info.get("children", []):
+            class10_info = class10s.get(class10_code, {})
+            children = []
+            for child_code in class10_info.get("children", []):
+                if child_code in class15s:
+                    children.extend(
+                        code for code in class15s[child_code].get("children", []) if code in class20s
+                    )
+                elif child_code in class20s:
+                    children.append(child_code)
+            hierarchy.append((class10_code, class10_info.get("name", ""), children))
+        return hierarchy
+
     def get_area_name(self, area_code: str) -> Optional[str]:
         """Get area name for a specific area code."""
         if not self._loaded:
@@ -224,7 +267,39 @@ class AreaManager:
         class20s = self._area_data.get("class20s", {})
         return class20s.get(class20_code)
 
+    def get_class20_location(self, class20_code: str) -> Optional[Dict[str, str]]:
+        """Get the center, office and names of a class20 area, as chosen in the config flow."""
+        class20_info = self.get_class20_info(class20_code)
+        office_code = self.get_warning_area_code(class20_code)
+        if not class20_info or not office_code:
+            return None
+
+        office_info = self._area_data.get("offices", {}).get(office_code, {})
+        center_code = office_info.get("parent", "")
+        center_info = self._area_data.get("centers", {}).get(center_code, {})
+        return {
+            "center_code": center_code,
+            "center": center_info.get("name", ""),
+            "office_code": office_code,
+            "prefecture": office_info.get("name", ""),
+            "area_code": class20_code,
+            "city": class20_info.get("name", ""),
+        }
+
     @property
     def is_loaded(self) -> bool:
         """Check if area data is loaded."""
-        return self._loaded
\ No newline at end of file
+        return self._loaded
+
+
+async def async_get_area_manager(hass: HomeAssistant) -> AreaManager:
+    """Return the shared area manager, loading area.json on first use."""
+    manager: AreaManager | None = hass.data.get(DATA_AREA_MANAGER)
+    if manager is None:
+        manager = AreaManager(async_get_limiter(hass))
+        hass.data[DATA_AREA_MANAGER] = manager
+    if not manager.is_loaded:
+        async with manager.load_lock:
+            if not manager.is_loaded:
+                await manager.load_area_data()
+    return manager
@@ -2,15 +2,23 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timedelta
 from typing import Any
 
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, INFO_TYPE_EARTHQUAKE, INFO_TYPE_WEATHER_WARNING
+from .const import (
+    DOMAIN,
+    EARTHQUAKE_DETECTION_WINDOW,
+    INFO_TYPE_EARTHQUAKE,
+    INFO_TYPE_WEATHER_WARNING,
+)
 from .area_mapping import get_entity_prefix, get_english_name
 
 _LOGGER = logging.getLogger(__name__)
@@ -30,8 +38,11 @@ async def async_setup_entry(
     entities = []
     
     if information_type == INFO_TYPE_EARTHQUAKE:
-        # Create earthquake binary sensor
-        entities.append(DisasterEarthquakeBinarySensor(coordinator, config_entry))
+        # Create earthquake binary sensors
+        entities.extend([
+            DisasterEarthquakeBinarySensor(coordinator, config_entry),
+            DisasterEarthquakeSwarmBinarySensor(coordinator, config_entry),
+        ])
     else:
         # Create warning binary sensors
         entities.extend([
@@ -72,7 +83,7 @@ class DisasterSpecialWarningBinarySensor(CoordinatorEntity, BinarySensorEntity):
         
         emergency_warnings = self.coordinator.data.get("emergency_warnings", [])
         
-        types = [w.get("name", "不明") for w in emergency_warnings]
+        types = [w.name for w in emergency_warnings]
         
         return {
             "warning_types": types,
@@ -117,8 +128,8 @@ class DisasterWarningBinarySensor(CoordinatorEntity, BinarySensorEntity):
         emergency_warnings = self.coordinator.data.get("emergency_warnings", [])
         
         types = []
-        types.extend([w.get("name", "不明") for w in warnings])
-        types.extend([w.get("name", "不明") for w in emergency_warnings])
+        types.extend([w.name for w in warnings])
+        types.extend([w.name for w in emergency_warnings])
         
         return {
             "warning_types": types,
@@ -160,7 +171,7 @@ class DisasterAdvisoryBinarySensor(CoordinatorEntity, BinarySensorEntity):
         
         advisories = self.coordinator.data.get("advisories", [])
         
-        types = [w.get("name", "不明") for w in advisories]
+        types = [w.name for w in advisories]
         
         return {
             "warning_types": types,
@@ -183,35 +194,68 @@ class DisasterEarthquakeBinarySensor(CoordinatorEntity, BinarySensorEntity):
         self._attr_name = "Earthquake Detection"
         self._attr_unique_id = "earthquake_detection"
         self._attr_device_class = BinarySensorDeviceClass.SAFETY
-        self._last_earthquake_time = None
+        self._last_earthquake_ts: int | None = None
+        self._expires_at: datetime | None = None
+        self._unsub_expiry: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Schedule the expiry of an already active earthquake."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancel_expiry)
+        self._update_expiry()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Re-evaluate the detection window when new data arrives."""
+        self._update_expiry()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _update_expiry(self) -> None:
+        """Schedule the end of the window for the latest origin time."""
+        latest_earthquake = (self.coordinator.data or {}).get("latest_earthquake")
+        origin_ts = latest_earthquake.origin_ts if latest_earthquake else None
+
+        if origin_ts == self._last_earthquake_ts:
+            return
+
+        self._last_earthquake_ts = origin_ts
+        self._cancel_expiry()
+        self._expires_at = None
+
+        if origin_ts is None:
+            return
+
+        # Consider earthquake "active" for the detection window after occurrence
+        # The clock of a replayed archive runs ahead of the wall clock by its speed
+        api_client = self.coordinator.api_client
+        remaining = origin_ts + EARTHQUAKE_DETECTION_WINDOW * 60 - api_client.now()
+        self._expires_at = dt_util.utcnow() + timedelta(seconds=remaining / api_client.speed)
+        if self._expires_at > dt_util.utcnow():
+            self._unsub_expiry = async_track_point_in_utc_time(
+                self.hass, self._handle_expiry, self._expires_at
+            )
+
+    @callback
+    def _handle_expiry(self, now: datetime) -> None:
+        """Turn the sensor off exactly when the detection window ends."""
+        self._unsub_expiry = None
+        self.async_write_ha_state()
+
+    @callback
+    def _cancel_expiry(self) -> None:
+        """Cancel a pending expiry callback."""
+        if self._unsub_expiry is not None:
+            self._unsub_expiry()
+            self._unsub_expiry = None
 
     @property
     def is_on(self) -> bool:
         """Return true if earthquake is detected."""
-        if not self.coordinator.data:
-            return False
-        
-        latest_earthquake = self.coordinator.data.get("latest_earthquake")
-        if not latest_earthquake:
+        if not self.coordinator.data or self._expires_at is None:
             return False
-        
-        # Check if there's a new earthquake (within last 30 minutes)
-        origin_time = latest_earthquake.get("origin_time")
-        if origin_time:
-            try:
-                from datetime import datetime, timedelta
-                earthquake_time = datetime.fromisoformat(origin_time.replace('Z', '+00:00'))
-                now = datetime.now()
-                
-                # Consider earthquake "active" for 30 minutes after occurrence
-                time_diff = now - earthquake_time.replace(tzinfo=None)
-                return time_diff <= timedelta(minutes=30)
-                
-            except Exception as e:
-                _LOGGER.warning(f"Error parsing earthquake time: {e}")
-                return False
-        
-        return False
+
+        return dt_util.utcnow() < self._expires_at
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -229,9 +273,9 @@ class DisasterEarthquakeBinarySensor(CoordinatorEntity, BinarySensorEntity):
         
         if latest_earthquake:
             attributes.update({
-                "latest_earthquake_time": latest_earthquake.get("origin_time", ""),
-                "latest_hypocenter": latest_earthquake.get("hypocenter", ""),
-                "latest_magnitude": latest_earthquake.get("magnitude", ""),
+                "latest_earthquake_time": latest_earthquake.origin_time,
+                "latest_hypocenter": latest_earthquake.hypocenter,
+                "latest_magnitude": f"{latest_earthquake.magnitude:.1f}",
             })
         
         return attributes
@@ -239,4 +283,37 @@ class DisasterEarthquakeBinarySensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def icon(self) -> str:
         """Return the icon for the binary sensor."""
-        return "mdi:earth" if self.is_on else "mdi:earth-off"
\ No newline at end of file
+        return "mdi:earth" if self.is_on else "mdi:earth-off"
+
+
+class DisasterEarthquakeSwarmBinarySensor(CoordinatorEntity, BinarySensorEntity):
+    """On while a hypocenter region has more events than the swarm threshold."""
+
+    def __init__(self, coordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        self._attr_name = "Earthquake Swarm"
+        self._attr_unique_id = f"{config_entry.entry_id}_earthquake_swarm"
+
+    @property
+    def is_on(self) -> bool:
+        """Return true if any region is in a swarm."""
+        return bool((self.coordinator.data or {}).get("swarms"))
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the swarming regions, busiest first."""
+        if not self.coordinator.data:
+            return {}
+        return {
+            "swarms": [swarm.as_dict() for swarm in self.coordinator.data.get("swarms", [])],
+            "threshold": self.coordinator.data.get("swarm_threshold"),
+            "time_range_hours": self.coordinator.data.get("time_range_hours", 24),
+            "min_magnitude": self.coordinator.data.get("min_magnitude", 0.0),
+        }
+
+    @property
+    def icon(self) -> str:
+        """Return the icon for the binary sensor."""
+        return "mdi:chart-scatter-plot" if self.is_on else "mdi:earth"
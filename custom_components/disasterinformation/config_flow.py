@@ -6,7 +6,7 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 import aiohttp
 
@@ -25,21 +25,41 @@ from .const import (
     CONF_UPDATE_INTERVAL,
     CONF_EARTHQUAKE_MIN_MAGNITUDE,
     CONF_EARTHQUAKE_TIME_RANGE,
+    CONF_SWARM_THRESHOLD,
+    CONF_USE_HOME_LOCATION,
+    DEFAULT_SWARM_THRESHOLD,
     DEFAULT_UPDATE_INTERVAL,
     MIN_UPDATE_INTERVAL,
     INFO_TYPE_WEATHER_WARNING,
     INFO_TYPE_EARTHQUAKE,
 )
 from .area_manager import AreaManager
+from .geo import async_get_boundary_index
+from .ratelimit import async_get_limiter
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def earthquake_entry_title(time_range: str, min_magnitude: str) -> str:
+    """Return the entry title describing the earthquake filters."""
+    time_range_label = EARTHQUAKE_TIME_RANGES.get(time_range, "過去24時間")
+    magnitude_label = EARTHQUAKE_MIN_MAGNITUDES.get(min_magnitude, "すべて")
+    return f"地震情報（{time_range_label}・{magnitude_label}）"
+
+
 class DisasterInformationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for 気象庁防災情報."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> DisasterInformationOptionsFlow:
+        """Return the options flow."""
+        return DisasterInformationOptionsFlow(config_entry)
+
     def __init__(self) -> None:
         """Initialize config flow."""
         self._information_type: str | None = None
@@ -66,8 +86,8 @@ class DisasterInformationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 # Go to earthquake configuration
                 return await self.async_step_earthquake_config()
             else:
-                # Proceed to region selection for weather warnings
-                return await self.async_step_region()
+                # Offer the area at the home location, or select it by region
+                return await self.async_step_location()
 
         data_schema = vol.Schema({
             vol.Required(CONF_INFORMATION_TYPE): vol.In(INFORMATION_TYPES)
@@ -100,6 +120,39 @@ class DisasterInformationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_location(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Offer the area containing Home Assistant's configured location."""
+        if user_input is not None:
+            if user_input[CONF_USE_HOME_LOCATION]:
+                return await self.async_step_final()
+            return await self.async_step_region()
+
+        location = await self._async_home_location()
+        if location is None:
+            return await self.async_step_region()
+
+        self._region = next(
+            (name for name, code in REGION_CODES.items() if code == location["center_code"]),
+            location["center"],
+        )
+        self._region_code = location["center_code"]
+        self._prefecture = location["prefecture"]
+        self._prefecture_code = location["office_code"]
+        self._city = location["city"]
+        self._area_code = location["area_code"]
+
+        data_schema = vol.Schema({
+            vol.Required(CONF_USE_HOME_LOCATION, default=True): bool
+        })
+
+        return self.async_show_form(
+            step_id="location",
+            data_schema=data_schema,
+            description_placeholders={"prefecture": self._prefecture, "city": self._city},
+        )
+
     async def async_step_earthquake_config(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -137,7 +190,7 @@ class DisasterInformationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         # Initialize area manager if not already done
         if not self._area_manager:
-            self._area_manager = AreaManager()
+            self._area_manager = AreaManager(async_get_limiter(self.hass))
             if not await self._area_manager.load_area_data():
                 errors["base"] = "cannot_connect"
                 return self.async_show_form(
@@ -225,10 +278,9 @@ class DisasterInformationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # Create config entry based on information type
             if self._information_type == INFO_TYPE_EARTHQUAKE:
                 # Earthquake info with filters
-                time_range_label = EARTHQUAKE_TIME_RANGES.get(self._earthquake_time_range, "過去24時間")
-                magnitude_label = EARTHQUAKE_MIN_MAGNITUDES.get(self._earthquake_min_magnitude, "すべて")
-                
-                title = f"地震情報（{time_range_label}・{magnitude_label}）"
+                title = earthquake_entry_title(
+                    self._earthquake_time_range, self._earthquake_min_magnitude
+                )
                 
                 return self.async_create_entry(
                     title=title,
@@ -274,6 +326,24 @@ class DisasterInformationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def _async_home_location(self) -> dict[str, str] | None:
+        """Resolve the class20 area at Home Assistant's location."""
+        index = await async_get_boundary_index(self.hass)
+        if index is None:
+            return None
+
+        area_code = index.lookup(self.hass.config.latitude, self.hass.config.longitude)
+        if area_code is None:
+            _LOGGER.debug("Home location is outside every indexed area")
+            return None
+
+        if not self._area_manager:
+            self._area_manager = AreaManager(async_get_limiter(self.hass))
+            if not await self._area_manager.load_area_data():
+                self._area_manager = None
+                return None
+        return self._area_manager.get_class20_location(area_code)
+
     async def _get_offices_for_region(self) -> dict[str, str]:
         """Get prefectures for the selected region."""
         if not self._area_manager or not self._region_code:
@@ -283,4 +353,61 @@ class DisasterInformationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         _LOGGER.debug(f"Getting offices for region code: {self._region_code}")
         offices = self._area_manager.get_offices_for_center(self._region_code)
         _LOGGER.debug(f"Retrieved {len(offices)} offices: {list(offices.keys())}")
-        return offices
\ No newline at end of file
+        return offices
+
+
+class DisasterInformationOptionsFlow(config_entries.OptionsFlow):
+    """Change the update interval and earthquake filters of an entry."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        # Not self.config_entry: the base class only provides that from 2024.11
+        # and assigning it is deprecated there
+        self._entry = config_entry
+
+    def _current(self, key: str, default: Any) -> Any:
+        """Return the current value of a setting."""
+        return self._entry.options.get(key, self._entry.data.get(key, default))
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the options step."""
+        is_earthquake = self._entry.data.get(CONF_INFORMATION_TYPE) == INFO_TYPE_EARTHQUAKE
+
+        if user_input is not None:
+            if is_earthquake:
+                title = earthquake_entry_title(
+                    user_input[CONF_EARTHQUAKE_TIME_RANGE], user_input[CONF_EARTHQUAKE_MIN_MAGNITUDE]
+                )
+                if title != self._entry.title:
+                    # Update the title with the options so the update listener fires once;
+                    # finishing the flow below then finds the options unchanged
+                    self.hass.config_entries.async_update_entry(
+                        self._entry, title=title, options=user_input
+                    )
+            return self.async_create_entry(title="", data=user_input)
+
+        schema: dict[Any, Any] = {
+            vol.Optional(
+                CONF_UPDATE_INTERVAL,
+                default=self._current(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=MIN_UPDATE_INTERVAL)),
+        }
+        if is_earthquake:
+            schema.update({
+                vol.Optional(
+                    CONF_EARTHQUAKE_TIME_RANGE,
+                    default=self._current(CONF_EARTHQUAKE_TIME_RANGE, "24"),
+                ): vol.In(EARTHQUAKE_TIME_RANGES),
+                vol.Optional(
+                    CONF_EARTHQUAKE_MIN_MAGNITUDE,
+                    default=self._current(CONF_EARTHQUAKE_MIN_MAGNITUDE, "0"),
+                ): vol.In(EARTHQUAKE_MIN_MAGNITUDES),
+                vol.Optional(
+                    CONF_SWARM_THRESHOLD,
+                    default=self._current(CONF_SWARM_THRESHOLD, DEFAULT_SWARM_THRESHOLD),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            })
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
@@ -1,18 +1,115 @@
 """Constants for the 気象庁防災情報 integration."""
+import os
 
 DOMAIN = "disasterinformation"
 
-# JMA BOSAI API URLs
-JMA_BOSAI_BASE_URL = "https://www.jma.go.jp/bosai"
+# JMA BOSAI API URLs (the base can be overridden to point at a local stand-in server)
+JMA_BOSAI_BASE_URL = os.environ.get("JMA_BOSAI_BASE_URL", "https://www.jma.go.jp/bosai").rstrip("/")
 JMA_BOSAI_AREA_URL = f"{JMA_BOSAI_BASE_URL}/common/const/area.json"
 JMA_BOSAI_WARNING_URL = f"{JMA_BOSAI_BASE_URL}/warning/data/warning"
 JMA_BOSAI_EARTHQUAKE_URL = f"{JMA_BOSAI_BASE_URL}/quake/data"
+JMA_BOSAI_EARTHQUAKE_LIST_URL = f"{JMA_BOSAI_EARTHQUAKE_URL}/list.json"
 JMA_BOSAI_INFORMATION_URL = f"{JMA_BOSAI_BASE_URL}/information/data/information.json"
 
+# Replay of a recorded archive in place of the network (see replay.py)
+JMA_BOSAI_REPLAY_ARCHIVE = os.environ.get("JMA_BOSAI_REPLAY_ARCHIVE")
+JMA_BOSAI_REPLAY_SPEED = float(os.environ.get("JMA_BOSAI_REPLAY_SPEED", "1"))
+DATA_REPLAY_SOURCE = f"{DOMAIN}_replay_source"
+
 # Default configuration
 DEFAULT_UPDATE_INTERVAL = 10  # minutes
 MIN_UPDATE_INTERVAL = 5  # minutes
 
+# Unified feed fetch cycle
+FEED_SNAPSHOT_MAX_AGE = 60  # seconds
+DATA_FEEDS = f"{DOMAIN}_feeds"
+
+# Staggered refresh scheduling
+REFRESH_ALIGN_WINDOW = 5  # seconds, spread of entries sharing a document
+REFRESH_JITTER = 2  # seconds
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+# Refresh timing instrumentation
+METRICS_WINDOW = 200  # samples per stage
+
+# Shared outbound request budget (see ratelimit.py)
+REQUEST_RATE = 2.0  # requests per second
+REQUEST_BURST = 10  # requests
+DATA_LIMITER = f"{DOMAIN}_limiter"
+
+# Payloads at least this large are decoded and processed in an executor
+EXECUTOR_THRESHOLD = 64 * 1024  # bytes
+
+# Offline class20 lookup by coordinates (see geo.py)
+# Kept in the config directory, which integration updates leave alone
+BOUNDARY_DATA_FILE = f"{DOMAIN}_class20_boundaries.npz"
+BOUNDARY_CELL_SIZE = 0.05  # degrees
+SERVICE_RESOLVE_AREAS = "resolve_areas"
+DATA_BOUNDARY_INDEX = f"{DOMAIN}_boundary_index"
+
+# Profiling service
+SERVICE_PROFILE = "profile"
+PROFILE_TARGET_REFRESH = "refresh"
+PROFILE_TARGET_AREA_DATA = "area_data"
+PROFILE_TOP_FUNCTIONS = 50
+PROFILE_TOP_ALLOCATIONS = 25
+PROFILE_TRACEMALLOC_FRAMES = 10
+DATA_PROFILER = f"{DOMAIN}_profiler"
+
+# History store
+SERVICE_QUERY_HISTORY = "query_history"
+HISTORY_KIND_EARTHQUAKES = "earthquakes"
+HISTORY_KIND_WARNINGS = "warnings"
+HISTORY_FLUSH_INTERVAL = 30  # seconds
+HISTORY_BATCH_SIZE = 500  # pending rows before an early flush
+HISTORY_RETENTION_DAYS = 400
+HISTORY_QUERY_LIMIT = 100
+DATA_HISTORY = f"{DOMAIN}_history"
+
+# Earthquake detection window
+EARTHQUAKE_DETECTION_WINDOW = 30  # minutes
+
+# Earthquake fast lane
+EARTHQUAKE_WATCH_INTERVAL = 5  # seconds
+EARTHQUAKE_WATCH_TIMEOUT = 10  # seconds
+SIGNAL_EARTHQUAKE_LIST_UPDATED = f"{DOMAIN}_earthquake_list_updated"
+DATA_QUAKE_WATCHER = f"{DOMAIN}_quake_watcher"
+
+# Warning transition events
+EVENT_WARNING_ISSUED = f"{DOMAIN}_warning_issued"
+EVENT_WARNING_UPGRADED = f"{DOMAIN}_warning_upgraded"
+EVENT_WARNING_LIFTED = f"{DOMAIN}_warning_lifted"
+
+# Office rollup
+DATA_AREA_MANAGER = f"{DOMAIN}_area_manager"
+DATA_OFFICE_ROLLUPS = f"{DOMAIN}_office_rollups"
+SIGNAL_OFFICE_ROLLUP_OWNER = f"{DOMAIN}_office_rollup_owner_{{}}"  # formatted with the entry id
+
+# Forecast warning levels
+FORECAST_HORIZON = 24  # hours
+DATA_LEVEL_GRIDS = f"{DOMAIN}_level_grids"
+
+# Seismic intensity felt per municipality
+INTENSITY_WINDOW = 24  # hours
+DATA_INTENSITY_INDEX = f"{DOMAIN}_intensity_index"
+
+# Rolling seismic activity rates (see activity.py)
+ACTIVITY_BUCKET = 600  # seconds
+ACTIVITY_BASELINE_HOURS = 168
+DATA_ACTIVITY = f"{DOMAIN}_activity"
+
+# Earthquake swarms: more than the threshold of events in one hypocenter region (see swarm.py)
+DEFAULT_SWARM_THRESHOLD = 5  # events within the time range
+EVENT_SWARM_DETECTED = f"{DOMAIN}_swarm_detected"
+DATA_HYPOCENTER_INDEXES = f"{DOMAIN}_hypocenter_indexes"
+
+# Websocket delta subscriptions for dashboards (see websocket_api.py)
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+DATA_SUBSCRIPTIONS = f"{DOMAIN}_subscriptions"
+
+# JMA timestamps are published in Japan Standard Time
+JMA_TIMEZONE = "Asia/Tokyo"
+
 # Entity names
 ENTITY_NAME_WARNING = "Weather Alert"
 ENTITY_NAME_EARTHQUAKE = "Earthquake Information"
@@ -24,6 +121,7 @@ CONF_PREFECTURE = "prefecture"
 CONF_CITY = "city"
 CONF_AREA_CODE = "area_code"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_USE_HOME_LOCATION = "use_home_location"
 
 # Information types
 INFO_TYPE_WEATHER_WARNING = "weather_warning"
@@ -38,6 +136,7 @@ INFORMATION_TYPES = {
 # Earthquake configuration
 CONF_EARTHQUAKE_MIN_MAGNITUDE = "earthquake_min_magnitude"
 CONF_EARTHQUAKE_TIME_RANGE = "earthquake_time_range"
+CONF_SWARM_THRESHOLD = "swarm_threshold"
 
 # Earthquake filter options
 EARTHQUAKE_TIME_RANGES = {
@@ -0,0 +1,27 @@
+"""JSON decoding for JMA BOSAI payloads.
+
+Bodies are read once as bytes and decoded with orjson when it is installed
+(Home Assistant ships it), falling back to the standard library otherwise.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def stdlib_loads(data: bytes | str) -> Any:
+    """Decode JSON with the standard library."""
+    return json.loads(data)
+
+
+if orjson is not None:
+    DECODER_NAME = "orjson"
+    json_loads: Callable[[bytes | str], Any] = orjson.loads
+else:
+    DECODER_NAME = "json"
+    json_loads = stdlib_loads
@@ -0,0 +1,108 @@
+"""Snapshots and deltas of an entry's warnings and recent earthquakes."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional
+
+from .const import INFO_TYPE_EARTHQUAKE, INFO_TYPE_WEATHER_WARNING
+from .records import EarthquakeRecord, WarningRecord
+from .transitions import WarningKey, diff_warnings, index_warnings
+
+
+class EntryState:
+    """The warnings or recent earthquakes last published for one entry.
+
+    update() diffs coordinator data against what was last published and
+    returns only the change, so a subscriber's traffic and rendering work
+    follow what changed rather than the size of the state.
+    """
+
+    def __init__(self, information_type: str = INFO_TYPE_WEATHER_WARNING) -> None:
+        """Initialize an empty state."""
+        self.information_type = information_type
+        self._warnings: Dict[WarningKey, WarningRecord] = {}
+        self._earthquakes: Dict[str, EarthquakeRecord] = {}
+        self._count = 0
+        self._last_data: Optional[Mapping[str, Any]] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the full state, sent once when a subscriber joins."""
+        if self.information_type == INFO_TYPE_EARTHQUAKE:
+            return {
+                "type": "snapshot",
+                "information_type": self.information_type,
+                "count": self._count,
+                "earthquakes": [record.as_dict() for record in self._earthquakes.values()],
+            }
+        return {
+            "type": "snapshot",
+            "information_type": self.information_type,
+            "warnings": [warning.as_dict() for warning in self._warnings.values()],
+        }
+
+    def update(self, data: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Take new coordinator data and return the delta, or None if nothing changed.
+
+        Failed refreshes keep the last good state, so an outage does not
+        read as every warning being lifted and issued again.
+        """
+        if not data or data is self._last_data or data.get("status") == "error":
+            return None
+        self._last_data = data
+        if self.information_type == INFO_TYPE_EARTHQUAKE:
+            return self._update_earthquakes(data)
+        return self._update_warnings(data)
+
+    def _update_warnings(self, data: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Diff the active warnings by (area_code, code), including status changes."""
+        active = index_warnings(
+            data.get("emergency_warnings", []) + data.get("warnings", []) + data.get("advisories", [])
+        )
+        previous = self._warnings
+        delta = diff_warnings(previous, active)
+        # Warnings still in force whose status moved on (発表 -> 継続)
+        updated = [
+            warning for key, warning in active.items()
+            if (old := previous.get(key)) is not None and old != warning
+        ]
+        self._warnings = active
+        if not delta and not updated:
+            return None
+        return {
+            "type": "delta",
+            "issued": [warning.as_dict() for warning in delta.issued],
+            "upgraded": [
+                {
+                    **new.as_dict(),
+                    "previous_code": old.code,
+                    "previous_name": old.name,
+                    "previous_severity": old.severity,
+                }
+                for old, new in delta.upgraded
+            ],
+            "updated": [warning.as_dict() for warning in updated],
+            "lifted": [warning.as_dict() for warning in delta.lifted],
+        }
+
+    def _update_earthquakes(self, data: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Diff the recent earthquakes by event id; revised reports count as added."""
+        recent: Dict[str, EarthquakeRecord] = {
+            record.event_id: record for record in data.get("recent_earthquakes", [])
+        }
+        count = data.get("count", len(recent))
+        previous = self._earthquakes
+        added: List[EarthquakeRecord] = [
+            record for event_id, record in recent.items()
+            if (old := previous.get(event_id)) is not record and old != record
+        ]
+        removed = [event_id for event_id in previous if event_id not in recent]
+        changed = bool(added or removed or count != self._count)
+        self._earthquakes = recent
+        self._count = count
+        if not changed:
+            return None
+        return {
+            "type": "delta",
+            "count": count,
+            "added": [record.as_dict() for record in added],
+            "removed": removed,
+        }
@@ -0,0 +1,47 @@
+"""Diagnostics support for 気象庁防災情報."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    feeds = coordinator.feeds
+    snapshot = feeds.snapshot
+
+    snapshot_info = None
+    if snapshot is not None:
+        snapshot_info = {
+            "fetched_at": snapshot.fetched_at.isoformat(),
+            "duration": snapshot.duration,
+            "feeds": {
+                url: document is not None for url, document in snapshot.documents.items()
+            },
+            "sizes": snapshot.sizes,
+        }
+
+    return {
+        "entry": {
+            "title": entry.title,
+            "data": dict(entry.data),
+        },
+        "coordinator": {
+            "update_interval": coordinator.refresh_interval.total_seconds(),
+            "refresh_group": coordinator.refresh_group,
+            "refresh_phase": coordinator.scheduler.phase(entry.entry_id),
+            "last_update_success": coordinator.last_update_success,
+            "status": (coordinator.data or {}).get("status"),
+        },
+        "refresh_timing": coordinator.metrics.as_dict(),
+        "feed_timing": feeds.metrics.as_dict(),
+        "request_limiter": feeds.limiter.as_dict(),
+        "snapshot": snapshot_info,
+    }
@@ -0,0 +1,268 @@
+"""Unified fetch cycle for the JMA BOSAI feeds."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+
+from .api import JMABosaiApiClient
+from .const import (
+    DATA_FEEDS,
+    DATA_REPLAY_SOURCE,
+    FEED_SNAPSHOT_MAX_AGE,
+    JMA_BOSAI_EARTHQUAKE_LIST_URL,
+    JMA_BOSAI_WARNING_URL,
+    SIGNAL_EARTHQUAKE_LIST_UPDATED,
+)
+from .metrics import RefreshMetrics, create_trace_config
+from .quake_columns import QuakeColumns
+from .ratelimit import Priority, async_get_limiter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def warning_url(office_code: str) -> str:
+    """Return the warning document URL for an office."""
+    return f"{JMA_BOSAI_WARNING_URL}/{office_code}.json"
+
+
+@dataclass(frozen=True)
+class FeedSnapshot:
+    """Consistent set of documents fetched in one cycle, keyed by URL."""
+
+    fetched_at: datetime
+    documents: Dict[str, Any] = field(default_factory=dict)
+    duration: float = 0.0
+    sizes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def feeds(self) -> FrozenSet[str]:
+        """Return the URLs covered by this snapshot."""
+        return frozenset(self.documents)
+
+    def warning(self, office_code: str) -> Optional[Dict[str, Any]]:
+        """Return the warning document for an office."""
+        return self.documents.get(warning_url(office_code))
+
+    def warning_size(self, office_code: str) -> int:
+        """Return the body size of the warning document for an office in bytes."""
+        return self.sizes.get(warning_url(office_code), 0)
+
+    @property
+    def earthquake_list(self) -> Optional[List[Dict[str, Any]]]:
+        """Return the earthquake list."""
+        return self.documents.get(JMA_BOSAI_EARTHQUAKE_LIST_URL)
+
+
+class FeedManager:
+    """Fetch the configured feeds in parallel and share the snapshot across entries.
+
+    Every feed has its own age, so an entry refreshing on its own phase only
+    fetches the feeds it needs that are stale, and joins fetches already in
+    flight for the others.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the feed manager."""
+        self._hass = hass
+        self.metrics = RefreshMetrics()
+        session = async_create_clientsession(
+            hass, trace_configs=[create_trace_config(self.metrics)]
+        )
+        self.limiter = async_get_limiter(hass)
+        self._api_client = JMABosaiApiClient(
+            session,
+            self.metrics,
+            source=hass.data.get(DATA_REPLAY_SOURCE),
+            limiter=self.limiter,
+        )
+        self._registrations: Dict[str, Dict[str, float]] = {}
+        self._snapshot: Optional[FeedSnapshot] = None
+        self._fetched: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._urgent: Set[str] = set()
+        self._columns: Optional[Tuple[List[Dict[str, Any]], asyncio.Task]] = None
+        self._unsub_dispatcher: CALLBACK_TYPE | None = None
+
+    @property
+    def snapshot(self) -> Optional[FeedSnapshot]:
+        """Return the latest snapshot."""
+        return self._snapshot
+
+    @property
+    def feeds(self) -> FrozenSet[str]:
+        """Return the union of all registered feed URLs."""
+        feeds: Set[str] = set()
+        for entry_feeds in self._registrations.values():
+            feeds.update(entry_feeds)
+        return frozenset(feeds)
+
+    @callback
+    def async_register(
+        self,
+        entry_id: str,
+        warning_office: Optional[str] = None,
+        earthquakes: bool = False,
+    ) -> CALLBACK_TYPE:
+        """Register the feeds an entry needs and return an unregister callback."""
+        feeds: Dict[str, float] = {}
+        if warning_office:
+            feeds[warning_url(warning_office)] = FEED_SNAPSHOT_MAX_AGE
+        if earthquakes:
+            feeds[JMA_BOSAI_EARTHQUAKE_LIST_URL] = FEED_SNAPSHOT_MAX_AGE
+        self._registrations[entry_id] = feeds
+
+        if self._unsub_dispatcher is None:
+            self._unsub_dispatcher = async_dispatcher_connect(
+                self._hass, SIGNAL_EARTHQUAKE_LIST_UPDATED, self._async_handle_earthquake_list
+            )
+
+        @callback
+        def _unregister() -> None:
+            self._registrations.pop(entry_id, None)
+            self._urgent.discard(entry_id)
+            self._async_drop_unregistered()
+            if not self._registrations and self._unsub_dispatcher is not None:
+                self._unsub_dispatcher()
+                self._unsub_dispatcher = None
+
+        return _unregister
+
+    @callback
+    def _async_drop_unregistered(self) -> None:
+        """Drop documents no entry registers any more, so nobody reads them stale."""
+        if self._snapshot is None:
+            return
+        feeds = self.feeds
+        if self._snapshot.feeds <= feeds:
+            return
+        self._snapshot = replace(
+            self._snapshot,
+            documents={url: document for url, document in self._snapshot.documents.items() if url in feeds},
+            sizes={url: size for url, size in self._snapshot.sizes.items() if url in feeds},
+        )
+
+    @callback
+    def async_set_urgent(self, entry_id: str, urgent: bool) -> None:
+        """Mark whether an entry has a warning in force, raising the priority of its office."""
+        if urgent:
+            self._urgent.add(entry_id)
+        else:
+            self._urgent.discard(entry_id)
+
+    def _priority(self, url: str) -> Priority:
+        """Return the request class of a feed."""
+        for entry_id in self._urgent:
+            if url in self._registrations.get(entry_id, ()) and url.startswith(JMA_BOSAI_WARNING_URL):
+                return Priority.EMERGENCY
+        return Priority.ROUTINE
+
+    @callback
+    def _async_handle_earthquake_list(self, earthquake_list: List[Dict[str, Any]]) -> None:
+        """Fold a list pushed by the earthquake watcher into the snapshot."""
+        if self._snapshot is None:
+            return
+        documents = dict(self._snapshot.documents)
+        documents[JMA_BOSAI_EARTHQUAKE_LIST_URL] = earthquake_list
+        self._snapshot = replace(self._snapshot, documents=documents)
+        self._fetched[JMA_BOSAI_EARTHQUAKE_LIST_URL] = time.monotonic()
+
+    async def async_earthquake_columns(self, earthquake_list: List[Dict[str, Any]]) -> QuakeColumns:
+        """Return an earthquake list decoded into sorted columns, once across entries.
+
+        Lists pushed by the watcher are about as large as the last fetched
+        one, so that size decides whether the decode leaves the event loop.
+        """
+        columns = self._columns
+        if columns is None or columns[0] is not earthquake_list:
+            size = self._snapshot.sizes.get(JMA_BOSAI_EARTHQUAKE_LIST_URL, 0) if self._snapshot else 0
+            task = self._hass.async_create_task(
+                self.metrics.async_run("quake_columns", size, QuakeColumns.from_list, earthquake_list)
+            )
+            columns = self._columns = (earthquake_list, task)
+        return await asyncio.shield(columns[1])
+
+    async def async_get_snapshot(self, entry_id: Optional[str] = None) -> FeedSnapshot:
+        """Return a snapshot in which the feeds of an entry are fresh enough.
+
+        Without an entry every registered feed must be younger than
+        FEED_SNAPSHOT_MAX_AGE. Stale feeds are fetched together; feeds already
+        being fetched are joined rather than requested again.
+        """
+        if entry_id is not None and entry_id in self._registrations:
+            max_ages = self._registrations[entry_id]
+        else:
+            max_ages = dict.fromkeys(self.feeds, FEED_SNAPSHOT_MAX_AGE)
+
+        now = time.monotonic()
+        stale = [
+            url for url, max_age in max_ages.items()
+            if self._snapshot is None
+            or url not in self._snapshot.documents
+            or now - self._fetched.get(url, 0.0) >= max_age
+        ]
+        if not stale:
+            self.metrics.increment("snapshot_reused")
+            return self._snapshot
+
+        missing = [url for url in stale if url not in self._inflight]
+        if missing:
+            self.metrics.increment("snapshot_fetched")
+            task = self._hass.async_create_task(self._async_fetch_feeds(missing))
+            for url in missing:
+                self._inflight[url] = task
+        else:
+            self.metrics.increment("snapshot_joined")
+        await asyncio.shield(asyncio.gather(*{self._inflight[url] for url in stale}))
+        return self._snapshot
+
+    async def _async_fetch_feeds(self, feeds: List[str]) -> None:
+        """Fetch feeds concurrently and merge them into the snapshot."""
+        try:
+            started = time.monotonic()
+
+            async def _fetch(url: str) -> tuple[str, Any, int]:
+                return url, *await self._api_client.fetch_document(url, self._priority(url))
+
+            documents: Dict[str, Any] = {}
+            sizes: Dict[str, int] = {}
+            for completed in asyncio.as_completed([_fetch(url) for url in feeds]):
+                url, document, size = await completed
+                documents[url] = document
+                sizes[url] = size
+
+            duration = time.monotonic() - started
+            self.metrics.record("cycle", duration)
+            self.metrics.record_blocking()
+            previous = self._snapshot
+            self._snapshot = FeedSnapshot(
+                fetched_at=dt_util.utc_from_timestamp(self._api_client.now()),
+                documents={**previous.documents, **documents} if previous else documents,
+                duration=duration,
+                sizes={**previous.sizes, **sizes} if previous else sizes,
+            )
+            fetched = time.monotonic()
+            for url in feeds:
+                self._fetched[url] = fetched
+            _LOGGER.debug(f"Fetched {len(feeds)} feeds in {duration:.3f}s")
+        finally:
+            for url in feeds:
+                self._inflight.pop(url, None)
+
+
+@callback
+def async_get_feed_manager(hass: HomeAssistant) -> FeedManager:
+    """Return the shared feed manager, creating it on first use."""
+    manager: FeedManager | None = hass.data.get(DATA_FEEDS)
+    if manager is None:
+        manager = FeedManager(hass)
+        hass.data[DATA_FEEDS] = manager
+    return manager
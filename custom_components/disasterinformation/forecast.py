@@ -0,0 +1,150 @@
+"""Forecast warning levels from the timeSeries block of a warning document.
+
+The level grids of every area and warning code are scattered into one
+area × code × time array, so peak level and time to peak for every area of an
+office come out of a few reductions instead of nested loops over the JSON.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .records import intern, parse_timestamp
+
+
+@dataclass(frozen=True, slots=True)
+class LevelGrid:
+    """Warning levels of one office indexed by area, code and time slot."""
+
+    area_index: Dict[str, int]
+    codes: Tuple[str, ...]
+    starts: np.ndarray  # int64 epoch seconds, slot start
+    ends: np.ndarray  # int64 epoch seconds, slot end
+    levels: np.ndarray  # uint8, shape (areas, codes, slots)
+
+
+@dataclass(frozen=True, slots=True)
+class ForecastPeak:
+    """Highest forecast level for one area within the horizon."""
+
+    area_code: str
+    level: int
+    code: Optional[str]
+    peak_ts: Optional[int]
+    horizon_hours: int
+
+
+def _levels(values: List[Any]) -> np.ndarray:
+    """Convert level strings to uint8, treating blanks as 0.
+
+    Only a handful of distinct level strings exist, so each is converted once
+    and the rest is a vectorized lookup.
+    """
+    distinct, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    lookup = np.array([int(value) if value.isdigit() else 0 for value in distinct], dtype=np.uint8)
+    return lookup[inverse]
+
+
+def parse_level_grid(document: Optional[Dict[str, Any]]) -> Optional[LevelGrid]:
+    """Scatter every timeSeries level into one grid, or None without forecasts."""
+    series = (document or {}).get("timeSeries") or []
+
+    area_index: Dict[str, int] = {}
+    code_index: Dict[str, int] = {}
+    slot_index: Dict[int, int] = {}
+    area_ids: List[int] = []
+    code_ids: List[int] = []
+    slot_ids: List[int] = []
+    values: List[Any] = []
+
+    for block in series:
+        slots = [
+            slot_index.setdefault(ts, len(slot_index))
+            for ts in (parse_timestamp(time) for time in block.get("timeDefines", []))
+            if ts is not None
+        ]
+        if not slots:
+            continue
+        for area_type in block.get("areaTypes", []):
+            for area in area_type.get("areas", []):
+                area_id = area_index.setdefault(intern(area.get("code")), len(area_index))
+                for warning in area.get("warnings", []):
+                    code = warning.get("code")
+                    if not code:
+                        continue
+                    code_id = code_index.setdefault(intern(code), len(code_index))
+                    for level in warning.get("levels", []):
+                        for local_area in level.get("localAreas", []):
+                            row = local_area.get("values", [])[: len(slots)]
+                            values.extend(row)
+                            slot_ids.extend(slots[: len(row)])
+                            area_ids.extend([area_id] * len(row))
+                            code_ids.extend([code_id] * len(row))
+
+    if not values:
+        return None
+
+    # Slots were numbered in order of appearance; renumber them by time
+    times = np.fromiter(slot_index, dtype=np.int64, count=len(slot_index))
+    order = np.argsort(times)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    starts = times[order]
+    step = np.diff(starts)
+    ends = np.append(starts[1:], starts[-1] + (step[-1] if len(step) else 3 * 3600))
+
+    levels = np.zeros((len(area_index), len(code_index), len(starts)), dtype=np.uint8)
+    np.maximum.at(
+        levels,
+        (np.asarray(area_ids), np.asarray(code_ids), rank[np.asarray(slot_ids)]),
+        _levels(values),
+    )
+    return LevelGrid(
+        area_index=area_index,
+        codes=tuple(code_index),
+        starts=starts,
+        ends=ends,
+        levels=levels,
+    )
+
+
+def compute_peaks(grid: LevelGrid, now: int, horizon_hours: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return peak level, peak code index and peak slot per area.
+
+    Only slots that have not ended and start within the horizon count. The
+    peak slot is the first slot reaching the peak level; -1 when none is in
+    the horizon.
+    """
+    window = (grid.ends > now) & (grid.starts < now + horizon_hours * 3600)
+    levels = grid.levels[:, :, window]
+    slots = np.flatnonzero(window)
+    areas = levels.shape[0]
+    if not len(slots):
+        empty = np.full(areas, -1, dtype=np.int64)
+        return np.zeros(areas, dtype=np.uint8), empty, empty
+
+    by_slot = levels.max(axis=1)  # (areas, slots)
+    first_peak = by_slot.argmax(axis=1)
+    peak_level = by_slot[np.arange(areas), first_peak]
+    peak_code = levels[np.arange(areas), :, first_peak].argmax(axis=1)
+    return peak_level, peak_code, slots[first_peak]
+
+
+def forecast_peak(grid: Optional[LevelGrid], area_code: Optional[str], now: int, horizon_hours: int) -> Optional[ForecastPeak]:
+    """Return the forecast peak of one area."""
+    if grid is None or area_code not in grid.area_index:
+        return None
+    peak_level, peak_code, peak_slot = compute_peaks(grid, now, horizon_hours)
+    row = grid.area_index[area_code]
+    level = int(peak_level[row])
+    if level == 0:
+        return ForecastPeak(area_code, 0, None, None, horizon_hours)
+    return ForecastPeak(
+        area_code=area_code,
+        level=level,
+        code=grid.codes[int(peak_code[row])],
+        peak_ts=max(int(grid.starts[int(peak_slot[row])]), now),
+        horizon_hours=horizon_hours,
+    )
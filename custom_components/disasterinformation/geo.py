@@ -0,0 +1,304 @@
+"""Offline lookup of the class20 area containing a coordinate.
+
+Municipality boundaries are stored as edges quantized to 1e-5 degrees
+(about a metre) and bucketed into a uniform grid. For every cell the index
+also stores the area containing the cell's centre. A cell no edge passes
+through lies entirely in that area, so most lookups are an array access;
+otherwise the point's area follows from the centre's by counting the edges
+crossed on the way from the centre to the point, which only involves the
+few edges of that cell.
+
+The data file is built from boundary GeoJSON with benchmarks/boundaries.py
+(part of the repository, not of the installed integration) and placed in the
+config directory. It is optional: without it the index is unavailable and
+areas are chosen by hand.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .const import BOUNDARY_CELL_SIZE, BOUNDARY_DATA_FILE, DATA_BOUNDARY_INDEX
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+SCALE = 100_000  # quantization steps per degree
+
+Ring = Sequence[Tuple[float, float]]  # (longitude, latitude) pairs
+
+
+class BoundaryIndex:
+    """Grid index over class20 boundaries.
+
+    Edges are stored once per cell they may pass through, so the edges of a
+    cell are one contiguous slice of the edge columns.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        origin: np.ndarray,
+        cell: int,
+        shape: Tuple[int, int],
+        centers: np.ndarray,
+        offsets: np.ndarray,
+        edges: np.ndarray,
+        edge_areas: np.ndarray,
+    ) -> None:
+        """Initialize the index from its arrays."""
+        self.codes: List[str] = [str(code) for code in codes]
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.cell = int(cell)
+        self.rows, self.cols = int(shape[0]), int(shape[1])
+        self.centers = centers
+        self.offsets = offsets
+        self.edge_areas = edge_areas
+        self._arrays = (codes, np.asarray(origin), centers, offsets, edges, edge_areas)
+
+        x0, y0, x1, y1 = edges.astype(np.float64).T
+        self._x0, self._y0, self._x1, self._y1 = x0, y0, x1, y1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Slopes are only used for edges that straddle the crossing line
+            self._dxdy = np.where(y1 != y0, (x1 - x0) / (y1 - y0), 0.0)
+            self._dydx = np.where(x1 != x0, (y1 - y0) / (x1 - x0), 0.0)
+
+    @classmethod
+    def build(cls, areas: Mapping[str, Iterable[Ring]], cell_size: float = BOUNDARY_CELL_SIZE) -> BoundaryIndex:
+        """Build the index from class20 code -> rings (outer rings and holes alike)."""
+        codes = list(areas)
+        segments = []
+        owners = []
+        for area, code in enumerate(codes):
+            for ring in areas[code]:
+                points = np.round(np.asarray(ring, dtype=np.float64) * SCALE).astype(np.int64)
+                if len(points) < 3:
+                    continue
+                closed = np.vstack([points, points[:1]]) if (points[0] != points[-1]).any() else points
+                ring_edges = np.hstack([closed[:-1], closed[1:]])
+                ring_edges = ring_edges[(ring_edges[:, 0] != ring_edges[:, 2]) | (ring_edges[:, 1] != ring_edges[:, 3])]
+                segments.append(ring_edges)
+                owners.append(np.full(len(ring_edges), area, dtype=np.int32))
+        if not segments:
+            raise ValueError("No boundary rings to index")
+        edges = np.vstack(segments)
+        edge_owner = np.concatenate(owners)
+
+        cell = int(round(cell_size * SCALE))
+        origin = np.array([edges[:, [0, 2]].min() // cell * cell, edges[:, [1, 3]].min() // cell * cell])
+        cols = int((edges[:, [0, 2]].max() - origin[0]) // cell) + 1
+        rows = int((edges[:, [1, 3]].max() - origin[1]) // cell) + 1
+
+        # Every (cell, edge) pair whose cell overlaps the edge's bounding box
+        c0 = (np.minimum(edges[:, 0], edges[:, 2]) - origin[0]) // cell
+        c1 = (np.maximum(edges[:, 0], edges[:, 2]) - origin[0]) // cell
+        r0 = (np.minimum(edges[:, 1], edges[:, 3]) - origin[1]) // cell
+        r1 = (np.maximum(edges[:, 1], edges[:, 3]) - origin[1]) // cell
+        widths = c1 - c0 + 1
+        counts = widths * (r1 - r0 + 1)
+        pair_edges = np.repeat(np.arange(len(edges)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_cells = (r0[pair_edges] + local // widths[pair_edges]) * cols + c0[pair_edges] + local % widths[pair_edges]
+        order = np.argsort(pair_cells, kind="stable")
+        pair_cells = pair_cells[order]
+        pair_edges = pair_edges[order]
+        offsets = np.zeros(rows * cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_cells, minlength=rows * cols), out=offsets[1:])
+
+        centers = _center_areas(edges, edge_owner, origin, cell, rows, cols)
+        return cls(
+            np.array(codes),
+            origin,
+            cell,
+            (rows, cols),
+            centers,
+            offsets,
+            edges[pair_edges].astype(np.int32),
+            edge_owner[pair_edges],
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> Optional[BoundaryIndex]:
+        """Load an index saved with save(), or return None without a data file."""
+        if not path.is_file():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["codes"],
+                data["origin"],
+                int(data["cell"]),
+                tuple(data["shape"]),
+                data["centers"],
+                data["offsets"],
+                data["edges"],
+                data["edge_areas"],
+            )
+
+    def save(self, path: Path) -> None:
+        """Write the index arrays to a compressed .npz file."""
+        codes, origin, centers, offsets, edges, edge_areas = self._arrays
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as file:
+            np.savez_compressed(
+                file,
+                codes=codes,
+                origin=origin,
+                cell=np.array(self.cell),
+                shape=np.array([self.rows, self.cols]),
+                centers=centers,
+                offsets=offsets,
+                edges=edges,
+                edge_areas=edge_areas,
+            )
+
+    def __len__(self) -> int:
+        """Return the number of indexed areas."""
+        return len(self.codes)
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[str]:
+        """Return the class20 code of the area containing a point, if any."""
+        x = longitude * SCALE
+        y = latitude * SCALE
+        col = int((x - self.origin[0]) // self.cell)
+        row = int((y - self.origin[1]) // self.cell)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        area = self._resolve(row * self.cols + col, row, col, x, y)
+        return self.codes[area] if area >= 0 else None
+
+    def lookup_many(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> List[Optional[str]]:
+        """Return the class20 code for each point; cells without edges resolve vectorized."""
+        x = np.asarray(longitudes, dtype=np.float64) * SCALE
+        y = np.asarray(latitudes, dtype=np.float64) * SCALE
+        cols = np.floor((x - self.origin[0]) / self.cell).astype(np.int64)
+        rows = np.floor((y - self.origin[1]) / self.cell).astype(np.int64)
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        cells = np.where(inside, rows * self.cols + cols, 0)
+        areas = np.where(inside, self.centers[cells], -1)
+        mixed = np.flatnonzero(inside & (self.offsets[cells + 1] > self.offsets[cells]))
+        for point in mixed.tolist():
+            areas[point] = self._resolve(int(cells[point]), int(rows[point]), int(cols[point]), x[point], y[point])
+        codes = self.codes
+        return [codes[area] if area >= 0 else None for area in areas.tolist()]
+
+    def _resolve(self, cell: int, row: int, col: int, x: float, y: float) -> int:
+        """Return the area index containing a point of a cell, or -1."""
+        owner = int(self.centers[cell])
+        start, end = int(self.offsets[cell]), int(self.offsets[cell + 1])
+        if start == end:
+            return owner
+
+        # Walk from the point east/west to the centre's column, then north/south to the centre
+        cx = self.origin[0] + (col + 0.5) * self.cell + 0.5
+        cy = self.origin[1] + (row + 0.5) * self.cell + 0.5
+        x0, y0 = self._x0[start:end], self._y0[start:end]
+        x1, y1 = self._x1[start:end], self._y1[start:end]
+        left, right = (x, cx) if x < cx else (cx, x)
+        crossing_x = x0 + (y - y0) * self._dxdy[start:end]
+        horizontal = ((y0 > y) != (y1 > y)) & (crossing_x > left) & (crossing_x <= right)
+        low, high = (y, cy) if y < cy else (cy, y)
+        crossing_y = y0 + (cx - x0) * self._dydx[start:end]
+        vertical = ((x0 > cx) != (x1 > cx)) & (crossing_y > low) & (crossing_y <= high)
+
+        crossed = np.concatenate([self.edge_areas[start:end][horizontal], self.edge_areas[start:end][vertical]])
+        if not len(crossed):
+            return owner
+        # The point is in an area if the path crossed its boundary an odd number of
+        # times and the centre is outside it, or an even number and the centre is inside
+        areas, counts = np.unique(crossed, return_counts=True)
+        for area, count in zip(areas.tolist(), counts.tolist()):
+            if count % 2 and area != owner:
+                return area
+        if owner >= 0 and not (counts[areas == owner] % 2).any():
+            return owner
+        return -1
+
+
+def _center_areas(
+    edges: np.ndarray, edge_owner: np.ndarray, origin: np.ndarray, cell: int, rows: int, cols: int
+) -> np.ndarray:
+    """Return the area containing each cell centre, or -1, by sweeping each row."""
+    centers = np.full(rows * cols, -1, dtype=np.int32)
+    x0, y0, x1, y1 = edges.astype(np.float64).T
+    low = np.minimum(y0, y1)
+    high = np.maximum(y0, y1)
+    by_low = np.argsort(low, kind="stable")
+    sorted_low = low[by_low]
+    center_xs = origin[0] + (np.arange(cols) + 0.5) * cell + 0.5
+
+    for row in range(rows):
+        cy = origin[1] + (row + 0.5) * cell + 0.5
+        candidates = by_low[: np.searchsorted(sorted_low, cy, side="right")]
+        candidates = candidates[high[candidates] > cy]
+        if not len(candidates):
+            continue
+        crossing = x0[candidates] + (cy - y0[candidates]) * (x1[candidates] - x0[candidates]) / (y1[candidates] - y0[candidates])
+        order = np.argsort(-crossing)
+        crossing = crossing[order].tolist()
+        owners = edge_owner[candidates][order].tolist()
+
+        # Ray casting eastwards from every centre at once: sweep the crossings west
+        inside: Dict[int, None] = {}
+        position = 0
+        base = row * cols
+        for col in range(cols - 1, -1, -1):
+            cx = center_xs[col]
+            while position < len(crossing) and crossing[position] > cx:
+                area = owners[position]
+                if area in inside:
+                    del inside[area]
+                else:
+                    inside[area] = None
+                position += 1
+            if inside:
+                centers[base + col] = next(iter(inside))
+    return centers
+
+
+def areas_from_geojson(
+    document: Mapping[str, Any], code_property: str, suffix: str = ""
+) -> Dict[str, List[Ring]]:
+    """Group the polygon rings of a GeoJSON FeatureCollection by area code.
+
+    The code is read from code_property and suffix is appended, e.g. "00" to
+    turn 5-digit municipality codes into class20 codes.
+    """
+    areas: Dict[str, List[Ring]] = {}
+    for feature in document.get("features") or []:
+        code = (feature.get("properties") or {}).get(code_property)
+        geometry = feature.get("geometry") or {}
+        if not code:
+            continue
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            continue
+        rings = areas.setdefault(f"{code}{suffix}", [])
+        for polygon in polygons:
+            rings.extend([tuple(point[:2]) for point in ring] for ring in polygon)
+    return areas
+
+
+def boundary_data_path(hass: HomeAssistant) -> Path:
+    """Return where the boundary data file is installed."""
+    return Path(hass.config.path(BOUNDARY_DATA_FILE))
+
+
+async def async_get_boundary_index(hass: HomeAssistant) -> Optional[BoundaryIndex]:
+    """Return the shared boundary index, or None when no data file is installed."""
+    if DATA_BOUNDARY_INDEX not in hass.data:
+        path = boundary_data_path(hass)
+        index = await hass.async_add_executor_job(BoundaryIndex.load, path)
+        if index is None:
+            _LOGGER.debug(f"No boundary data at {path}, areas are selected by hand")
+        else:
+            _LOGGER.debug(f"Loaded boundaries of {len(index)} areas")
+        hass.data[DATA_BOUNDARY_INDEX] = index
+    return hass.data[DATA_BOUNDARY_INDEX]
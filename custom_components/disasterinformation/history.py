@@ -0,0 +1,402 @@
+"""Local SQLite history of earthquakes and warning periods."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_HISTORY,
+    DOMAIN,
+    HISTORY_BATCH_SIZE,
+    HISTORY_FLUSH_INTERVAL,
+    HISTORY_QUERY_LIMIT,
+    HISTORY_RETENTION_DAYS,
+)
+from .records import WarningRecord, parse_magnitude, parse_timestamp
+from .transitions import WarningKey, diff_warnings, index_warnings
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS earthquakes (
+        event_id TEXT PRIMARY KEY,
+        origin_ts INTEGER NOT NULL,
+        report_ts INTEGER,
+        hypocenter TEXT,
+        area_code TEXT,
+        magnitude REAL,
+        max_intensity TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_earthquakes_origin ON earthquakes (origin_ts)",
+    "CREATE INDEX IF NOT EXISTS ix_earthquakes_magnitude ON earthquakes (magnitude, origin_ts)",
+    "CREATE INDEX IF NOT EXISTS ix_earthquakes_area ON earthquakes (area_code, origin_ts)",
+    """
+    CREATE TABLE IF NOT EXISTS warning_periods (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        office_code TEXT NOT NULL,
+        area_code TEXT NOT NULL,
+        code TEXT NOT NULL,
+        name TEXT,
+        severity TEXT,
+        start_ts INTEGER NOT NULL,
+        end_ts INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_warning_periods_start ON warning_periods (start_ts, end_ts)",
+    "CREATE INDEX IF NOT EXISTS ix_warning_periods_area ON warning_periods (area_code, code, start_ts)",
+    "CREATE INDEX IF NOT EXISTS ix_warning_periods_severity ON warning_periods (severity, start_ts)",
+    "CREATE INDEX IF NOT EXISTS ix_warning_periods_open ON warning_periods (end_ts) WHERE end_ts IS NULL",
+)
+
+
+class HistoryStore:
+    """Batch earthquakes and warning transitions into an indexed SQLite file."""
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        """Initialize the store."""
+        self._hass = hass
+        self._path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+        self.open_lock = asyncio.Lock()
+        self._restored = False
+        self._pending_earthquakes: Dict[str, tuple] = {}
+        self._pending_starts: List[tuple] = []
+        self._pending_ends: List[tuple] = []
+        self._open: Dict[str, Dict[WarningKey, Tuple[WarningRecord, int]]] = {}
+        self._last_earthquake_list: Optional[Iterable[Dict[str, Any]]] = None
+        self._unsub_interval: Optional[CALLBACK_TYPE] = None
+        self._unsub_stop: Optional[CALLBACK_TYPE] = None
+
+    async def async_open(self) -> None:
+        """Open the database and restore periods that are still open."""
+        open_periods = await self._hass.async_add_executor_job(self._open_database)
+        for office_code, area_code, code, name, severity, start_ts in open_periods:
+            record = WarningRecord(code, name, severity, "", area_code, "継続")
+            self._open.setdefault(office_code, {})[(area_code, code)] = (record, start_ts)
+        self._restored = True
+        self._unsub_interval = async_track_time_interval(
+            self._hass, self._async_periodic, timedelta(seconds=HISTORY_FLUSH_INTERVAL)
+        )
+        self._unsub_stop = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+        )
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the open periods have been restored, so warnings can be recorded."""
+        return self._restored
+
+    def _open_database(self) -> List[tuple]:
+        """Create the schema and return open warning periods."""
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+        self._connection = connection
+        return connection.execute(
+            "SELECT office_code, area_code, code, name, severity, start_ts"
+            " FROM warning_periods WHERE end_ts IS NULL"
+        ).fetchall()
+
+    @callback
+    def async_record_earthquakes(self, earthquake_list: Iterable[Dict[str, Any]]) -> None:
+        """Queue every event of a list.json snapshot for upsert."""
+        if earthquake_list is self._last_earthquake_list:
+            return
+        self._last_earthquake_list = earthquake_list
+        for earthquake in earthquake_list:
+            event_id = earthquake.get("eid")
+            origin_ts = parse_timestamp(earthquake.get("at"))
+            if not event_id or origin_ts is None:
+                continue
+            self._pending_earthquakes[event_id] = (
+                event_id,
+                origin_ts,
+                parse_timestamp(earthquake.get("rdt")),
+                earthquake.get("anm") or None,
+                earthquake.get("acd") or None,
+                parse_magnitude(earthquake.get("mag")),
+                earthquake.get("maxi") or None,
+            )
+        self._async_flush_if_full()
+
+    @callback
+    def async_record_warnings(
+        self,
+        office_code: str,
+        warnings: Iterable[WarningRecord],
+        city_area_code: Optional[str] = None,
+        observed_at: Optional[datetime] = None,
+    ) -> None:
+        """Open periods for newly active warnings and close lifted ones.
+
+        Only periods inside the caller's scope (one city, or the whole office
+        when no city is given) are closed when missing.
+        """
+        now = int((observed_at or dt_util.utcnow()).timestamp())
+        open_periods = self._open.setdefault(office_code, {})
+        in_scope = {
+            key: record for key, (record, _) in open_periods.items()
+            if not city_area_code or key[0] == city_area_code
+        }
+        delta = diff_warnings(in_scope, index_warnings(warnings))
+
+        for warning in delta.issued + [new for _, new in delta.upgraded]:
+            open_periods[(warning.area_code, warning.code)] = (warning, now)
+            self._pending_starts.append(
+                (office_code, warning.area_code, warning.code, warning.name, warning.severity, now)
+            )
+
+        for warning in delta.lifted + [old for old, _ in delta.upgraded]:
+            _, start_ts = open_periods.pop((warning.area_code, warning.code))
+            self._pending_ends.append((now, office_code, warning.area_code, warning.code, start_ts))
+
+        self._async_flush_if_full()
+
+    @callback
+    def async_end_periods(
+        self, office_code: str, city_area_code: Optional[str] = None, observed_at: Optional[datetime] = None
+    ) -> None:
+        """Close the open periods of a scope nobody tracks any more, e.g. a removed entry."""
+        self.async_record_warnings(office_code, (), city_area_code, observed_at)
+
+    @callback
+    def _async_flush_if_full(self) -> None:
+        """Flush early when enough writes are pending."""
+        pending = len(self._pending_earthquakes) + len(self._pending_starts) + len(self._pending_ends)
+        if pending >= HISTORY_BATCH_SIZE:
+            self._hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Write all pending rows in one transaction."""
+        if self._connection is None:
+            return
+        if not (self._pending_earthquakes or self._pending_starts or self._pending_ends):
+            return
+        earthquakes = list(self._pending_earthquakes.values())
+        starts, ends = self._pending_starts, self._pending_ends
+        self._pending_earthquakes, self._pending_starts, self._pending_ends = {}, [], []
+        async with self._lock:
+            if self._connection is not None:
+                await self._hass.async_add_executor_job(self._write, earthquakes, starts, ends)
+
+    def _write(self, earthquakes: List[tuple], starts: List[tuple], ends: List[tuple]) -> None:
+        """Write a batch (executor)."""
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO earthquakes"
+                " (event_id, origin_ts, report_ts, hypocenter, area_code, magnitude, max_intensity)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(event_id) DO UPDATE SET"
+                " origin_ts=excluded.origin_ts, report_ts=excluded.report_ts,"
+                " hypocenter=COALESCE(excluded.hypocenter, hypocenter),"
+                " area_code=COALESCE(excluded.area_code, area_code),"
+                " magnitude=COALESCE(excluded.magnitude, magnitude),"
+                " max_intensity=COALESCE(excluded.max_intensity, max_intensity)",
+                earthquakes,
+            )
+            self._connection.executemany(
+                "INSERT INTO warning_periods (office_code, area_code, code, name, severity, start_ts)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                starts,
+            )
+            self._connection.executemany(
+                "UPDATE warning_periods SET end_ts = ?"
+                " WHERE office_code = ? AND area_code = ? AND code = ? AND start_ts = ? AND end_ts IS NULL",
+                ends,
+            )
+
+    async def _async_periodic(self, now: Optional[datetime] = None) -> None:
+        """Flush pending rows and apply retention."""
+        await self.async_flush()
+        cutoff = int(time.time()) - HISTORY_RETENTION_DAYS * 86400
+        async with self._lock:
+            if self._connection is not None:
+                await self._hass.async_add_executor_job(self._purge, cutoff)
+
+    def _purge(self, cutoff: int) -> None:
+        """Delete rows older than the retention window (executor)."""
+        with self._connection:
+            self._connection.execute("DELETE FROM earthquakes WHERE origin_ts < ?", (cutoff,))
+            self._connection.execute(
+                "DELETE FROM warning_periods WHERE end_ts IS NOT NULL AND end_ts < ?", (cutoff,)
+            )
+
+    async def _async_handle_stop(self, event: Event) -> None:
+        """Flush and close on shutdown."""
+        # The listener is already gone once it has fired
+        self._unsub_stop = None
+        await self.async_close()
+
+    async def async_close(self) -> None:
+        """Flush pending rows and close the database."""
+        if self._unsub_interval is not None:
+            self._unsub_interval()
+            self._unsub_interval = None
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        await self.async_flush()
+        async with self._lock:
+            if self._connection is not None:
+                connection, self._connection = self._connection, None
+                await self._hass.async_add_executor_job(connection.close)
+
+    async def async_query_earthquakes(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        min_magnitude: Optional[float] = None,
+        area_code: Optional[str] = None,
+        limit: int = HISTORY_QUERY_LIMIT,
+    ) -> Dict[str, Any]:
+        """Return stored earthquakes matching the filters, newest first."""
+        await self.async_flush()
+        clauses, params = ["1=1"], []
+        if start is not None:
+            clauses.append("origin_ts >= ?")
+            params.append(int(start.timestamp()))
+        if end is not None:
+            clauses.append("origin_ts < ?")
+            params.append(int(end.timestamp()))
+        if min_magnitude is not None:
+            clauses.append("magnitude >= ?")
+            params.append(min_magnitude)
+        if area_code:
+            clauses.append("area_code = ?")
+            params.append(area_code)
+        where = " AND ".join(clauses)
+
+        def _query() -> Dict[str, Any]:
+            count, max_magnitude = self._connection.execute(
+                f"SELECT COUNT(*), MAX(magnitude) FROM earthquakes WHERE {where}", params
+            ).fetchone()
+            rows = self._connection.execute(
+                "SELECT event_id, origin_ts, hypocenter, area_code, magnitude, max_intensity"
+                f" FROM earthquakes WHERE {where} ORDER BY origin_ts DESC LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+            return {
+                "count": count,
+                "max_magnitude": max_magnitude,
+                "earthquakes": [
+                    {
+                        "event_id": event_id,
+                        "origin_time": dt_util.as_local(dt_util.utc_from_timestamp(origin_ts)).isoformat(),
+                        "hypocenter": hypocenter,
+                        "area_code": area,
+                        "magnitude": magnitude,
+                        "max_intensity": max_intensity,
+                    }
+                    for event_id, origin_ts, hypocenter, area, magnitude, max_intensity in rows
+                ],
+            }
+
+        async with self._lock:
+            if self._connection is None:
+                return {"count": 0, "max_magnitude": None, "earthquakes": []}
+            return await self._hass.async_add_executor_job(_query)
+
+    async def async_query_warnings(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        area_code: Optional[str] = None,
+        code: Optional[str] = None,
+        severity: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: int = HISTORY_QUERY_LIMIT,
+    ) -> Dict[str, Any]:
+        """Return warning periods overlapping [start, end) and the hours covered."""
+        await self.async_flush()
+        now = int(time.time())
+        start_ts = int(start.timestamp()) if start is not None else 0
+        end_ts = int(end.timestamp()) if end is not None else now
+        clauses = ["start_ts < ?", "COALESCE(end_ts, ?) > ?"]
+        params: List[Any] = [end_ts, now, start_ts]
+        if area_code:
+            clauses.append("area_code = ?")
+            params.append(area_code)
+        if code:
+            clauses.append("code = ?")
+            params.append(code)
+        if severity:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if name:
+            clauses.append("name = ?")
+            params.append(name)
+        where = " AND ".join(clauses)
+
+        def _query() -> Dict[str, Any]:
+            count, seconds = self._connection.execute(
+                "SELECT COUNT(*), SUM(MIN(COALESCE(end_ts, ?), ?) - MAX(start_ts, ?))"
+                f" FROM warning_periods WHERE {where}",
+                [now, end_ts, start_ts, *params],
+            ).fetchone()
+            rows = self._connection.execute(
+                "SELECT office_code, area_code, code, name, severity, start_ts, end_ts"
+                f" FROM warning_periods WHERE {where} ORDER BY start_ts DESC LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+
+            def _iso(ts: Optional[int]) -> Optional[str]:
+                return dt_util.as_local(dt_util.utc_from_timestamp(ts)).isoformat() if ts else None
+
+            return {
+                "count": count,
+                "total_hours": round((seconds or 0) / 3600, 2),
+                "periods": [
+                    {
+                        "office_code": office,
+                        "area_code": area,
+                        "code": warning_code,
+                        "name": warning_name,
+                        "severity": warning_severity,
+                        "start": _iso(period_start),
+                        "end": _iso(period_end),
+                    }
+                    for office, area, warning_code, warning_name, warning_severity, period_start, period_end in rows
+                ],
+            }
+
+        async with self._lock:
+            if self._connection is None:
+                return {"count": 0, "total_hours": 0, "periods": []}
+            return await self._hass.async_add_executor_job(_query)
+
+
+async def async_get_history_store(hass: HomeAssistant) -> HistoryStore:
+    """Return the shared history store, opening it on first use."""
+    store: HistoryStore | None = hass.data.get(DATA_HISTORY)
+    if store is None:
+        store = HistoryStore(hass, hass.config.path(f"{DOMAIN}_history.db"))
+        hass.data[DATA_HISTORY] = store
+    if not store.is_open:
+        # Entries set up together must not record warnings before the open
+        # periods are restored, or they would open them a second time
+        async with store.open_lock:
+            if not store.is_open:
+                await store.async_open()
+    return store
+
+
+async def async_close_history_store(hass: HomeAssistant) -> None:
+    """Close the shared history store; the next caller opens a new one."""
+    store: HistoryStore | None = hass.data.pop(DATA_HISTORY, None)
+    if store is not None:
+        await store.async_close()
@@ -0,0 +1,139 @@
+"""Recent maximum seismic intensity per municipality from list.json."""
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .const import DATA_INTENSITY_INDEX, INTENSITY_WINDOW
+from .records import intern, parse_timestamp
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+INTENSITY_SCALE = ("1", "2", "3", "4", "5-", "5+", "6-", "6+", "7")
+_RANK = {intensity: rank for rank, intensity in enumerate(INTENSITY_SCALE, start=1)}
+
+
+@dataclass(frozen=True, slots=True)
+class FeltIntensity:
+    """Strongest intensity observed in one municipality within the window."""
+
+    rank: int
+    event_id: str
+    origin_ts: int
+    hypocenter: str
+
+    @property
+    def intensity(self) -> str:
+        """Return the intensity as published, e.g. 5+."""
+        return INTENSITY_SCALE[self.rank - 1]
+
+
+class IntensityIndex:
+    """Class20 code -> recent maximum intensity, updated per event.
+
+    Only events that are new, or whose report changed, are parsed. Adding an
+    event touches the municipalities it was felt in; expiring or replacing
+    one recomputes only the municipalities whose maximum it held. Lookups
+    are a dict access regardless of how many events are in the window.
+    """
+
+    def __init__(self, window_hours: int = INTENSITY_WINDOW) -> None:
+        """Initialize the index."""
+        self.window = window_hours * 3600
+        self._versions: Dict[str, str] = {}
+        self._events: Dict[str, Tuple[int, str, Dict[str, int]]] = {}
+        self._expiry: List[Tuple[int, str]] = []
+        self._by_city: Dict[str, Dict[str, int]] = {}
+        self._max: Dict[str, FeltIntensity] = {}
+        self._last_list: Optional[Iterable[Dict[str, Any]]] = None
+
+    def update(self, earthquake_list: Iterable[Dict[str, Any]], now: int) -> None:
+        """Fold new or revised events of a list.json snapshot and expire old ones."""
+        cutoff = now - self.window
+        if earthquake_list is not self._last_list:
+            self._last_list = earthquake_list
+            for entry in earthquake_list:
+                event_id = entry.get("eid")
+                version = entry.get("ctt") or entry.get("rdt") or ""
+                if not event_id or self._versions.get(event_id) == version:
+                    continue
+                origin_ts = parse_timestamp(entry.get("at"))
+                if origin_ts is None or origin_ts < cutoff:
+                    continue
+                self._versions[event_id] = version
+                self._remove(event_id)
+                self._add(event_id, origin_ts, intern(entry.get("anm")), _city_ranks(entry))
+        self._expire(cutoff)
+
+    def lookup(self, city_code: Optional[str]) -> Optional[FeltIntensity]:
+        """Return the strongest intensity felt in a municipality."""
+        return self._max.get(city_code)
+
+    def count(self, city_code: Optional[str]) -> int:
+        """Return the number of events felt in a municipality."""
+        return len(self._by_city.get(city_code, ()))
+
+    def _add(self, event_id: str, origin_ts: int, hypocenter: str, cities: Dict[str, int]) -> None:
+        """Index an event and raise the maxima it exceeds."""
+        self._events[event_id] = (origin_ts, hypocenter, cities)
+        heapq.heappush(self._expiry, (origin_ts, event_id))
+        for city_code, rank in cities.items():
+            self._by_city.setdefault(city_code, {})[event_id] = rank
+            current = self._max.get(city_code)
+            if current is None or (rank, origin_ts) > (current.rank, current.origin_ts):
+                self._max[city_code] = FeltIntensity(rank, event_id, origin_ts, hypocenter)
+
+    def _remove(self, event_id: str) -> None:
+        """Drop an event and recompute the maxima it held."""
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return
+        for city_code in event[2]:
+            city_events = self._by_city[city_code]
+            del city_events[event_id]
+            if not city_events:
+                del self._by_city[city_code]
+                del self._max[city_code]
+            elif self._max[city_code].event_id == event_id:
+                self._recompute(city_code)
+
+    def _recompute(self, city_code: str) -> None:
+        """Rebuild the maximum of one municipality from its events."""
+        best = max(
+            self._by_city[city_code].items(),
+            key=lambda item: (item[1], self._events[item[0]][0]),
+        )
+        origin_ts, hypocenter, _ = self._events[best[0]]
+        self._max[city_code] = FeltIntensity(best[1], best[0], origin_ts, hypocenter)
+
+    def _expire(self, cutoff: int) -> None:
+        """Drop events that left the window, oldest first."""
+        while self._expiry and self._expiry[0][0] < cutoff:
+            origin_ts, event_id = heapq.heappop(self._expiry)
+            event = self._events.get(event_id)
+            if event is not None and event[0] == origin_ts:
+                self._remove(event_id)
+                self._versions.pop(event_id, None)
+
+
+def _city_ranks(entry: Dict[str, Any]) -> Dict[str, int]:
+    """Return class20 code -> intensity rank from the int block of an entry."""
+    cities: Dict[str, int] = {}
+    for prefecture in entry.get("int") or []:
+        for city in prefecture.get("city") or []:
+            rank = _RANK.get(city.get("maxi"))
+            code = city.get("code")
+            if rank and code and rank > cities.get(code, 0):
+                cities[intern(code)] = rank
+    return cities
+
+
+def async_get_intensity_index(hass: HomeAssistant) -> IntensityIndex:
+    """Return the shared intensity index, creating it on first use."""
+    index: IntensityIndex | None = hass.data.get(DATA_INTENSITY_INDEX)
+    if index is None:
+        index = IntensityIndex()
+        hass.data[DATA_INTENSITY_INDEX] = index
+    return index
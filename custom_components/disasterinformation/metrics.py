@@ -0,0 +1,170 @@
+"""Refresh timing instrumentation for 気象庁防災情報."""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+import aiohttp
+
+from .const import EXECUTOR_THRESHOLD, METRICS_WINDOW
+
+_T = TypeVar("_T")
+
+
+class RollingStats:
+    """Keep the most recent samples of a stage and summarize them."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Initialize the sample window."""
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.last: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        """Add a sample."""
+        self._samples.append(value)
+        self.count += 1
+        self.last = value
+
+    def summary(self) -> Dict[str, Any]:
+        """Return count, last, p50, p95 and max over the window."""
+        if not self._samples:
+            return {"count": 0}
+        ordered = sorted(self._samples)
+        return {
+            "count": self.count,
+            "last": self.last,
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+            "max": ordered[-1],
+        }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of sorted samples."""
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class RefreshMetrics:
+    """Per-stage timings, byte counts, cache outcomes and event loop blocking time."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Initialize the metrics."""
+        self._window = window
+        self.stages: Dict[str, RollingStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.bytes = RollingStats(window)
+        self.blocked = 0.0
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record the duration of a stage."""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = RollingStats(self._window)
+        stats.add(seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Increment an outcome counter."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def add_bytes(self, size: int) -> None:
+        """Record the size of a downloaded body."""
+        self.bytes.add(size)
+        self.increment("bytes_total", size)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    @contextmanager
+    def blocking(self, stage: str) -> Iterator[None]:
+        """Time a stage that runs on the event loop and add it to the blocking time."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.record(stage, elapsed)
+            self.blocked += elapsed
+
+    def record_blocking(self) -> None:
+        """Record the blocking time accumulated since the last call as loop_blocking."""
+        self.record("loop_blocking", self.blocked)
+        self.blocked = 0.0
+
+    async def async_run(self, stage: str, size: int, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a payload step inline when small, otherwise in the default executor.
+
+        Steps on payloads of EXECUTOR_THRESHOLD bytes or more would stall the
+        event loop, so they run in a worker thread; small ones stay inline
+        where the thread handoff would cost more than the work.
+        """
+        if size < EXECUTOR_THRESHOLD:
+            with self.blocking(stage):
+                return func(*args)
+        self.increment(f"{stage}_offloaded")
+        with self.time(stage):
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable summary."""
+        return {
+            "stages": {stage: stats.summary() for stage, stats in self.stages.items()},
+            "bytes": self.bytes.summary(),
+            "counters": dict(self.counters),
+        }
+
+
+def create_trace_config(metrics: RefreshMetrics) -> aiohttp.TraceConfig:
+    """Return an aiohttp trace config recording DNS, connect and TTFB stages."""
+
+    async def _on_request_start(session, ctx: SimpleNamespace, params) -> None:
+        ctx.request_start = time.perf_counter()
+
+    async def _on_dns_start(session, ctx: SimpleNamespace, params) -> None:
+        ctx.dns_start = time.perf_counter()
+
+    async def _on_dns_end(session, ctx: SimpleNamespace, params) -> None:
+        metrics.record("dns", time.perf_counter() - ctx.dns_start)
+
+    async def _on_dns_cache_hit(session, ctx: SimpleNamespace, params) -> None:
+        metrics.increment("dns_cache_hit")
+
+    async def _on_connection_create_start(session, ctx: SimpleNamespace, params) -> None:
+        ctx.connect_start = time.perf_counter()
+
+    async def _on_connection_create_end(session, ctx: SimpleNamespace, params) -> None:
+        metrics.record("connect", time.perf_counter() - ctx.connect_start)
+
+    async def _on_connection_reuse(session, ctx: SimpleNamespace, params) -> None:
+        metrics.increment("connection_reused")
+
+    async def _on_request_end(session, ctx: SimpleNamespace, params) -> None:
+        metrics.record("ttfb", time.perf_counter() - ctx.request_start)
+        metrics.increment(f"status_{params.response.status}")
+
+    async def _on_request_exception(session, ctx: SimpleNamespace, params) -> None:
+        metrics.increment("request_error")
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_dns_cache_hit.append(_on_dns_cache_hit)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuse)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    return trace_config
@@ -0,0 +1,141 @@
+"""On-demand profiling of refresh cycles for 気象庁防災情報."""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import tracemalloc
+from typing import Any, Awaitable, Optional, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_PROFILER,
+    DOMAIN,
+    PROFILE_TOP_ALLOCATIONS,
+    PROFILE_TOP_FUNCTIONS,
+    PROFILE_TRACEMALLOC_FRAMES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class RefreshProfiler:
+    """Wrap the next N refreshes in cProfile and tracemalloc.
+
+    Nothing is hooked until the profiler is armed; callers only check the
+    ``armed`` counter, so an idle profiler costs a single attribute read.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler."""
+        self._hass = hass
+        self.armed = 0
+        self._entry_id: Optional[str] = None
+        self._label = "refresh"
+        self._profile: Optional[cProfile.Profile] = None
+        self._active = 0
+        self._started_tracemalloc = False
+
+    @callback
+    def async_arm(self, count: int, entry_id: Optional[str] = None, label: str = "refresh") -> bool:
+        """Arm the profiler for the next count runs."""
+        if self.armed:
+            _LOGGER.warning("Profiler is already armed, ignoring request")
+            return False
+        self._entry_id = entry_id
+        self._label = label
+        self._profile = cProfile.Profile()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self.armed = count
+        _LOGGER.info(f"Profiling the next {count} {label} run(s)")
+        return True
+
+    @callback
+    def async_disarm(self, entry_id: str) -> None:
+        """Stop waiting for the runs of an entry that unloads."""
+        if not self.armed or self._entry_id != entry_id:
+            return
+        _LOGGER.info(f"Entry {entry_id} unloaded, no longer profiling its refreshes")
+        self.armed = 0
+        if self._active:
+            # The run in progress finishes and writes what was collected
+            return
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._profile = None
+
+    def wants(self, entry_id: Optional[str]) -> bool:
+        """Return True if a run for entry_id should be profiled."""
+        return self.armed > 0 and (self._entry_id is None or self._entry_id == entry_id)
+
+    async def async_profile(self, awaitable: Awaitable[_T]) -> _T:
+        """Await under the profiler and write results after the last armed run."""
+        profile = self._profile
+        self._active += 1
+        if self._active == 1:
+            profile.enable()
+        try:
+            return await awaitable
+        finally:
+            self._active -= 1
+            if self._active == 0:
+                profile.disable()
+            self.armed = max(0, self.armed - 1)
+            if self.armed == 0 and self._active == 0:
+                await self._async_finish()
+
+    async def _async_finish(self) -> None:
+        """Collect the stats and write them to the config directory."""
+        profile = self._profile
+        memory = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._profile = None
+
+        stamp = dt_util.utcnow().strftime("%Y%m%dT%H%M%S")
+        base = self._hass.config.path(f"{DOMAIN}_profile_{self._label}_{stamp}")
+        await self._hass.async_add_executor_job(_write_results, base, profile, memory)
+        _LOGGER.warning(f"Profile written to {base}.prof and {base}.txt")
+
+
+def _write_results(base: str, profile: cProfile.Profile, memory: Optional[Any]) -> None:
+    """Write the cProfile dump and a text report of top functions and allocations."""
+    profile.dump_stats(f"{base}.prof")
+
+    report = io.StringIO()
+    report.write("Top functions by cumulative time\n\n")
+    pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+
+    if memory is not None:
+        report.write(f"\nTop {PROFILE_TOP_ALLOCATIONS} allocation sites\n\n")
+        memory = memory.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        for stat in memory.statistics("traceback")[:PROFILE_TOP_ALLOCATIONS]:
+            report.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            for line in stat.traceback.format():
+                report.write(f"{line}\n")
+            report.write("\n")
+
+    with open(f"{base}.txt", "w", encoding="utf-8") as report_file:
+        report_file.write(report.getvalue())
+
+
+@callback
+def async_get_profiler(hass: HomeAssistant) -> RefreshProfiler:
+    """Return the shared profiler, creating it on first use."""
+    profiler: RefreshProfiler | None = hass.data.get(DATA_PROFILER)
+    if profiler is None:
+        profiler = RefreshProfiler(hass)
+        hass.data[DATA_PROFILER] = profiler
+    return profiler
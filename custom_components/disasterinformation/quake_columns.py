@@ -0,0 +1,58 @@
+"""Columnar view of list.json shared by every earthquake entry."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .records import EarthquakeRecord, intern, parse_magnitude, parse_timestamp
+
+EARTHQUAKE_RESULT_LIMIT = 50
+
+
+@dataclass(frozen=True, slots=True)
+class QuakeColumns:
+    """Eligible events of one list.json sorted by origin time, oldest first.
+
+    Only events with an origin time, a hypocenter and a numeric magnitude
+    are kept, since no filter setting can select the others. Row i of every
+    column describes records[i].
+    """
+
+    origins: np.ndarray  # int64 epoch seconds
+    magnitudes: np.ndarray  # float64
+    records: Tuple[EarthquakeRecord, ...]
+
+    @classmethod
+    def from_list(cls, earthquake_list: Iterable[Dict[str, Any]]) -> QuakeColumns:
+        """Decode a list.json document into columns."""
+        rows = []
+        for entry in earthquake_list:
+            origin_ts = parse_timestamp(entry.get("at"))
+            hypocenter = entry.get("anm")
+            magnitude = parse_magnitude(entry.get("mag"))
+            if origin_ts is None or not hypocenter or magnitude is None:
+                continue
+            rows.append(EarthquakeRecord(
+                event_id=entry.get("eid", ""),
+                origin_ts=origin_ts,
+                report_ts=parse_timestamp(entry.get("rdt")),
+                hypocenter=intern(hypocenter),
+                magnitude=magnitude,
+            ))
+        rows.sort(key=lambda record: record.origin_ts)
+        return cls(
+            origins=np.fromiter((record.origin_ts for record in rows), dtype=np.int64, count=len(rows)),
+            magnitudes=np.fromiter((record.magnitude for record in rows), dtype=np.float64, count=len(rows)),
+            records=tuple(rows),
+        )
+
+    def view(
+        self, now: int, time_range_hours: int, min_magnitude: float, limit: int = EARTHQUAKE_RESULT_LIMIT
+    ) -> List[EarthquakeRecord]:
+        """Return up to limit matching events, newest first."""
+        start = int(np.searchsorted(self.origins, now - time_range_hours * 3600, side="left"))
+        offsets = np.flatnonzero(self.magnitudes[start:] >= min_magnitude)[::-1][:limit] + start
+        records = self.records
+        return [records[offset] for offset in offsets.tolist()]
@@ -0,0 +1,168 @@
+"""Low-latency watcher for the JMA earthquake list."""
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+import aiohttp
+import async_timeout
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    DATA_QUAKE_WATCHER,
+    DATA_REPLAY_SOURCE,
+    EARTHQUAKE_WATCH_INTERVAL,
+    EARTHQUAKE_WATCH_TIMEOUT,
+    EXECUTOR_THRESHOLD,
+    JMA_BOSAI_EARTHQUAKE_LIST_URL,
+    SIGNAL_EARTHQUAKE_LIST_UPDATED,
+)
+from .decoder import json_loads
+from .ratelimit import Priority, RequestLimiter, async_get_limiter
+from .replay import ReplaySource
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EarthquakeListWatcher:
+    """Poll quake/data/list.json with conditional requests and dispatch changes."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        source: Optional[ReplaySource] = None,
+        limiter: Optional[RequestLimiter] = None,
+    ) -> None:
+        """Initialize the watcher."""
+        self._hass = hass
+        self._session = session
+        self._source = source
+        self._limiter = limiter
+        self._url = JMA_BOSAI_EARTHQUAKE_LIST_URL
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._digest: Optional[bytes] = None
+        self._polling = False
+        self._unsub_interval: CALLBACK_TYPE | None = None
+        self._users = 0
+
+    @callback
+    def async_acquire(self) -> CALLBACK_TYPE:
+        """Start watching for a new user and return a release callback."""
+        self._users += 1
+        if self._unsub_interval is None:
+            _LOGGER.debug(f"Starting earthquake list watcher ({EARTHQUAKE_WATCH_INTERVAL}s)")
+            self._unsub_interval = async_track_time_interval(
+                self._hass, self._async_poll, timedelta(seconds=EARTHQUAKE_WATCH_INTERVAL)
+            )
+
+        released = False
+
+        @callback
+        def _release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._users -= 1
+            if self._users <= 0:
+                self.async_stop()
+
+        return _release
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop polling."""
+        if self._unsub_interval is not None:
+            _LOGGER.debug("Stopping earthquake list watcher")
+            self._unsub_interval()
+            self._unsub_interval = None
+        self._users = 0
+
+    async def _async_poll(self, now: datetime | None = None) -> None:
+        """Issue one conditional request and dispatch the list if it changed."""
+        if self._polling:
+            return
+        self._polling = True
+        try:
+            earthquake_list = await self._async_fetch_if_changed()
+        finally:
+            self._polling = False
+
+        if earthquake_list is not None:
+            _LOGGER.debug(f"Earthquake list changed ({len(earthquake_list)} entries)")
+            async_dispatcher_send(self._hass, SIGNAL_EARTHQUAKE_LIST_UPDATED, earthquake_list)
+
+    async def _async_fetch_if_changed(self) -> Optional[list[dict[str, Any]]]:
+        """Return the decoded list when it changed since the last poll, otherwise None."""
+        if self._source is not None:
+            body, _ = await self._source.async_read(self._url)
+            if body is None:
+                return None
+            return await self._async_decode_if_changed(body)
+
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        try:
+            if self._limiter is not None:
+                await self._limiter.acquire(Priority.EARTHQUAKE)
+            async with async_timeout.timeout(EARTHQUAKE_WATCH_TIMEOUT):
+                async with self._session.get(self._url, headers=headers) as response:
+                    if response.status == 304:
+                        return None
+                    if response.status != 200:
+                        _LOGGER.debug(f"Earthquake list watcher got status {response.status}")
+                        return None
+                    body = await response.read()
+                    self._etag = response.headers.get("ETag")
+                    self._last_modified = response.headers.get("Last-Modified")
+        except Exception as e:
+            _LOGGER.debug(f"Error polling earthquake list: {e}")
+            return None
+
+        return await self._async_decode_if_changed(body)
+
+    async def _async_decode_if_changed(self, body: bytes) -> Optional[list[dict[str, Any]]]:
+        """Decode a list body unless it matches the last dispatched one."""
+        # Servers that ignore conditional headers still must not trigger processing
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == self._digest:
+            return None
+
+        try:
+            if len(body) >= EXECUTOR_THRESHOLD:
+                earthquake_list = await self._hass.async_add_executor_job(json_loads, body)
+            else:
+                earthquake_list = json_loads(body)
+        except ValueError as e:
+            _LOGGER.warning(f"Invalid earthquake list payload: {e}")
+            return None
+
+        self._digest = digest
+        return earthquake_list
+
+
+@callback
+def async_acquire_quake_watcher(hass: HomeAssistant) -> Callable[[], None]:
+    """Start the shared earthquake watcher and return a release callback."""
+    watcher: EarthquakeListWatcher | None = hass.data.get(DATA_QUAKE_WATCHER)
+    if watcher is None:
+        watcher = EarthquakeListWatcher(
+            hass,
+            async_get_clientsession(hass),
+            hass.data.get(DATA_REPLAY_SOURCE),
+            async_get_limiter(hass),
+        )
+        hass.data[DATA_QUAKE_WATCHER] = watcher
+    return watcher.async_acquire()
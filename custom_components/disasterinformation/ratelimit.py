@@ -0,0 +1,154 @@
+"""Shared outbound request budget for all JMA traffic.
+
+One token bucket covers every request the integration makes. Requests wait
+in priority order, and the less urgent classes leave part of the bucket to
+the more urgent ones, so under pressure area metadata and routine polls are
+deferred while the earthquake fast lane and offices under warning still get
+through.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from enum import IntEnum
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from .const import DATA_LIMITER, REQUEST_BURST, REQUEST_RATE
+from .metrics import RefreshMetrics
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first."""
+
+    EARTHQUAKE = 0
+    EMERGENCY = 1
+    ROUTINE = 2
+    METADATA = 3
+
+
+# Share of the bucket each class leaves untouched for more urgent classes
+_RESERVE = {
+    Priority.EARTHQUAKE: 0.0,
+    Priority.EMERGENCY: 0.0,
+    Priority.ROUTINE: 0.2,
+    Priority.METADATA: 0.5,
+}
+
+
+class RequestLimiter:
+    """Token bucket with priority-ordered waiters.
+
+    Metrics record the wait per class as wait_<class> stages and count the
+    requests that had to queue as deferred_<class>.
+    """
+
+    def __init__(
+        self,
+        rate: float = REQUEST_RATE,
+        burst: int = REQUEST_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the limiter with a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.metrics = RefreshMetrics()
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._needed = {priority: 1 + math.floor(burst * share) for priority, share in _RESERVE.items()}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def tokens(self) -> float:
+        """Return the tokens currently available."""
+        self._refill()
+        return self._tokens
+
+    @property
+    def queued(self) -> Dict[str, int]:
+        """Return the number of waiting requests per class."""
+        counts = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                counts[Priority(priority).name.lower()] += 1
+        return counts
+
+    async def acquire(self, priority: Priority = Priority.ROUTINE) -> None:
+        """Wait until a request of the given class may be sent."""
+        name = priority.name.lower()
+        started = self._clock()
+        self._refill()
+        if (not self._waiters or self._waiters[0][0] > priority) and self._tokens >= self._needed[priority]:
+            self._tokens -= 1
+            self.metrics.record(f"wait_{name}", 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.metrics.increment(f"deferred_{name}")
+        self._drain()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the caller gave up; hand the token back
+                self._tokens = min(self.burst, self._tokens + 1)
+                self._drain()
+            else:
+                future.cancel()
+            raise
+        self.metrics.record(f"wait_{name}", self._clock() - started)
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _drain(self) -> None:
+        """Grant queued requests in priority order and wait for the next token."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._tokens < self._needed[priority]:
+                break
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            future.set_result(None)
+
+        if self._waiters:
+            delay = (self._needed[self._waiters[0][0]] - self._tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(max(0.0, delay), self._drain)
+
+    def as_dict(self) -> Dict[str, object]:
+        """Return the budget, current state and wait metrics."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "queued": self.queued,
+            **self.metrics.as_dict(),
+        }
+
+
+def async_get_limiter(hass: HomeAssistant) -> RequestLimiter:
+    """Return the shared request limiter, creating it on first use."""
+    limiter: RequestLimiter | None = hass.data.get(DATA_LIMITER)
+    if limiter is None:
+        limiter = RequestLimiter()
+        hass.data[DATA_LIMITER] = limiter
+    return limiter
@@ -0,0 +1,105 @@
+"""Compact record types for processed warnings and earthquakes."""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from .const import JMA_TIMEZONE
+
+JST = ZoneInfo(JMA_TIMEZONE)
+
+
+def intern(value: Optional[str]) -> str:
+    """Intern a string so repeated names share one object across refreshes."""
+    return sys.intern(value) if value else ""
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(value: Optional[str]) -> Optional[int]:
+    """Return epoch seconds for a JMA ISO timestamp, assuming JST when naive.
+
+    Cached because consecutive list.json snapshots repeat almost every timestamp.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=JST)
+    return int(parsed.timestamp())
+
+
+def parse_magnitude(value: Optional[str]) -> Optional[float]:
+    """Return the magnitude as a float, or None when unknown."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def format_timestamp(timestamp: Optional[int]) -> str:
+    """Return a JST ISO timestamp as published by JMA, or an empty string."""
+    if timestamp is None:
+        return ""
+    return datetime.fromtimestamp(timestamp, JST).isoformat()
+
+
+@dataclass(frozen=True, slots=True)
+class WarningRecord:
+    """An active warning, advisory or emergency warning for one area."""
+
+    code: str
+    name: str
+    severity: str
+    area: str
+    area_code: str
+    status: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the attribute representation."""
+        return {
+            "code": self.code,
+            "name": self.name,
+            "severity": self.severity,
+            "area": self.area,
+            "area_code": self.area_code,
+            "status": self.status,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class EarthquakeRecord:
+    """An earthquake from list.json with epoch timestamps."""
+
+    event_id: str
+    origin_ts: Optional[int]
+    report_ts: Optional[int]
+    hypocenter: str
+    magnitude: float
+
+    @property
+    def origin_time(self) -> str:
+        """Return the origin time as a JST ISO timestamp."""
+        return format_timestamp(self.origin_ts)
+
+    @property
+    def report_datetime(self) -> str:
+        """Return the report time as a JST ISO timestamp."""
+        return format_timestamp(self.report_ts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the attribute representation."""
+        return {
+            "event_id": self.event_id,
+            "origin_time": self.origin_time,
+            "report_datetime": self.report_datetime,
+            "hypocenter": self.hypocenter,
+            "magnitude": f"{self.magnitude:.1f}",
+            "status": "地震発生",
+        }
@@ -0,0 +1,172 @@
+"""Replay recorded BOSAI documents in place of the network.
+
+An archive is a directory with one subdirectory per capture, named by the
+JST capture time. Each capture holds the documents fetched at that time at
+their path below the BOSAI base URL; a capture only needs the documents that
+changed:
+
+    archive/
+      20240829T060000/
+        quake/data/list.json
+        warning/data/warning/460000.json
+      20240829T061000/
+        warning/data/warning/460000.json
+
+The source maps the wall clock onto archive time at a configurable speed-up
+and serves, for each URL, the latest capture at or before the archive time.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from .const import (
+    DATA_REPLAY_SOURCE,
+    JMA_BOSAI_BASE_URL,
+    JMA_BOSAI_REPLAY_ARCHIVE,
+    JMA_BOSAI_REPLAY_SPEED,
+)
+from .records import JST
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_FORMAT = "%Y%m%dT%H%M%S"
+
+
+def url_path(url: str) -> str:
+    """Return the path of a BOSAI URL below the base URL."""
+    prefix = f"{JMA_BOSAI_BASE_URL}/"
+    return url[len(prefix):] if url.startswith(prefix) else url
+
+
+def capture_name(timestamp: float) -> str:
+    """Return the capture directory name for an epoch timestamp."""
+    return datetime.fromtimestamp(timestamp, JST).strftime(CAPTURE_FORMAT)
+
+
+@dataclass(frozen=True, slots=True)
+class ReplayArchive:
+    """Capture times and files per document path, oldest first."""
+
+    times: Dict[str, List[int]]
+    files: Dict[str, List[Path]]
+    start_ts: int
+    end_ts: int
+
+    @classmethod
+    def load(cls, directory: Path) -> ReplayArchive:
+        """Index an archive directory."""
+        frames: Dict[str, List[Tuple[int, Path]]] = {}
+        for capture in Path(directory).iterdir():
+            if not capture.is_dir():
+                continue
+            try:
+                captured_ts = int(datetime.strptime(capture.name, CAPTURE_FORMAT).replace(tzinfo=JST).timestamp())
+            except ValueError:
+                _LOGGER.debug(f"Skipping non-capture directory {capture}")
+                continue
+            for file in capture.rglob("*.json"):
+                frames.setdefault(file.relative_to(capture).as_posix(), []).append((captured_ts, file))
+
+        if not frames:
+            raise ValueError(f"No captures found in {directory}")
+        for path_frames in frames.values():
+            path_frames.sort()
+        return cls(
+            times={path: [ts for ts, _ in path_frames] for path, path_frames in frames.items()},
+            files={path: [file for _, file in path_frames] for path, path_frames in frames.items()},
+            start_ts=min(path_frames[0][0] for path_frames in frames.values()),
+            end_ts=max(path_frames[-1][0] for path_frames in frames.values()),
+        )
+
+    @property
+    def frame_count(self) -> int:
+        """Return the number of recorded documents."""
+        return sum(len(times) for times in self.times.values())
+
+    def frame(self, path: str, at_ts: float) -> Optional[Tuple[int, Path]]:
+        """Return capture time and file of the latest frame of a path at or before at_ts."""
+        times = self.times.get(path)
+        if not times:
+            return None
+        index = bisect.bisect_right(times, at_ts) - 1
+        if index < 0:
+            return None
+        return times[index], self.files[path][index]
+
+
+class ReplaySource:
+    """Serve archive documents on an accelerated archive clock.
+
+    The archive clock starts at the first capture when the source is created
+    and advances speed archive seconds per wall second. Every frame records
+    how late it was first served relative to when it became due, which is
+    the polling part of the end-to-end latency.
+    """
+
+    def __init__(
+        self,
+        archive: ReplayArchive,
+        speed: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the source."""
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.archive = archive
+        self.speed = speed
+        self._clock = clock
+        self._started = clock()
+        self._served: Dict[str, int] = {}
+
+    def now(self) -> float:
+        """Return the current archive time as an epoch timestamp."""
+        return self.archive.start_ts + (self._clock() - self._started) * self.speed
+
+    @property
+    def finished(self) -> bool:
+        """Return whether the archive clock has passed the last capture."""
+        return self.now() >= self.archive.end_ts
+
+    async def async_read(self, url: str) -> Tuple[Optional[bytes], Optional[float]]:
+        """Return the current body of a URL and, for a newly served frame, its lag.
+
+        The lag is in wall seconds since the frame became due. The body is
+        None when the archive has no capture of the URL yet.
+        """
+        now = self.now()
+        path = url_path(url)
+        frame = self.archive.frame(path, now)
+        if frame is None:
+            return None, None
+        captured_ts, file = frame
+        body = await asyncio.get_running_loop().run_in_executor(None, file.read_bytes)
+        if self._served.get(path) == captured_ts:
+            return body, None
+        self._served[path] = captured_ts
+        return body, (now - captured_ts) / self.speed
+
+
+async def async_setup_replay_source(hass: HomeAssistant) -> Optional[ReplaySource]:
+    """Load the archive named by JMA_BOSAI_REPLAY_ARCHIVE, if any, and share the source."""
+    if not JMA_BOSAI_REPLAY_ARCHIVE:
+        return None
+    source: ReplaySource | None = hass.data.get(DATA_REPLAY_SOURCE)
+    if source is None:
+        archive = await hass.async_add_executor_job(ReplayArchive.load, Path(JMA_BOSAI_REPLAY_ARCHIVE))
+        source = ReplaySource(archive, JMA_BOSAI_REPLAY_SPEED)
+        hass.data[DATA_REPLAY_SOURCE] = source
+        _LOGGER.warning(
+            f"Replaying {archive.frame_count} recorded documents from {JMA_BOSAI_REPLAY_ARCHIVE}"
+            f" at {JMA_BOSAI_REPLAY_SPEED}x instead of the JMA BOSAI API"
+        )
+    return source
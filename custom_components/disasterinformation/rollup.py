@@ -0,0 +1,105 @@
+"""Office-wide rollup of warnings over the class10/class20 hierarchy.
+
+Each class20 (市区町村) of an office gets a fixed bit position. Active
+warnings are folded into one integer bitset per severity, so counts and
+class10 (一次細分区域) membership are a handful of AND/popcount operations
+over the bitsets instead of walks over the area lists.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .api import warning_type
+
+SEVERITIES = ("特別警報", "警報", "注意報")
+ACTIVE_STATUSES = ("発表", "継続")
+
+
+@dataclass(frozen=True, slots=True)
+class OfficeLayout:
+    """Bit positions of the class20s of one office."""
+
+    office_code: str
+    positions: Dict[str, int]
+    class10_codes: Tuple[str, ...]
+    class10_names: Tuple[str, ...]
+    class10_masks: Tuple[int, ...]
+
+    @property
+    def size(self) -> int:
+        """Return the number of class20s."""
+        return len(self.positions)
+
+    @classmethod
+    def from_hierarchy(
+        cls, office_code: str, hierarchy: List[Tuple[str, str, List[str]]]
+    ) -> OfficeLayout:
+        """Build a layout from AreaManager.get_office_hierarchy()."""
+        positions: Dict[str, int] = {}
+        masks = []
+        for _, _, class20_codes in hierarchy:
+            mask = 0
+            for code in class20_codes:
+                mask |= 1 << positions.setdefault(code, len(positions))
+            masks.append(mask)
+        return cls(
+            office_code=office_code,
+            positions=positions,
+            class10_codes=tuple(code for code, _, _ in hierarchy),
+            class10_names=tuple(name for _, name, _ in hierarchy),
+            class10_masks=tuple(masks),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class OfficeRollup:
+    """Per-severity bitsets of the class20s under an active warning."""
+
+    layout: OfficeLayout
+    emergency: int = 0
+    warning: int = 0
+    advisory: int = 0
+
+    @property
+    def affected(self) -> int:
+        """Return the bitset of class20s under any warning."""
+        return self.emergency | self.warning | self.advisory
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of class20s by highest severity."""
+        return {
+            "特別警報": self.emergency.bit_count(),
+            "警報": (self.warning & ~self.emergency).bit_count(),
+            "注意報": (self.advisory & ~(self.warning | self.emergency)).bit_count(),
+        }
+
+    def class10s(self, bits: int) -> List[str]:
+        """Return the names of the class10s with at least one class20 in bits."""
+        return [
+            name
+            for name, mask in zip(self.layout.class10_names, self.layout.class10_masks)
+            if bits & mask
+        ]
+
+
+def compute_rollup(layout: OfficeLayout, document: Optional[Dict[str, Any]]) -> OfficeRollup:
+    """Fold the class20 warnings of a warning document into bitsets."""
+    bits = {severity: 0 for severity in SEVERITIES}
+    positions = layout.positions
+    for area_type in (document or {}).get("areaTypes", []):
+        for area in area_type.get("areas", []):
+            position = positions.get(area.get("code"))
+            if position is None:
+                continue
+            bit = 1 << position
+            for warning in area.get("warnings", []):
+                if warning.get("status") in ACTIVE_STATUSES:
+                    _, severity = warning_type(warning.get("code"))
+                    bits[severity] |= bit
+    return OfficeRollup(
+        layout=layout,
+        emergency=bits["特別警報"],
+        warning=bits["警報"],
+        advisory=bits["注意報"],
+    )
@@ -0,0 +1,162 @@
+"""Staggered refresh scheduling across config entries.
+
+Entries are grouped by the document they poll (a warning office, or the
+earthquake list). Groups get evenly spaced phases within the interval in a
+stable hash order, so refreshes no longer all fire at the same instant. The
+entries of a group stay within REFRESH_ALIGN_WINDOW seconds of each other,
+so one fetch of their document covers all of them, and each refresh gets up
+to REFRESH_JITTER seconds of random jitter on top.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Dict, Iterable, Optional, Set
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_SCHEDULER, DOMAIN, REFRESH_ALIGN_WINDOW, REFRESH_JITTER
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def hash_fraction(key: str) -> float:
+    """Map a key to a stable fraction in [0, 1)."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+def group_slots(groups: Iterable[str]) -> Dict[str, float]:
+    """Spread groups evenly over [0, 1) in a stable hash order."""
+    ordered = sorted(set(groups), key=hash_fraction)
+    return {group: index / len(ordered) for index, group in enumerate(ordered)}
+
+
+def next_refresh(now: float, interval: float, phase: float) -> float:
+    """Return the first time after now that is phase seconds into an interval.
+
+    Intervals are aligned to the epoch, so the schedule survives restarts.
+    """
+    wait = (phase - now) % interval
+    return now + (wait or interval)
+
+
+@dataclass(slots=True)
+class _ScheduledEntry:
+    """Scheduling state of one entry."""
+
+    config_entry: ConfigEntry
+    group: str
+    interval: float
+    refresh: Callable[[], Coroutine[Any, Any, None]]
+    unsub: Optional[CALLBACK_TYPE] = None
+    tasks: Set[asyncio.Task] = field(default_factory=set)
+
+
+class RefreshScheduler:
+    """Fire each entry's refresh at its group's phase of its interval."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._entries: Dict[str, _ScheduledEntry] = {}
+        self._slots: Dict[str, float] = {}
+
+    def phase(self, entry_id: str) -> float:
+        """Return the phase of an entry in seconds into its interval."""
+        entry = self._entries[entry_id]
+        offset = hash_fraction(entry_id) * min(REFRESH_ALIGN_WINDOW, entry.interval / 2)
+        return (self._slots[entry.group] * entry.interval + offset) % entry.interval
+
+    @callback
+    def async_add(
+        self,
+        config_entry: ConfigEntry,
+        group: str,
+        interval: timedelta,
+        refresh: Callable[[], Coroutine[Any, Any, None]],
+    ) -> CALLBACK_TYPE:
+        """Schedule an entry and return a callback removing it."""
+        entry_id = config_entry.entry_id
+        self._entries[entry_id] = _ScheduledEntry(config_entry, group, interval.total_seconds(), refresh)
+        self._async_reslot()
+
+        @callback
+        def _remove() -> None:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                return
+            if entry.unsub is not None:
+                entry.unsub()
+            # Refreshes still running would outlive the entry
+            for task in entry.tasks:
+                task.cancel()
+            self._async_reslot()
+
+        return _remove
+
+    @callback
+    def async_set_interval(self, entry_id: str, interval: timedelta) -> None:
+        """Change the interval of an entry and reschedule it."""
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return
+        entry.interval = interval.total_seconds()
+        self._async_schedule(entry_id)
+
+    @callback
+    def _async_reslot(self) -> None:
+        """Recompute group phases and reschedule every entry whose phase moved."""
+        slots = group_slots(entry.group for entry in self._entries.values())
+        moved = {group for group, slot in slots.items() if self._slots.get(group) != slot}
+        self._slots = slots
+        if moved:
+            _LOGGER.debug(f"Spreading {len(slots)} refresh groups over their intervals")
+        for entry_id, entry in self._entries.items():
+            if entry.group in moved or entry.unsub is None:
+                self._async_schedule(entry_id)
+
+    @callback
+    def _async_schedule(self, entry_id: str) -> None:
+        """Schedule the next refresh of an entry."""
+        entry = self._entries[entry_id]
+        if entry.unsub is not None:
+            entry.unsub()
+        now = time.time()
+        delay = next_refresh(now, entry.interval, self.phase(entry_id)) - now
+        delay += random.uniform(0, REFRESH_JITTER)
+        entry.unsub = async_call_later(self._hass, delay, partial(self._async_fire, entry_id))
+
+    @callback
+    def _async_fire(self, entry_id: str, _now: datetime) -> None:
+        """Start an entry's refresh and schedule the next one."""
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return
+        entry.unsub = None
+        self._async_schedule(entry_id)
+        task = entry.config_entry.async_create_background_task(
+            self._hass, entry.refresh(), f"{DOMAIN} scheduled refresh {entry_id}"
+        )
+        entry.tasks.add(task)
+        task.add_done_callback(entry.tasks.discard)
+
+
+def async_get_scheduler(hass: HomeAssistant) -> RefreshScheduler:
+    """Return the shared refresh scheduler, creating it on first use."""
+    scheduler: RefreshScheduler | None = hass.data.get(DATA_SCHEDULER)
+    if scheduler is None:
+        scheduler = RefreshScheduler(hass)
+        hass.data[DATA_SCHEDULER] = scheduler
+    return scheduler
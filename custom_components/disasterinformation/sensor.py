@@ -2,16 +2,21 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Callable
 
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, ENTITY_NAME_WARNING, ENTITY_NAME_EARTHQUAKE, INFO_TYPE_EARTHQUAKE, INFO_TYPE_WEATHER_WARNING
+from .const import DATA_OFFICE_ROLLUPS, DOMAIN, ENTITY_NAME_WARNING, ENTITY_NAME_EARTHQUAKE, INFO_TYPE_EARTHQUAKE, INFO_TYPE_WEATHER_WARNING, INTENSITY_WINDOW, SIGNAL_OFFICE_ROLLUP_OWNER, WARNING_CODES
+from .activity import ActivitySummary
 from .area_mapping import get_entity_prefix, get_english_name
+from .rollup import OfficeLayout, OfficeRollup, compute_rollup
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,13 +37,49 @@ async def async_setup_entry(
     if information_type == INFO_TYPE_EARTHQUAKE:
         # Create earthquake sensor
         entities.append(DisasterEarthquakeSensor(coordinator, config_entry))
+        
+        # Rolling activity statistics for automation thresholds
+        entities.extend(
+            DisasterEarthquakeActivitySensor(coordinator, config_entry, key)
+            for key in ACTIVITY_SENSORS
+        )
     else:
         # Create warning sensor
         entities.append(DisasterWarningsSensor(coordinator, config_entry))
+        
+        # Forecast peak level from the warning timeSeries
+        entities.extend([
+            DisasterForecastLevelSensor(coordinator, config_entry),
+            DisasterForecastPeakTimeSensor(coordinator, config_entry),
+            DisasterFeltIntensitySensor(coordinator, config_entry),
+        ])
+        
+        # One prefecture-wide overview per office, owned by the first entry for it
+        # and handed to another entry of the office when the owner unloads
+        office_code = config_entry.data.get("warning_area_code")
+        if office_code:
+            @callback
+            def _async_take_over_rollup() -> None:
+                async_add_entities([DisasterOfficeRollupSensor(coordinator, config_entry, office_code)])
+
+            config_entry.async_on_unload(async_dispatcher_connect(
+                hass, SIGNAL_OFFICE_ROLLUP_OWNER.format(config_entry.entry_id), _async_take_over_rollup
+            ))
+            if _claim_office_rollup(hass, office_code, config_entry.entry_id):
+                entities.append(DisasterOfficeRollupSensor(coordinator, config_entry, office_code))
+    
+    # Refresh timing diagnostics (disabled by default)
+    entities.append(DisasterRefreshTimingSensor(coordinator, config_entry))
     
     async_add_entities(entities)
 
 
+def _claim_office_rollup(hass: HomeAssistant, office_code: str, entry_id: str) -> bool:
+    """Return True if this entry owns the overview sensor of the office."""
+    owners = hass.data.setdefault(DATA_OFFICE_ROLLUPS, {})
+    return owners.setdefault(office_code, entry_id) == entry_id
+
+
 class DisasterWarningsSensor(CoordinatorEntity, SensorEntity):
     """Sensor for disaster warnings."""
 
@@ -72,13 +113,13 @@ class DisasterWarningsSensor(CoordinatorEntity, SensorEntity):
         advisories = all_advisories
         
         if special_warnings:
-            types = [warning.get("name", "不明") for warning in special_warnings]
+            types = [warning.name for warning in special_warnings]
             return f"特別警報({' '.join(types)})"
         elif regular_warnings:
-            types = [warning.get("name", "不明") for warning in regular_warnings]
+            types = [warning.name for warning in regular_warnings]
             return f"警報({' '.join(types)})"
         elif advisories:
-            types = [warning.get("name", "不明") for warning in advisories]
+            types = [warning.name for warning in advisories]
             return f"注意報({' '.join(types)})"
         
         return "発表なし"
@@ -95,9 +136,9 @@ class DisasterWarningsSensor(CoordinatorEntity, SensorEntity):
         all_emergency_warnings = self.coordinator.data.get("emergency_warnings", [])
         
         # Extract warning names for each severity
-        special_warning_types = [w.get("name", "不明") for w in all_emergency_warnings]
-        warning_types = [w.get("name", "不明") for w in all_warnings]
-        advisory_types = [w.get("name", "不明") for w in all_advisories]
+        special_warning_types = [w.name for w in all_emergency_warnings]
+        warning_types = [w.name for w in all_warnings]
+        advisory_types = [w.name for w in all_advisories]
         
         # Calculate total count
         total_count = len(all_warnings) + len(all_advisories) + len(all_emergency_warnings)
@@ -114,7 +155,9 @@ class DisasterWarningsSensor(CoordinatorEntity, SensorEntity):
             "has_advisory": len(all_advisories) > 0,
             "last_update": self.coordinator.data.get("last_update"),
             "status": self.coordinator.data.get("status", "unknown"),
-            "raw_warnings": all_warnings + all_advisories + all_emergency_warnings,  # 詳細なデバッグ情報
+            "raw_warnings": [
+                w.as_dict() for w in all_warnings + all_advisories + all_emergency_warnings
+            ],  # 詳細なデバッグ情報
         }
 
     @property
@@ -138,6 +181,185 @@ class DisasterWarningsSensor(CoordinatorEntity, SensorEntity):
             return "mdi:weather-sunny"  # 発表なし - 平常時
 
 
+class DisasterForecastLevelSensor(CoordinatorEntity, SensorEntity):
+    """Highest forecast warning level within the forecast horizon."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:chart-bell-curve-cumulative"
+
+    def __init__(self, coordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        prefecture_en, city_en = get_english_name(config_entry.data['prefecture'], config_entry.data['city'])
+        self._attr_name = f"{prefecture_en} {city_en} Forecast Peak Level"
+        self._attr_unique_id = f"{prefecture_en.lower()}_{city_en.lower()}_forecast_peak_level"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the peak level."""
+        forecast = (self.coordinator.data or {}).get("forecast")
+        return forecast.level if forecast else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the warning and time of the peak."""
+        forecast = (self.coordinator.data or {}).get("forecast")
+        if not forecast:
+            return {}
+        attributes: dict[str, Any] = {"horizon_hours": forecast.horizon_hours}
+        if forecast.peak_ts is not None:
+            attributes.update({
+                "peak_warning": WARNING_CODES.get(forecast.code, forecast.code),
+                "peak_time": dt_util.as_local(dt_util.utc_from_timestamp(forecast.peak_ts)).isoformat(),
+                "hours_to_peak": round((forecast.peak_ts - self.coordinator.api_client.now()) / 3600, 1),
+            })
+        return attributes
+
+
+class DisasterForecastPeakTimeSensor(CoordinatorEntity, SensorEntity):
+    """Start of the first time slot reaching the forecast peak level."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:clock-alert-outline"
+
+    def __init__(self, coordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        prefecture_en, city_en = get_english_name(config_entry.data['prefecture'], config_entry.data['city'])
+        self._attr_name = f"{prefecture_en} {city_en} Forecast Peak Time"
+        self._attr_unique_id = f"{prefecture_en.lower()}_{city_en.lower()}_forecast_peak_time"
+
+    @property
+    def native_value(self):
+        """Return when the peak level starts, or None when nothing is forecast."""
+        forecast = (self.coordinator.data or {}).get("forecast")
+        if not forecast or forecast.peak_ts is None:
+            return None
+        return dt_util.utc_from_timestamp(forecast.peak_ts)
+
+
+class DisasterFeltIntensitySensor(CoordinatorEntity, SensorEntity):
+    """Strongest seismic intensity felt in the configured municipality."""
+
+    _attr_icon = "mdi:home-alert"
+
+    def __init__(self, coordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        prefecture_en, city_en = get_english_name(config_entry.data['prefecture'], config_entry.data['city'])
+        self._attr_name = f"{prefecture_en} {city_en} Max Intensity"
+        self._attr_unique_id = f"{prefecture_en.lower()}_{city_en.lower()}_max_intensity"
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the intensity, e.g. 5+, or なし when nothing was felt."""
+        if not self.coordinator.data or self.coordinator.data.get("status") == "error":
+            return None
+        if not self.coordinator.data.get("felt_available"):
+            # No earthquake list to read the intensities from
+            return None
+        felt = self.coordinator.data.get("felt_intensity")
+        return felt.intensity if felt else "なし"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the event behind the maximum."""
+        data = self.coordinator.data or {}
+        attributes: dict[str, Any] = {
+            "window_hours": INTENSITY_WINDOW,
+            "felt_count": data.get("felt_count", 0),
+        }
+        felt = data.get("felt_intensity")
+        if felt:
+            attributes.update({
+                "event_id": felt.event_id,
+                "origin_time": dt_util.as_local(dt_util.utc_from_timestamp(felt.origin_ts)).isoformat(),
+                "hypocenter": felt.hypocenter,
+            })
+        return attributes
+
+
+class DisasterOfficeRollupSensor(CoordinatorEntity, SensorEntity):
+    """Prefecture-wide count of municipalities under a warning."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:map-marker-alert"
+
+    def __init__(self, coordinator, config_entry: ConfigEntry, office_code: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        self._office_code = office_code
+        # Built once the coordinator has the area hierarchy
+        self._layout: OfficeLayout | None = None
+        self._rollup: OfficeRollup | None = None
+        self._document: dict | None = None
+        prefecture_en, _ = get_english_name(config_entry.data['prefecture'], config_entry.data['city'])
+        self._attr_name = f"{prefecture_en} Weather Alert Overview"
+        self._attr_unique_id = f"{office_code}_weather_alert_overview"
+
+    async def async_added_to_hass(self) -> None:
+        """Compute the initial rollup."""
+        await super().async_added_to_hass()
+        self._update_rollup()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Release the office so another entry can own the overview."""
+        owners = self.hass.data.get(DATA_OFFICE_ROLLUPS, {})
+        if owners.get(self._office_code) == self._config_entry.entry_id:
+            owners.pop(self._office_code)
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Recompute the bitsets when the office document changed."""
+        self._update_rollup()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _update_rollup(self) -> None:
+        """Fold the current office document into per-severity bitsets."""
+        if self._layout is None:
+            area_manager = self.coordinator.area_manager
+            hierarchy = area_manager.get_office_hierarchy(self._office_code) if area_manager else None
+            if not hierarchy:
+                return
+            self._layout = OfficeLayout.from_hierarchy(self._office_code, hierarchy)
+        snapshot = self.coordinator.feeds.snapshot
+        document = snapshot.warning(self._office_code) if snapshot else None
+        if document is not None and document is not self._document:
+            self._document = document
+            self._rollup = compute_rollup(self._layout, document)
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the number of municipalities under any warning."""
+        if self._rollup is None:
+            return None
+        return self._rollup.affected.bit_count()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return counts per severity and the affected class10 zones."""
+        rollup = self._rollup
+        if rollup is None:
+            return {"office_code": self._office_code}
+        counts = rollup.counts()
+        return {
+            "office_code": self._layout.office_code,
+            "municipality_count": self._layout.size,
+            "special_warning_count": counts["特別警報"],
+            "warning_count": counts["警報"],
+            "advisory_count": counts["注意報"],
+            "special_warning_zones": rollup.class10s(rollup.emergency),
+            "warning_zones": rollup.class10s(rollup.warning),
+            "advisory_zones": rollup.class10s(rollup.advisory),
+        }
+
+
 class DisasterEarthquakeSensor(CoordinatorEntity, SensorEntity):
     """Sensor for earthquake information."""
 
@@ -169,7 +391,6 @@ class DisasterEarthquakeSensor(CoordinatorEntity, SensorEntity):
             return {}
         
         data = self.coordinator.data
-        earthquakes = data.get("earthquakes", [])
         latest = data.get("latest_earthquake")
         
         attributes = {
@@ -181,33 +402,23 @@ class DisasterEarthquakeSensor(CoordinatorEntity, SensorEntity):
         
         # Add latest earthquake details
         if latest:
-            attributes.update({
-                "latest_earthquake": {
-                    "event_id": latest.get("event_id", ""),
-                    "origin_time": latest.get("origin_time", ""),
-                    "report_datetime": latest.get("report_datetime", ""),
-                    "hypocenter": latest.get("hypocenter", ""),
-                    "magnitude": latest.get("magnitude", ""),
-                }
-            })
+            attributes["latest_earthquake"] = {
+                "event_id": latest.event_id,
+                "origin_time": latest.origin_time,
+                "report_datetime": latest.report_datetime,
+                "hypocenter": latest.hypocenter,
+                "magnitude": f"{latest.magnitude:.1f}",
+            }
         
         # Add recent earthquakes list (10 most recent with report_datetime, hypocenter, magnitude only)
-        # Filter out earthquakes without hypocenter data
-        recent_earthquakes = data.get("recent_earthquakes", [])
-        formatted_recent = []
-        for eq in recent_earthquakes:
-            hypocenter = eq.get("hypocenter", "")
-            magnitude = eq.get("magnitude")
-            
-            # Skip earthquakes without hypocenter or magnitude data
-            if not hypocenter or not magnitude:
-                continue
-                
-            formatted_recent.append({
-                "report_datetime": eq.get("report_datetime", ""),
-                "hypocenter": hypocenter,
-                "magnitude": magnitude,
-            })
+        formatted_recent = [
+            {
+                "report_datetime": eq.report_datetime,
+                "hypocenter": eq.hypocenter,
+                "magnitude": f"{eq.magnitude:.1f}",
+            }
+            for eq in data.get("recent_earthquakes", [])
+        ]
         
         attributes["recent_earthquakes"] = formatted_recent
         
@@ -216,4 +427,113 @@ class DisasterEarthquakeSensor(CoordinatorEntity, SensorEntity):
     @property
     def icon(self) -> str:
         """Return the icon for the sensor."""
-        return "mdi:earth"
\ No newline at end of file
+        return "mdi:earth"
+
+
+# key: (name, unit, icon, value of an ActivitySummary)
+ACTIVITY_SENSORS: dict[str, tuple[str, str | None, str, Callable[[ActivitySummary], float | None]]] = {
+    "rate": ("Earthquake Rate", "events/h", "mdi:chart-timeline-variant", lambda summary: round(summary.rate, 2)),
+    "max_magnitude": ("Earthquake Max Magnitude", None, "mdi:arrow-collapse-up", lambda summary: summary.max_magnitude),
+    "energy_magnitude": (
+        "Earthquake Energy Magnitude",
+        None,
+        "mdi:flash",
+        lambda summary: None if summary.energy_magnitude is None else round(summary.energy_magnitude, 2),
+    ),
+    "rate_ratio": (
+        "Earthquake Rate Ratio",
+        None,
+        "mdi:chart-line-variant",
+        lambda summary: None if summary.rate_ratio is None else round(summary.rate_ratio, 2),
+    ),
+}
+
+
+class DisasterEarthquakeActivitySensor(CoordinatorEntity, SensorEntity):
+    """Rolling earthquake activity over the entry's time range.
+
+    The energy magnitude is the magnitude of one event releasing the total
+    energy of the window, and the rate ratio compares the window's rate with
+    the rate over the past week.
+    """
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, config_entry: ConfigEntry, key: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        name, unit, icon, self._value = ACTIVITY_SENSORS[key]
+        self._attr_name = name
+        self._attr_native_unit_of_measurement = unit
+        self._attr_icon = icon
+        self._attr_unique_id = f"{config_entry.entry_id}_earthquake_{key}"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the statistic, or None before the first refresh."""
+        summary = (self.coordinator.data or {}).get("activity")
+        return self._value(summary) if summary else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the window and baseline behind the statistic."""
+        summary = (self.coordinator.data or {}).get("activity")
+        if not summary:
+            return {}
+        return {
+            "window_hours": summary.window_hours,
+            "count": summary.count,
+            "energy_joules": summary.energy,
+            "baseline_hours": summary.baseline_hours,
+            "baseline_rate": round(summary.baseline_rate, 3),
+            "min_magnitude": (self.coordinator.data or {}).get("min_magnitude", 0.0),
+        }
+
+
+class DisasterRefreshTimingSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor for refresh stage timings."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(self, coordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        if config_entry.data.get("information_type") == INFO_TYPE_EARTHQUAKE:
+            self._attr_name = "Earthquake Refresh Timing"
+        else:
+            prefecture_en, city_en = get_english_name(config_entry.data['prefecture'], config_entry.data['city'])
+            self._attr_name = f"{prefecture_en} {city_en} Refresh Timing"
+        self._attr_unique_id = f"{config_entry.entry_id}_refresh_timing"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the duration of the last refresh in milliseconds."""
+        refresh = self.coordinator.metrics.stages.get("refresh")
+        if refresh is None or refresh.last is None:
+            return None
+        return round(refresh.last * 1000, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return p50/p95/max per stage in milliseconds."""
+        attributes: dict[str, Any] = {}
+        feeds = self.coordinator.feeds
+        for metrics in (feeds.metrics, feeds.limiter.metrics, self.coordinator.metrics):
+            for stage, stats in metrics.stages.items():
+                summary = stats.summary()
+                for key in ("p50", "p95", "max"):
+                    if key in summary:
+                        attributes[f"{stage}_{key}_ms"] = round(summary[key] * 1000, 1)
+        feed_bytes = self.coordinator.feeds.metrics.bytes.summary()
+        if feed_bytes.get("count"):
+            attributes["download_bytes_p50"] = feed_bytes["p50"]
+            attributes["download_bytes_max"] = feed_bytes["max"]
+        attributes.update(self.coordinator.feeds.metrics.counters)
+        return attributes
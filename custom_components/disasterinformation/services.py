@@ -0,0 +1,153 @@
+"""Services for 気象庁防災情報."""
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .area_manager import AreaManager, async_get_area_manager
+from .const import (
+    DOMAIN,
+    HISTORY_KIND_EARTHQUAKES,
+    HISTORY_KIND_WARNINGS,
+    HISTORY_QUERY_LIMIT,
+    PROFILE_TARGET_AREA_DATA,
+    PROFILE_TARGET_REFRESH,
+    SERVICE_PROFILE,
+    SERVICE_QUERY_HISTORY,
+    SERVICE_RESOLVE_AREAS,
+    WARNING_SEVERITY,
+)
+from .geo import async_get_boundary_index, boundary_data_path
+from .history import async_get_history_store
+from .profiler import async_get_profiler
+from .ratelimit import async_get_limiter
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("count", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+    vol.Optional("target", default=PROFILE_TARGET_REFRESH): vol.In(
+        [PROFILE_TARGET_REFRESH, PROFILE_TARGET_AREA_DATA]
+    ),
+    vol.Optional("entry_id"): cv.string,
+})
+
+QUERY_HISTORY_SCHEMA = vol.Schema({
+    vol.Required("kind"): vol.In([HISTORY_KIND_EARTHQUAKES, HISTORY_KIND_WARNINGS]),
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("min_magnitude"): vol.Coerce(float),
+    vol.Optional("area_code"): cv.string,
+    vol.Optional("code"): cv.string,
+    vol.Optional("name"): cv.string,
+    vol.Optional("severity"): vol.In(list(WARNING_SEVERITY)),
+    vol.Optional("limit", default=HISTORY_QUERY_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+})
+
+
+RESOLVE_AREAS_SCHEMA = vol.Schema({
+    vol.Optional("locations"): vol.All(cv.ensure_list, [
+        vol.Schema({
+            vol.Required("latitude"): cv.latitude,
+            vol.Required("longitude"): cv.longitude,
+        }, extra=vol.ALLOW_EXTRA),
+    ]),
+})
+
+
+def _as_aware(value):
+    """Interpret naive service datetimes in the configured time zone."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def _async_handle_profile(call: ServiceCall) -> None:
+        """Arm the profiler for refreshes or profile area data loading now."""
+        profiler = async_get_profiler(hass)
+        count = call.data["count"]
+
+        if call.data["target"] == PROFILE_TARGET_AREA_DATA:
+            if not profiler.async_arm(count, label=PROFILE_TARGET_AREA_DATA):
+                return
+            for _ in range(count):
+                await profiler.async_profile(AreaManager(async_get_limiter(hass)).load_area_data())
+            return
+
+        entry_id = call.data.get("entry_id")
+        if entry_id is not None and entry_id not in hass.data.get(DOMAIN, {}):
+            # The profiler would wait for refreshes that never come
+            raise HomeAssistantError(f"Entry {entry_id} is not loaded")
+        profiler.async_arm(count, entry_id=entry_id)
+
+    async def _async_handle_query_history(call: ServiceCall) -> ServiceResponse:
+        """Query the local earthquake and warning history."""
+        store = await async_get_history_store(hass)
+        start = _as_aware(call.data.get("start"))
+        end = _as_aware(call.data.get("end"))
+
+        if call.data["kind"] == HISTORY_KIND_EARTHQUAKES:
+            return await store.async_query_earthquakes(
+                start=start,
+                end=end,
+                min_magnitude=call.data.get("min_magnitude"),
+                area_code=call.data.get("area_code"),
+                limit=call.data["limit"],
+            )
+        return await store.async_query_warnings(
+            start=start,
+            end=end,
+            area_code=call.data.get("area_code"),
+            code=call.data.get("code"),
+            severity=call.data.get("severity"),
+            name=call.data.get("name"),
+            limit=call.data["limit"],
+        )
+
+    async def _async_handle_resolve_areas(call: ServiceCall) -> ServiceResponse:
+        """Resolve coordinates (default: the home location) to class20 areas."""
+        index = await async_get_boundary_index(hass)
+        if index is None:
+            raise HomeAssistantError(f"No boundary data is installed at {boundary_data_path(hass)}")
+
+        locations = call.data.get("locations") or [
+            {"latitude": hass.config.latitude, "longitude": hass.config.longitude}
+        ]
+        codes = index.lookup_many(
+            [location["latitude"] for location in locations],
+            [location["longitude"] for location in locations],
+        )
+        manager = await async_get_area_manager(hass)
+        areas = []
+        for location, code in zip(locations, codes):
+            # Other keys of each location (e.g. a site name) are passed through
+            resolved = manager.get_class20_location(code) if code else None
+            areas.append({**location, **(resolved or {"area_code": code})})
+        return {"areas": areas}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, _async_handle_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_HISTORY,
+        _async_handle_query_history,
+        schema=QUERY_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESOLVE_AREAS,
+        _async_handle_resolve_areas,
+        schema=RESOLVE_AREAS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,141 @@
+"""Per-hypocenter event index and swarm detection from list.json."""
+from __future__ import annotations
+
+import bisect
+import heapq
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .const import DATA_HYPOCENTER_INDEXES
+from .records import format_timestamp, intern, parse_magnitude, parse_timestamp
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+@dataclass(frozen=True, slots=True)
+class Swarm:
+    """A hypocenter region with more events than the threshold in the window."""
+
+    hypocenter: str
+    count: int
+    max_magnitude: float
+    first_ts: int
+    last_ts: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the attribute representation."""
+        return {
+            "hypocenter": self.hypocenter,
+            "count": self.count,
+            "max_magnitude": f"{self.max_magnitude:.1f}",
+            "first_time": format_timestamp(self.first_ts),
+            "last_time": format_timestamp(self.last_ts),
+        }
+
+
+class HypocenterIndex:
+    """Hypocenter region -> events at or above a magnitude within a window, oldest first.
+
+    Like the intensity index, only events that are new or whose report
+    changed are parsed, and expiry pops the oldest events off a heap, so an
+    event costs O(log n) to add or expire however long the window is. The
+    count of a region is the length of its list.
+    """
+
+    def __init__(self, min_magnitude: float, window_hours: int) -> None:
+        """Initialize the index."""
+        self.min_magnitude = min_magnitude
+        self.window_hours = window_hours
+        self.window = window_hours * 3600
+        self._versions: Dict[str, Tuple[str, int]] = {}
+        self._events: Dict[str, Tuple[str, int, float]] = {}
+        self._regions: Dict[str, List[Tuple[int, str, float]]] = {}
+        self._expiry: List[Tuple[int, str]] = []
+        self._last_list: Optional[Iterable[Dict[str, Any]]] = None
+
+    def update(self, earthquake_list: Iterable[Dict[str, Any]], now: int) -> None:
+        """Fold new or revised events of a list.json snapshot and expire old ones."""
+        cutoff = now - self.window
+        if earthquake_list is not self._last_list:
+            self._last_list = earthquake_list
+            for entry in earthquake_list:
+                event_id = entry.get("eid")
+                version = entry.get("ctt") or entry.get("rdt") or ""
+                if not event_id:
+                    continue
+                previous = self._versions.get(event_id)
+                if previous is not None and previous[0] == version:
+                    continue
+                origin_ts = parse_timestamp(entry.get("at"))
+                if origin_ts is None or origin_ts < cutoff:
+                    continue
+                if previous is None or previous[1] != origin_ts:
+                    heapq.heappush(self._expiry, (origin_ts, event_id))
+                self._versions[event_id] = (version, origin_ts)
+                self._remove(event_id)
+                magnitude = parse_magnitude(entry.get("mag"))
+                hypocenter = entry.get("anm")
+                if hypocenter and magnitude is not None and magnitude >= self.min_magnitude:
+                    self._add(event_id, intern(hypocenter), origin_ts, magnitude)
+        self._expire(cutoff)
+
+    def events(self, hypocenter: str) -> List[Tuple[int, str, float]]:
+        """Return (origin_ts, event_id, magnitude) of a region's events, oldest first."""
+        return list(self._regions.get(hypocenter, ()))
+
+    def count(self, hypocenter: str) -> int:
+        """Return the number of events of a region in the window."""
+        return len(self._regions.get(hypocenter, ()))
+
+    def swarms(self, threshold: int) -> List[Swarm]:
+        """Return the regions with more than threshold events, busiest first."""
+        swarms = [
+            Swarm(
+                hypocenter=hypocenter,
+                count=len(events),
+                max_magnitude=max(magnitude for _, _, magnitude in events),
+                first_ts=events[0][0],
+                last_ts=events[-1][0],
+            )
+            for hypocenter, events in self._regions.items()
+            if len(events) > threshold
+        ]
+        swarms.sort(key=lambda swarm: (-swarm.count, -swarm.last_ts))
+        return swarms
+
+    def _add(self, event_id: str, hypocenter: str, origin_ts: int, magnitude: float) -> None:
+        """Insert an event into its region in origin order."""
+        self._events[event_id] = (hypocenter, origin_ts, magnitude)
+        bisect.insort(self._regions.setdefault(hypocenter, []), (origin_ts, event_id, magnitude))
+
+    def _remove(self, event_id: str) -> None:
+        """Take an event out of its region."""
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return
+        hypocenter, origin_ts, magnitude = event
+        events = self._regions[hypocenter]
+        del events[bisect.bisect_left(events, (origin_ts, event_id, magnitude))]
+        if not events:
+            del self._regions[hypocenter]
+
+    def _expire(self, cutoff: int) -> None:
+        """Drop events that left the window, oldest first."""
+        while self._expiry and self._expiry[0][0] < cutoff:
+            origin_ts, event_id = heapq.heappop(self._expiry)
+            version = self._versions.get(event_id)
+            # A revision may have moved the origin time; the newer heap entry expires it
+            if version is not None and version[1] == origin_ts:
+                self._remove(event_id)
+                del self._versions[event_id]
+
+
+def async_get_hypocenter_index(hass: HomeAssistant, min_magnitude: float, window_hours: int) -> HypocenterIndex:
+    """Return the shared index for a magnitude floor and window, creating it on first use."""
+    indexes: Dict[Tuple[float, int], HypocenterIndex] = hass.data.setdefault(DATA_HYPOCENTER_INDEXES, {})
+    index = indexes.get((min_magnitude, window_hours))
+    if index is None:
+        index = HypocenterIndex(min_magnitude, window_hours)
+        indexes[(min_magnitude, window_hours)] = index
+    return index
@@ -0,0 +1,75 @@
+"""Keyed diff of warnings between consecutive refreshes."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from .records import WarningRecord
+
+WarningKey = Tuple[str, str]  # (area_code, code)
+
+SEVERITY_RANK = {
+    "注意報": 1,
+    "警報": 2,
+    "特別警報": 3,
+}
+
+# Longest suffix first so 大雨特別警報 reduces to 大雨, not 大雨特別
+_SEVERITY_SUFFIXES = ("特別警報", "危険警報", "注意報", "警報")
+
+
+def index_warnings(warnings: Iterable[WarningRecord]) -> Dict[WarningKey, WarningRecord]:
+    """Index warnings by (area_code, code)."""
+    return {(warning.area_code, warning.code): warning for warning in warnings}
+
+
+def phenomenon(warning: WarningRecord) -> str:
+    """Return the phenomenon of a warning name, e.g. 大雨 for 大雨注意報."""
+    name = warning.name
+    for suffix in _SEVERITY_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+@dataclass(frozen=True)
+class WarningDelta:
+    """Warnings issued, upgraded and lifted between two refreshes."""
+
+    issued: List[WarningRecord] = field(default_factory=list)
+    upgraded: List[Tuple[WarningRecord, WarningRecord]] = field(default_factory=list)
+    lifted: List[WarningRecord] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Return True if anything changed."""
+        return bool(self.issued or self.upgraded or self.lifted)
+
+
+def diff_warnings(
+    previous: Mapping[WarningKey, WarningRecord],
+    current: Mapping[WarningKey, WarningRecord],
+) -> WarningDelta:
+    """Diff two keyed warning sets in O(n).
+
+    A newly issued warning whose area simultaneously lost a lower severity
+    warning of the same phenomenon (大雨注意報 -> 大雨警報) is reported as an
+    upgrade instead of an issue plus a lift.
+    """
+    added = [current[key] for key in current.keys() - previous.keys()]
+    removed = {
+        (key[0], phenomenon(previous[key])): previous[key]
+        for key in previous.keys() - current.keys()
+    }
+
+    issued = []
+    upgraded = []
+    for warning in added:
+        match_key = (warning.area_code, phenomenon(warning))
+        old = removed.get(match_key)
+        if old is not None and SEVERITY_RANK.get(warning.severity, 0) > SEVERITY_RANK.get(old.severity, 0):
+            upgraded.append((old, warning))
+            del removed[match_key]
+        else:
+            issued.append(warning)
+
+    return WarningDelta(issued=issued, upgraded=upgraded, lifted=list(removed.values()))
@@ -0,0 +1,129 @@
+"""Websocket subscriptions to an entry's warnings and recent earthquakes."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DATA_SUBSCRIPTIONS, DOMAIN, INFO_TYPE_WEATHER_WARNING, WS_TYPE_SUBSCRIBE
+from .deltas import EntryState
+
+if TYPE_CHECKING:
+    from . import DisasterInformationCoordinator
+
+
+class EntryPublisher:
+    """Diffs one coordinator's updates once and fans the delta out to every subscriber."""
+
+    def __init__(self, coordinator: DisasterInformationCoordinator) -> None:
+        """Initialize the publisher."""
+        self.coordinator = coordinator
+        self.state = EntryState(
+            coordinator.entry.data.get("information_type", INFO_TYPE_WEATHER_WARNING)
+        )
+        # Subscriber send and close callbacks
+        self._subscribers: list[tuple[Callable[[dict[str, Any]], None], CALLBACK_TYPE]] = []
+        self._unsub_coordinator: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_subscribe(self, send: Callable[[dict[str, Any]], None], close: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Send the snapshot to a new subscriber and deltas from then on.
+
+        close is called if the entry unloads while the subscriber is still there.
+        """
+        if not self._subscribers:
+            # Nobody was listening, so catch up silently before the snapshot
+            self.state.update(self.coordinator.data)
+            self._unsub_coordinator = self.coordinator.async_add_listener(self._async_coordinator_updated)
+        subscriber = (send, close)
+        self._subscribers.append(subscriber)
+        send(self.state.snapshot())
+
+        @callback
+        def _unsubscribe() -> None:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            if not self._subscribers:
+                self._async_detach()
+
+        return _unsubscribe
+
+    @callback
+    def async_close(self) -> None:
+        """Close every subscription, e.g. because the entry unloaded."""
+        subscribers, self._subscribers = self._subscribers, []
+        self._async_detach()
+        for _, close in subscribers:
+            close()
+
+    @callback
+    def _async_detach(self) -> None:
+        """Stop listening to the coordinator."""
+        if self._unsub_coordinator is not None:
+            self._unsub_coordinator()
+            self._unsub_coordinator = None
+
+    @callback
+    def _async_coordinator_updated(self) -> None:
+        """Publish what changed in the coordinator data."""
+        delta = self.state.update(self.coordinator.data)
+        if delta is None:
+            return
+        for send, _ in list(self._subscribers):
+            send(delta)
+
+
+@callback
+def async_get_publisher(hass: HomeAssistant, coordinator: DisasterInformationCoordinator) -> EntryPublisher:
+    """Return the publisher of an entry's coordinator, creating it on first use."""
+    publishers: dict[str, EntryPublisher] = hass.data.setdefault(DATA_SUBSCRIPTIONS, {})
+    entry_id = coordinator.entry.entry_id
+    publisher = publishers.get(entry_id)
+    if publisher is None:
+        publisher = EntryPublisher(coordinator)
+        publishers[entry_id] = publisher
+    return publisher
+
+
+@callback
+def async_close_subscriptions(hass: HomeAssistant, entry_id: str) -> None:
+    """Close the subscriptions of an unloading entry; clients subscribe again after a reload."""
+    publisher: EntryPublisher | None = hass.data.get(DATA_SUBSCRIPTIONS, {}).pop(entry_id, None)
+    if publisher is not None:
+        publisher.async_close()
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): WS_TYPE_SUBSCRIBE,
+    vol.Required("entry_id"): str,
+})
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Subscribe to the snapshot and deltas of an entry."""
+    coordinator = hass.data.get(DOMAIN, {}).get(msg["entry_id"])
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, f"Entry {msg['entry_id']} is not loaded")
+        return
+
+    @callback
+    def _send(message: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], message))
+
+    @callback
+    def _close() -> None:
+        connection.subscriptions.pop(msg["id"], None)
+        _send({"type": "closed", "reason": "entry_unloaded"})
+
+    connection.send_result(msg["id"])
+    connection.subscriptions[msg["id"]] = async_get_publisher(hass, coordinator).async_subscribe(_send, _close)
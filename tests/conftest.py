@@ -0,0 +1,21 @@
+"""Make the integration's processing modules importable without Home Assistant.
+
+The package __init__ pulls in Home Assistant, while the modules under test
+only need themselves and their relative imports, so the package is
+registered as a bare namespace and tests import from disasterinformation.
+"""
+from __future__ import annotations
+
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "disasterinformation"
+PACKAGE_NAME = "disasterinformation"
+
+if PACKAGE_NAME not in sys.modules:
+    spec = importlib.machinery.ModuleSpec(PACKAGE_NAME, None, is_package=True)
+    package = importlib.util.module_from_spec(spec)
+    package.__path__ = [str(PACKAGE_DIR)]
+    sys.modules[PACKAGE_NAME] = package
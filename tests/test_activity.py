@@ -0,0 +1,163 @@
+"""Tests for the rolling seismic activity rates."""
+from __future__ import annotations
+
+import pytest
+
+from disasterinformation.activity import ActivityRates, energy_magnitude, radiated_energy
+from disasterinformation.records import format_timestamp
+
+BUCKET = 600
+# A bucket boundary, so offsets below are easy to reason about
+T0 = 1_700_000_400
+
+
+def quake(event_id: str, origin_ts: int, magnitude: float, version: str = "1") -> dict:
+    """Return a list.json entry."""
+    return {"eid": event_id, "at": format_timestamp(origin_ts), "mag": f"{magnitude:.1f}", "ctt": version}
+
+
+def rates(min_magnitude: float = 0.0) -> ActivityRates:
+    """Return rates with a 1 hour window over a 24 hour baseline."""
+    return ActivityRates(min_magnitude, (1,), baseline_hours=24, bucket=BUCKET)
+
+
+def test_energy_magnitude_round_trips():
+    assert energy_magnitude(radiated_energy(5.0)) == pytest.approx(5.0)
+    assert energy_magnitude(0.0) is None
+
+
+def test_event_counts_until_its_bucket_leaves_the_window():
+    activity = rates()
+    activity.update([quake("a", T0, 3.0)], T0)
+    assert activity.summary(1).count == 1
+
+    # The 1 hour window covers the current bucket and the five before it
+    activity.update([quake("a", T0, 3.0)], T0 + 5 * BUCKET + BUCKET - 1)
+    assert activity.summary(1).count == 1
+    assert activity.summary(1).max_magnitude == 3.0
+
+    activity.update([quake("a", T0, 3.0)], T0 + 6 * BUCKET)
+    summary = activity.summary(1)
+    assert summary.count == 0
+    assert summary.max_magnitude is None
+    assert summary.energy == 0.0
+    assert summary.baseline_count == 1
+
+
+def test_jump_past_the_whole_ring_expires_everything():
+    activity = rates()
+    earthquakes = [quake("a", T0, 3.0), quake("b", T0 + BUCKET, 4.0)]
+    activity.update(earthquakes, T0 + BUCKET)
+    activity.update(earthquakes, T0 + 3 * 86400)
+    summary = activity.summary(1)
+    assert summary.count == 0
+    assert summary.baseline_count == 0
+
+
+def test_events_older_than_the_baseline_are_ignored():
+    activity = rates()
+    activity.update([quake("old", T0 - 25 * 3600, 5.0), quake("new", T0, 2.0)], T0)
+    summary = activity.summary(1)
+    assert summary.baseline_count == 1
+    assert summary.max_magnitude == 2.0
+
+
+def test_min_magnitude_filters_events():
+    activity = rates(min_magnitude=3.0)
+    activity.update([quake("a", T0, 2.9), quake("b", T0, 3.0)], T0)
+    assert activity.summary(1).count == 1
+
+
+def test_max_magnitude_is_rescanned_when_its_bucket_expires():
+    activity = rates()
+    earthquakes = [quake("big", T0, 5.0), quake("small", T0 + 3 * BUCKET, 2.0)]
+    activity.update(earthquakes, T0 + 3 * BUCKET)
+    assert activity.summary(1).max_magnitude == 5.0
+    activity.update(earthquakes, T0 + 6 * BUCKET)
+    summary = activity.summary(1)
+    assert summary.count == 1
+    assert summary.max_magnitude == 2.0
+
+
+def test_downward_revision_replaces_the_event():
+    activity = rates()
+    activity.update([quake("a", T0, 5.0), quake("b", T0, 3.0)], T0)
+    activity.update([quake("a", T0, 2.5, version="2"), quake("b", T0, 3.0)], T0)
+    summary = activity.summary(1)
+    assert summary.count == 2
+    assert summary.max_magnitude == 3.0
+    assert summary.energy == pytest.approx(radiated_energy(2.5) + radiated_energy(3.0))
+
+
+def test_revision_below_the_floor_removes_the_event():
+    activity = rates(min_magnitude=3.0)
+    activity.update([quake("a", T0, 3.5)], T0)
+    activity.update([quake("a", T0, 2.0, version="2")], T0)
+    assert activity.summary(1).count == 0
+
+
+def test_revision_moving_the_origin_moves_the_bucket():
+    activity = rates()
+    activity.update([quake("a", T0, 3.0)], T0 + 6 * BUCKET)
+    assert activity.summary(1).count == 0
+    activity.update([quake("a", T0 + 6 * BUCKET, 3.0, version="2")], T0 + 6 * BUCKET)
+    summary = activity.summary(1)
+    assert summary.count == 1
+    assert summary.baseline_count == 1
+
+
+def test_unchanged_version_is_not_counted_twice():
+    activity = rates()
+    activity.update([quake("a", T0, 3.0)], T0)
+    activity.update([quake("a", T0, 3.0)], T0)
+    assert activity.summary(1).count == 1
+
+
+def test_future_origin_counts_in_the_current_bucket():
+    activity = rates()
+    activity.update([quake("a", T0 + 2 * BUCKET, 3.0)], T0)
+    assert activity.summary(1).count == 1
+    # Still inside the window exactly as long as an event from now
+    activity.update([quake("a", T0 + 2 * BUCKET, 3.0)], T0 + 6 * BUCKET)
+    assert activity.summary(1).count == 0
+
+
+def test_clock_going_backwards_keeps_the_totals():
+    activity = rates()
+    activity.update([quake("a", T0, 3.0)], T0 + BUCKET)
+    activity.update([quake("a", T0, 3.0)], T0)
+    assert activity.summary(1).count == 1
+
+
+def test_rates_and_ratio():
+    activity = rates()
+    earthquakes = [quake(f"b{i}", T0 - 12 * 3600 + i, 2.0) for i in range(12)]
+    earthquakes += [quake(f"w{i}", T0 + i, 2.0) for i in range(6)]
+    activity.update(earthquakes, T0)
+    summary = activity.summary(1)
+    assert summary.rate == 6
+    assert summary.baseline_rate == pytest.approx(18 / 24)
+    assert summary.rate_ratio == pytest.approx(6 / (18 / 24))
+
+
+def test_rate_ratio_is_none_without_a_baseline():
+    assert rates().summary(1).rate_ratio is None
+
+
+def test_window_not_configured_up_front_is_built_from_the_ring():
+    activity = rates()
+    earthquakes = [quake("a", T0, 4.0), quake("b", T0 + 2 * 3600, 2.0), quake("c", T0 + 3 * 3600, 3.0)]
+    activity.update(earthquakes, T0 + 3 * 3600)
+    summary = activity.summary(2)
+    assert summary.count == 2
+    assert summary.max_magnitude == 3.0
+    assert summary.energy == pytest.approx(radiated_energy(2.0) + radiated_energy(3.0))
+    # From then on it is maintained like the others
+    activity.update(earthquakes, T0 + 4 * 3600 + 1)
+    assert activity.summary(2).count == 1
+
+
+def test_window_longer_than_the_baseline_covers_the_ring():
+    activity = rates()
+    activity.update([quake("a", T0, 3.0)], T0)
+    assert activity.summary(72).count == 1
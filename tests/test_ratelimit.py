@@ -0,0 +1,186 @@
+"""Tests for the shared request budget."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from disasterinformation.ratelimit import Priority, RequestLimiter
+
+
+class Clock:
+    """Clock advanced by hand."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def settle() -> None:
+    """Let granted waiters resume."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def run(coro):
+    """Run a test coroutine on a fresh loop."""
+    return asyncio.run(coro)
+
+
+def limiter(clock: Clock, burst: int = 10, rate: float = 1.0) -> RequestLimiter:
+    """Return a limiter on a manual clock."""
+    return RequestLimiter(rate=rate, burst=burst, clock=clock)
+
+
+def test_classes_leave_their_reserve_to_more_urgent_ones():
+    async def scenario():
+        clock = Clock()
+        budget = limiter(clock)
+        # METADATA leaves half the bucket, so it gets 5 of 10 tokens
+        for _ in range(5):
+            await budget.acquire(Priority.METADATA)
+        metadata = asyncio.create_task(budget.acquire(Priority.METADATA))
+        await settle()
+        assert not metadata.done()
+
+        # ROUTINE leaves a fifth untouched: 5 -> 2 tokens left
+        for _ in range(3):
+            await budget.acquire(Priority.ROUTINE)
+        routine = asyncio.create_task(budget.acquire(Priority.ROUTINE))
+        await settle()
+        assert not routine.done()
+
+        # The earthquake lane may drain the bucket even with others queued
+        for _ in range(2):
+            await budget.acquire(Priority.EARTHQUAKE)
+        assert budget.tokens == pytest.approx(0.0)
+        for task in (metadata, routine):
+            task.cancel()
+        await asyncio.gather(metadata, routine, return_exceptions=True)
+
+    run(scenario())
+
+
+def test_waiters_are_granted_in_priority_order():
+    async def scenario():
+        clock = Clock()
+        budget = limiter(clock, burst=4)
+        for _ in range(4):
+            await budget.acquire(Priority.EARTHQUAKE)
+
+        granted = []
+
+        async def request(priority: Priority, name: str) -> None:
+            await budget.acquire(priority)
+            granted.append(name)
+
+        tasks = [
+            asyncio.create_task(request(Priority.ROUTINE, "routine")),
+            asyncio.create_task(request(Priority.EMERGENCY, "emergency")),
+            asyncio.create_task(request(Priority.EARTHQUAKE, "earthquake")),
+        ]
+        await settle()
+        assert granted == []
+
+        # Enough tokens for all three at once
+        clock.now += 4
+        budget._drain()
+        await settle()
+        assert granted == ["earthquake", "emergency", "routine"]
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+
+
+def test_same_class_is_first_come_first_served():
+    async def scenario():
+        clock = Clock()
+        budget = limiter(clock, burst=2)
+        for _ in range(2):
+            await budget.acquire(Priority.EARTHQUAKE)
+        granted = []
+
+        async def request(name: str) -> None:
+            await budget.acquire(Priority.EMERGENCY)
+            granted.append(name)
+
+        first = asyncio.create_task(request("first"))
+        await settle()
+        # A token arrives, but the queued request is ahead of a new one
+        clock.now += 1
+        second = asyncio.create_task(request("second"))
+        await settle()
+        assert granted == ["first"]
+        clock.now += 1
+        budget._drain()
+        await settle()
+        assert granted == ["first", "second"]
+        await asyncio.gather(first, second)
+
+    run(scenario())
+
+
+def test_low_priority_is_served_once_urgent_traffic_leaves_room():
+    async def scenario():
+        clock = Clock()
+        budget = limiter(clock, burst=10, rate=1.0)
+        for _ in range(10):
+            await budget.acquire(Priority.EARTHQUAKE)
+        metadata = asyncio.create_task(budget.acquire(Priority.METADATA))
+
+        # Earthquake polls every 2 seconds use half the refill
+        for _ in range(20):
+            clock.now += 2
+            await budget.acquire(Priority.EARTHQUAKE)
+            budget._drain()
+            await settle()
+            if metadata.done():
+                break
+        assert metadata.done()
+
+    run(scenario())
+
+
+def test_refill_is_capped_at_the_burst():
+    clock = Clock()
+    budget = limiter(clock, burst=5)
+    clock.now += 1000
+    assert budget.tokens == 5
+
+
+def test_cancelled_waiter_is_skipped():
+    async def scenario():
+        clock = Clock()
+        budget = limiter(clock, burst=1)
+        await budget.acquire(Priority.EARTHQUAKE)
+        cancelled = asyncio.create_task(budget.acquire(Priority.EARTHQUAKE))
+        waiting = asyncio.create_task(budget.acquire(Priority.EARTHQUAKE))
+        await settle()
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        clock.now += 1
+        budget._drain()
+        await settle()
+        assert waiting.done()
+        assert budget.queued["earthquake"] == 0
+
+    run(scenario())
+
+
+def test_token_granted_to_a_cancelled_waiter_is_returned():
+    async def scenario():
+        clock = Clock()
+        budget = limiter(clock, burst=1)
+        await budget.acquire(Priority.EARTHQUAKE)
+        task = asyncio.create_task(budget.acquire(Priority.EARTHQUAKE))
+        await settle()
+        clock.now += 1
+        # Grant the token, then cancel before the waiter resumes
+        budget._drain()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert budget.tokens == pytest.approx(1.0)
+
+    run(scenario())
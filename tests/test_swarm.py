@@ -0,0 +1,112 @@
+"""Tests for the per-hypocenter index and swarm detection."""
+from __future__ import annotations
+
+from disasterinformation.records import format_timestamp
+from disasterinformation.swarm import HypocenterIndex
+
+T0 = 1_700_000_000
+HOUR = 3600
+
+
+def quake(event_id: str, origin_ts: int, hypocenter: str = "能登半島沖", magnitude: float = 3.0, version: str = "1") -> dict:
+    """Return a list.json entry."""
+    return {
+        "eid": event_id,
+        "at": format_timestamp(origin_ts),
+        "anm": hypocenter,
+        "mag": f"{magnitude:.1f}",
+        "ctt": version,
+    }
+
+
+def test_swarm_needs_more_than_threshold_events():
+    index = HypocenterIndex(0.0, 24)
+    earthquakes = [quake(f"e{i}", T0 + i) for i in range(3)]
+    index.update(earthquakes, T0 + 10)
+    assert index.swarms(3) == []
+    index.update(earthquakes + [quake("e3", T0 + 3, magnitude=4.2)], T0 + 10)
+    (swarm,) = index.swarms(3)
+    assert swarm.hypocenter == "能登半島沖"
+    assert swarm.count == 4
+    assert swarm.max_magnitude == 4.2
+    assert (swarm.first_ts, swarm.last_ts) == (T0, T0 + 3)
+
+
+def test_event_stays_at_the_cutoff_and_expires_after_it():
+    index = HypocenterIndex(0.0, 1)
+    earthquakes = [quake("a", T0), quake("b", T0 + 60)]
+    index.update(earthquakes, T0 + HOUR)
+    assert index.count("能登半島沖") == 2
+    index.update(earthquakes, T0 + HOUR + 1)
+    assert [event_id for _, event_id, _ in index.events("能登半島沖")] == ["b"]
+    index.update(earthquakes, T0 + HOUR + 61)
+    assert index.count("能登半島沖") == 0
+    assert index.swarms(0) == []
+
+
+def test_events_outside_the_window_are_not_indexed():
+    index = HypocenterIndex(0.0, 1)
+    index.update([quake("old", T0 - 2 * HOUR), quake("new", T0)], T0)
+    assert index.count("能登半島沖") == 1
+
+
+def test_min_magnitude_and_missing_fields():
+    index = HypocenterIndex(3.0, 24)
+    earthquakes = [
+        quake("small", T0, magnitude=2.9),
+        quake("floor", T0, magnitude=3.0),
+        {"eid": "unknown", "at": format_timestamp(T0), "anm": "能登半島沖", "mag": "", "ctt": "1"},
+        {"eid": "nowhere", "at": format_timestamp(T0), "anm": "", "mag": "4.0", "ctt": "1"},
+    ]
+    index.update(earthquakes, T0)
+    assert index.count("能登半島沖") == 1
+
+
+def test_revision_moves_the_event_to_its_new_region():
+    index = HypocenterIndex(0.0, 24)
+    index.update([quake("a", T0, "能登半島沖")], T0)
+    index.update([quake("a", T0, "石川県能登地方", version="2")], T0)
+    assert index.count("能登半島沖") == 0
+    assert index.count("石川県能登地方") == 1
+
+
+def test_revision_below_the_floor_removes_the_event():
+    index = HypocenterIndex(3.0, 24)
+    index.update([quake("a", T0, magnitude=3.5)], T0)
+    index.update([quake("a", T0, magnitude=2.5, version="2")], T0)
+    assert index.count("能登半島沖") == 0
+
+
+def test_revision_moving_the_origin_expires_at_the_new_time():
+    index = HypocenterIndex(0.0, 1)
+    index.update([quake("a", T0)], T0)
+    revised = [quake("a", T0 + 1800, version="2")]
+    index.update(revised, T0)
+    # The heap entry for the old origin must not expire the revised event
+    index.update(revised, T0 + HOUR + 1)
+    assert index.count("能登半島沖") == 1
+    index.update(revised, T0 + HOUR + 1801)
+    assert index.count("能登半島沖") == 0
+
+
+def test_revision_keeps_origin_order_within_a_region():
+    index = HypocenterIndex(0.0, 24)
+    index.update([quake("a", T0), quake("b", T0 + 60)], T0 + 60)
+    index.update([quake("a", T0 + 120, version="2"), quake("b", T0 + 60)], T0 + 120)
+    assert [event_id for _, event_id, _ in index.events("能登半島沖")] == ["b", "a"]
+
+
+def test_unchanged_version_is_not_indexed_twice():
+    index = HypocenterIndex(0.0, 24)
+    index.update([quake("a", T0)], T0)
+    index.update([quake("a", T0)], T0)
+    assert index.count("能登半島沖") == 1
+
+
+def test_swarms_are_busiest_first_then_most_recent():
+    index = HypocenterIndex(0.0, 24)
+    earthquakes = [quake(f"a{i}", T0 + i, "能登半島沖") for i in range(3)]
+    earthquakes += [quake(f"b{i}", T0 + 10 + i, "トカラ列島近海") for i in range(2)]
+    earthquakes += [quake(f"c{i}", T0 + 20 + i, "日向灘") for i in range(2)]
+    index.update(earthquakes, T0 + 30)
+    assert [swarm.hypocenter for swarm in index.swarms(1)] == ["能登半島沖", "日向灘", "トカラ列島近海"]
@@ -0,0 +1,99 @@
+"""Tests for the keyed warning diff."""
+from __future__ import annotations
+
+from disasterinformation.records import WarningRecord
+from disasterinformation.transitions import diff_warnings, index_warnings, phenomenon
+
+SEVERITIES = {"注意報": "注意報", "特別警報": "特別警報", "危険警報": "警報", "警報": "警報"}
+
+
+def warning(code: str, name: str, area_code: str = "1310100", status: str = "発表") -> WarningRecord:
+    """Return a warning record with the severity implied by its name."""
+    severity = next(value for suffix, value in SEVERITIES.items() if name.endswith(suffix))
+    return WarningRecord(code, name, severity, "千代田区", area_code, status)
+
+
+def test_phenomenon_strips_the_longest_suffix():
+    assert phenomenon(warning("33", "大雨特別警報")) == "大雨"
+    assert phenomenon(warning("43", "大雨危険警報")) == "大雨"
+    assert phenomenon(warning("03", "大雨警報")) == "大雨"
+    assert phenomenon(warning("10", "大雨注意報")) == "大雨"
+
+
+def test_unchanged_warnings_produce_no_delta():
+    active = index_warnings([warning("03", "大雨警報"), warning("14", "雷注意報")])
+    delta = diff_warnings(active, dict(active))
+    assert not delta
+
+
+def test_status_change_alone_is_not_a_transition():
+    previous = index_warnings([warning("03", "大雨警報", status="発表")])
+    current = index_warnings([warning("03", "大雨警報", status="継続")])
+    assert not diff_warnings(previous, current)
+
+
+def test_issued_and_lifted():
+    previous = index_warnings([warning("14", "雷注意報")])
+    current = index_warnings([warning("15", "強風注意報")])
+    delta = diff_warnings(previous, current)
+    assert [w.code for w in delta.issued] == ["15"]
+    assert [w.code for w in delta.lifted] == ["14"]
+    assert delta.upgraded == []
+
+
+def test_same_phenomenon_raised_in_the_same_area_is_an_upgrade():
+    previous = index_warnings([warning("10", "大雨注意報")])
+    current = index_warnings([warning("03", "大雨警報")])
+    delta = diff_warnings(previous, current)
+    assert [(old.code, new.code) for old, new in delta.upgraded] == [("10", "03")]
+    assert delta.issued == [] and delta.lifted == []
+
+
+def test_warning_raised_to_emergency_is_an_upgrade():
+    previous = index_warnings([warning("03", "大雨警報")])
+    current = index_warnings([warning("33", "大雨特別警報")])
+    delta = diff_warnings(previous, current)
+    assert [(old.code, new.code) for old, new in delta.upgraded] == [("03", "33")]
+
+
+def test_downgrade_is_an_issue_and_a_lift():
+    previous = index_warnings([warning("03", "大雨警報")])
+    current = index_warnings([warning("10", "大雨注意報")])
+    delta = diff_warnings(previous, current)
+    assert delta.upgraded == []
+    assert [w.code for w in delta.issued] == ["10"]
+    assert [w.code for w in delta.lifted] == ["03"]
+
+
+def test_upgrade_only_matches_within_an_area():
+    previous = index_warnings([warning("10", "大雨注意報", area_code="1310100")])
+    current = index_warnings([warning("03", "大雨警報", area_code="1310200")])
+    delta = diff_warnings(previous, current)
+    assert delta.upgraded == []
+    assert [w.area_code for w in delta.issued] == ["1310200"]
+    assert [w.area_code for w in delta.lifted] == ["1310100"]
+
+
+def test_upgrade_only_matches_the_same_phenomenon():
+    previous = index_warnings([warning("14", "雷注意報")])
+    current = index_warnings([warning("03", "大雨警報")])
+    delta = diff_warnings(previous, current)
+    assert delta.upgraded == []
+    assert len(delta.issued) == 1 and len(delta.lifted) == 1
+
+
+def test_reissued_warning_fires_lifted_then_issued():
+    issued = index_warnings([warning("03", "大雨警報")])
+    lifted = diff_warnings(issued, {})
+    assert [w.code for w in lifted.lifted] == ["03"] and not lifted.issued
+    reissued = diff_warnings({}, index_warnings([warning("03", "大雨警報")]))
+    assert [w.code for w in reissued.issued] == ["03"] and not reissued.lifted
+
+
+def test_upgrade_leaves_other_changes_in_the_area_alone():
+    previous = index_warnings([warning("10", "大雨注意報"), warning("14", "雷注意報")])
+    current = index_warnings([warning("03", "大雨警報"), warning("15", "強風注意報")])
+    delta = diff_warnings(previous, current)
+    assert [(old.code, new.code) for old, new in delta.upgraded] == [("10", "03")]
+    assert [w.code for w in delta.issued] == ["15"]
+    assert [w.code for w in delta.lifted] == ["14"]